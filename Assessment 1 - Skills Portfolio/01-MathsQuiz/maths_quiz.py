@@ -1,3 +1,11 @@
+# helps locate image/sound files inside project folders
+import os 
+import sys    # finds the shared startup profiler one folder up
+# startup profiler (off unless --profile-startup / STARTUP_PROFILE is set) → started before the heavy imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from startup_profiler import StartupProfiler
+profiler = StartupProfiler("Math Nebula")
+
 import tkinter as tk         # core GUI toolkit to build all Nebula interface screens
 # themed widgets for cleaner + modern UI controls
 from tkinter import ttk    
@@ -5,11 +13,11 @@ from tkinter import ttk
 from PIL import Image, ImageTk, ImageSequence   
 # supports randomising math questions and challenge logic
 import random 
-# helps locate image/sound files inside project folders
-import os 
 # handles all Nebula sound effects + background music
 import pygame 
 
+profiler.mark("tkinter, PIL, pygame", "imports")
+
 
 # Class to load and animate GIF frames
 class AnimatedGIF(tk.Label):
@@ -75,6 +83,7 @@ class MathNebula:
             pass
 
         self.root.protocol("WM_DELETE_WINDOW", self.quit_game)  # Ensures clean shutdown
+        profiler.mark("window + icon", "ui")
 
         # chosen space rank/title (no real-name)
         self.space_title = "Cadet"   # default; will be overwritten by selection
@@ -114,22 +123,25 @@ class MathNebula:
             path = os.path.join(self.bg_dir, name)
             frames = AnimatedGIF.preload_gif(path)  # preload frames from disk
             self.gifs[name] = frames  # store frames only, not Label yet
-
+            profiler.mark(f"GIF {name}", "assets")
 
         # Initialize pygame mixer
         pygame.mixer.init()
+        profiler.mark("pygame mixer init", "assets")
 
         # Load background music
         bg_music_path = os.path.join(self.snd_dir, "space_ambience.mp3")
         pygame.mixer.music.load(bg_music_path)  # Load ambient music
         pygame.mixer.music.play(-1)  # loop forever
         pygame.mixer.music.set_volume(0.3) # Balanced background volume
+        profiler.mark("background music", "assets")
 
         # Load sounds
         self.click_sound = pygame.mixer.Sound(os.path.join(self.snd_dir, "click.mp3")) # UI click
         self.correct_sound = pygame.mixer.Sound(os.path.join(self.snd_dir, "correct.mp3")) # Right answer tone
         self.wrong_sound = pygame.mixer.Sound(os.path.join(self.snd_dir, "wrong.mp3")) # Wrong answer alert
         self.game_sound = pygame.mixer.Sound(os.path.join(self.snd_dir, "game.wav"))  # Menu navigation effect
+        profiler.mark("sound effects", "assets")
 
     #load icon image
     def load_image(self, folder, name, sub=None):
@@ -690,6 +702,8 @@ class MathNebula:
     # Start Game Loop
     def run(self):
         self.launch_portal() # Load home screen first
+        profiler.mark("launch portal screen", "ui")
+        profiler.first_frame(self.root)  # reports once the home screen is on screen
         self.root.mainloop()  # Start GUI loop
 
 
@@ -1,3 +1,11 @@
+# Used for building safe file paths for images, sounds, and icons
+import os
+import sys # finds the shared startup profiler one folder up
+# startup profiler (off unless --profile-startup / STARTUP_PROFILE is set) → started before the heavy imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from startup_profiler import StartupProfiler
+profiler = StartupProfiler("Joke Terminal")
+
 import tkinter as tk # Main GUI framework for building all screens and buttons
 from tkinter import messagebox #Popup for system messages
 # Handles PNG & GIF loading + frame extraction for animated backgrounds
@@ -6,8 +14,8 @@ from PIL import Image, ImageTk, ImageSequence
 import random
 # Plays all sound effects (clicks, laughs, startup audio)
 import pygame
-# Used for building safe file paths for images, sounds, and icons
-import os
+
+profiler.mark("tkinter, PIL, pygame", "imports")
 
 
 # Handles GIF animation for all screens
@@ -45,7 +53,9 @@ class JokeMatrix:
         self.root.title("Joke Terminal v1.0")
         self.root.geometry("500x500")
         self.root.config(bg="black")
+        profiler.mark("window", "ui")
         pygame.mixer.init()
+        profiler.mark("pygame mixer init", "assets")
 
         #Window Icon (Favicon)
         icon_path = os.path.join(os.path.dirname(__file__), "icon", "Alexa.ico") #References: Used os path code from ChatGPT
@@ -69,6 +79,7 @@ class JokeMatrix:
         pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), "sounds", "laugh3.mp3")),
         pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), "sounds", "laugh4.mp3")),
         ]
+        profiler.mark("click + laugh sounds", "assets")
 
         # store jokes
         self.jokes = []
@@ -80,9 +91,11 @@ class JokeMatrix:
 
         # load jokes from txt file
         self.load_jokes()
+        profiler.mark("randomJokes.txt", "data")
 
         # open splash screen
         self.splash_screen()
+        profiler.mark("splash screen", "ui")
 
     # load icon image
     def load_image(self, folder, name, sub=None):
@@ -141,6 +154,7 @@ class JokeMatrix:
         # animated background gif
         gif_path = os.path.join(os.path.dirname(__file__), "backgrounds", "hacker_bg.gif")
         self.bg = AnimatedGIF(self.root, gif_path)
+        profiler.mark("splash GIF decode", "assets")    # every frame → PhotoImage, the bulk of the splash
         self.bg.place(x=0, y=0, relwidth=1, relheight=1)
 
         # initiate button (first user interaction)
@@ -354,4 +368,5 @@ class JokeMatrix:
 # RUN APPLICATION
 root = tk.Tk()
 JokeMatrix(root)
+profiler.first_frame(root)  # reports once the splash screen is on screen
 root.mainloop()
@@ -0,0 +1,37 @@
+# Synthetic marks-file generator → writes a studentMarks-style file (count line + one student per line)
+# from a fixed seed, so every benchmark run at a given size works on exactly the same cohort.
+import random    # Seeded generator → same numbers, names and marks on every run
+import argparse    # Command line: output path, number of students, seed
+
+FIRST = ("John", "Sam", "Lee", "Matt", "Ron", "Jake", "Jo", "Gareth", "Alan", "Les",
+         "Amira", "Fatima", "Omar", "Priya", "Chen", "Sofia", "Liam", "Noor", "Yusuf", "Maya")
+LAST = ("Curry", "Sturtivant", "Scott", "Thompson", "Herrema", "Hobbs", "Hyde", "Southgate",
+        "Shearer", "Ferdinand", "Khan", "Patel", "Ali", "Smith", "Wong", "Garcia", "Brown", "Rahman")
+
+
+# Yields (number, name, cw1, cw2, cw3, exam) rows → unique digit-only numbers,
+# coursework out of 20 and exam out of 100 like the real marks files
+def generate_rows(count, seed=42):
+    rng = random.Random(seed)
+    width = max(4, len(str(count * 10)))
+    numbers = rng.sample(range(10 ** (width - 1), 10 ** width), count)
+    for num in numbers:
+        yield (str(num), f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+               rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 100))
+
+
+def write_marks_file(path, count, seed=42):
+    with open(path, "w") as f:
+        f.write(f"{count}\n")
+        for row in generate_rows(count, seed):
+            f.write(",".join(map(str, row)) + "\n")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic student marks file.")
+    parser.add_argument("path")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    write_marks_file(args.path, args.count, args.seed)
@@ -0,0 +1,283 @@
+# Student manager benchmarks → times the core operation behind each GUI action (load, search, sort,
+# summary, add, update, delete) on seeded synthetic cohorts, records wall time, ops/sec and peak
+# memory, and compares the run with a saved JSON baseline.
+#   python benchmarks/run_benchmarks.py                          → 1k / 100k / 1M students, text backend
+#   python benchmarks/run_benchmarks.py --sizes 1000 100000 --save   → store this run as the baseline
+#   python benchmarks/run_benchmarks.py --backend sqlite --check     → exit 1 on a regression
+import os    # Temp folders + paths
+import sys    # Lets the benchmark import student_core from the folder above
+import json    # Baseline file
+import time    # perf_counter wall-clock timings
+import tracemalloc    # Peak Python memory of each operation
+import tempfile    # Every run works on fresh copies of the generated files
+import shutil    # Copies the generated marks file into each run folder
+import argparse    # Command line options
+import platform    # Machine / Python details stored with the baseline
+import gc    # Collects leftovers between runs so they don't leak into the next measurement
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+from student_core import StudentRepository, SqliteStudentRepository, StudentStore    # noqa: E402
+from generate_marks import write_marks_file    # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+QUERIES = ("a", "sm", "tho", "123", "curry", "jo h", "zzz", "4")
+EDITS = 200             # students added, then updated, then deleted at every size
+MIN_SECONDS = 0.2       # read-only operations repeat until they have run at least this long
+WRITE_ROUNDS = 3        # add → update → delete run this many times; the fastest round of each is kept
+
+
+# One benchmark run → a fresh copy of the marks file + the repository being measured
+class BenchRun:
+
+    def __init__(self, source, backend, size):
+        self.folder = tempfile.mkdtemp(prefix="student_bench_")
+        self.path = os.path.join(self.folder, "studentMarks_ext.txt")
+        shutil.copyfile(source, self.path)
+        self.backend = backend
+        self.repo = None
+        # new students get one digit more than the generated ones → never a duplicate number
+        first = 10 ** max(4, len(str(size * 10)))
+        self.new_numbers = [str(first + i) for i in range(EDITS)]
+
+    def open_repo(self):
+        if self.repo is not None:
+            self.repo.close()
+        if self.backend == "sqlite":
+            self.repo = SqliteStudentRepository(self.path)
+        else:
+            self.repo = StudentRepository(self.path)
+        return self.repo
+
+    def close(self):
+        if self.repo is not None:
+            self.repo.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+# Operations in the order they run; each returns how many operations it performed.
+# (name, function, kind) → "read" ones may be repeated to get a stable timing, "write" ones are
+# dominated by fsync (noisy) → timed over WRITE_ROUNDS and checked with their own tolerance.
+def load_cold(run):
+    run.open_repo().load()    # text: parse + grade + index (+ write snapshot) / sqlite: one-shot migration
+    return 1
+
+
+def load_warm(run):
+    run.open_repo().load()    # text: mapped snapshot / sqlite: open the existing database
+    return 1
+
+
+def run_search(run):
+    for q in QUERIES:
+        len(run.repo.search(q))
+    return len(QUERIES)
+
+
+def sort_records(run):
+    for mode in StudentStore.SORT_MODES:
+        view = run.repo.sorted_view(mode)
+        len(view)
+        view[0:10]    # the first page the table shows
+    return len(StudentStore.SORT_MODES)
+
+
+def show_summary(run):
+    stats = run.repo.stats
+    stats.count, stats.mean    # the two numbers under the table
+    return 1
+
+
+def save_new_student(run):
+    for num in run.new_numbers:
+        run.repo.add((num, "Bench Student", 10, 10, 10, 50))
+    return EDITS
+
+
+def save_updated_student(run):
+    for num in run.new_numbers:
+        run.repo.update(num, (num, "Bench Student", 15, 15, 15, 75))
+    return EDITS
+
+
+def confirm_and_delete(run):
+    for num in run.new_numbers:
+        run.repo.delete(num)
+    return EDITS
+
+
+OPERATIONS = (
+    ("load_students (cold)", load_cold, "load"),
+    ("load_students (warm)", load_warm, "load"),
+    ("run_search", run_search, "read"),
+    ("sort_records", sort_records, "read"),
+    ("show_summary", show_summary, "read"),
+    ("save_new_student", save_new_student, "write"),
+    ("save_updated_student", save_updated_student, "write"),
+    ("confirm_and_delete", confirm_and_delete, "write"),
+)
+WRITES = {name for name, _, kind in OPERATIONS if kind == "write"}
+
+
+def timing(ops, elapsed):
+    return {"seconds": elapsed, "ops": ops, "ops_per_sec": ops / elapsed if elapsed else None}
+
+
+# Times every operation once through (read-only ones repeated up to MIN_SECONDS). The writes run
+# as add → update → delete rounds (each round deletes what it added → the next one starts the same),
+# keeping each operation's fastest round.
+def time_operations(source, backend, size):
+    results = {}
+    run = BenchRun(source, backend, size)
+    try:
+        for name, func, kind in OPERATIONS:
+            if kind == "write":
+                continue
+            gc.collect()
+            ops, elapsed = 0, 0.0
+            while True:
+                start = time.perf_counter()
+                ops += func(run)
+                elapsed += time.perf_counter() - start
+                if kind != "read" or elapsed >= MIN_SECONDS:
+                    break
+            results[name] = timing(ops, elapsed)
+
+        for _ in range(WRITE_ROUNDS):
+            for name, func, kind in OPERATIONS:
+                if kind != "write":
+                    continue
+                gc.collect()
+                start = time.perf_counter()
+                ops = func(run)
+                elapsed = time.perf_counter() - start
+                if name not in results or elapsed < results[name]["seconds"]:
+                    results[name] = timing(ops, elapsed)
+    finally:
+        run.close()
+    return results
+
+
+# Second pass under tracemalloc (it slows Python down, so it never overlaps the timed pass)
+def measure_memory(source, backend, size, results):
+    run = BenchRun(source, backend, size)
+    try:
+        for name, func, _ in OPERATIONS:
+            gc.collect()
+            tracemalloc.start()
+            func(run)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name]["peak_kib"] = round(peak / 1024, 1)
+    finally:
+        run.close()
+
+
+def run_benchmarks(sizes, backend, seed, memory=True):
+    results = {}
+    data_dir = tempfile.mkdtemp(prefix="student_bench_data_")
+    try:
+        for size in sizes:
+            source = write_marks_file(os.path.join(data_dir, f"marks_{size}.txt"), size, seed)
+            print(f"\n{backend} backend, {size:,} students")
+            results[str(size)] = time_operations(source, backend, size)
+            if memory:
+                measure_memory(source, backend, size, results[str(size)])
+            for name, r in results[str(size)].items():
+                peak = f"{r['peak_kib']:>12,.0f} KiB" if "peak_kib" in r else ""
+                print(f"  {name:<24}{r['seconds'] * 1000:>12.2f} ms{r['ops_per_sec']:>14,.0f} ops/s{peak}")
+            os.remove(source)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+# Prints time (and memory) change per operation → returns the operations slower than the tolerance
+# (`write_tolerance` for the fsync-bound writes)
+def compare(results, baseline, backend, tolerance, write_tolerance=None):
+    regressions = []
+    base_runs = baseline.get("results", {}).get(backend, {})
+    base_meta = baseline.get("meta", {}).get(backend, {})
+    dates = {base_meta.get(size, {}).get("created", "?") for size in results if size in base_runs}
+    if not dates:
+        print(f"\nNo {backend} baseline for these sizes yet")
+        return regressions
+    print(f"\nCompared with the {backend} baseline from {', '.join(sorted(dates))}")
+    for size, ops in results.items():
+        for name, r in ops.items():
+            base = base_runs.get(size, {}).get(name)
+            if not base or not base.get("ops_per_sec") or not r["ops_per_sec"]:
+                continue
+            ratio = base["ops_per_sec"] / r["ops_per_sec"]    # > 1 → slower than the baseline
+            mem = ""
+            if base.get("peak_kib") and r.get("peak_kib"):
+                mem = f"   memory {r['peak_kib'] / base['peak_kib'] - 1:+.0%}"
+            allowed = write_tolerance if name in WRITES and write_tolerance is not None else tolerance
+            flag = "  ← slower" if ratio > 1 + allowed else ""
+            print(f"  {size:>8} {name:<24} time {ratio - 1:+.0%}{mem}{flag}")
+            if flag:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+# Baseline files from before meta was kept per backend have one file-wide meta → it is copied to
+# every backend / size in the file (the best that is known about them)
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return None
+    meta = baseline.get("meta", {})
+    if "created" in meta:
+        baseline["meta"] = {backend: dict.fromkeys(runs, meta)
+                            for backend, runs in baseline.get("results", {}).items()}
+    return baseline
+
+
+# Merges this run into the baseline file (other backends / sizes already in it are kept).
+# meta is kept per backend and size, like the results → each number keeps the date and machine
+# it was measured on, whichever backend or size was saved last.
+def save_baseline(path, results, backend, seed):
+    baseline = load_baseline(path) or {"results": {}, "meta": {}}
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+    }
+    baseline["results"].setdefault(backend, {}).update(results)
+    baseline.setdefault("meta", {}).setdefault(backend, {}).update(dict.fromkeys(results, meta))
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"\nBaseline saved to {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the student manager core.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--backend", choices=("text", "sqlite"), default="text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if anything got slower")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --check fails")
+    parser.add_argument("--write-tolerance", type=float, default=0.75,
+                        help="allowed slowdown of add / update / delete (fsync-bound, noisier)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.backend, args.seed, memory=not args.no_memory)
+
+    regressions = []
+    baseline = load_baseline(args.baseline)
+    if baseline:
+        regressions = compare(results, baseline, args.backend, args.tolerance, args.write_tolerance)
+    if args.save:
+        save_baseline(args.baseline, results, args.backend, args.seed)
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
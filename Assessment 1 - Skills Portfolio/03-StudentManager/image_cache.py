@@ -0,0 +1,65 @@
+# Image cache for the student manager windows → background and button PNGs are decoded the first time
+# they are shown (not all up front), resized once with Pillow to the size they are displayed at
+# (instead of decoding full size and throwing pixels away with PhotoImage.subsample), and kept in a
+# small LRU keyed by (file, target size). Start-up only pays for the images on the first screen.
+from collections import OrderedDict    # LRU order → least recently used image first
+from PIL import Image, ImageTk    # Decodes + resizes the PNGs and wraps them as Tk images
+
+
+class ImageCache:
+
+    def __init__(self, capacity=16):
+        self.capacity = capacity       # most Tk images kept alive by the cache (widgets keep their own)
+        self.images = OrderedDict()    # (path, (width, height) or None) → ImageTk.PhotoImage
+        self.sizes = {}                # path → size on disk (read from the file header, no decoding)
+        self.pending = []              # get() arguments still to decode in idle time
+
+    # Tk image of `path` at `size` (None → as stored). `shrink=(x, y)` asks for the size the old
+    # subsample(x, y) gave, so existing layouts keep their button sizes. Decoded on the first request only.
+    def get(self, path, size=None, shrink=None):
+        if shrink:
+            width, height = self.native_size(path)
+            size = (max(1, width // shrink[0]), max(1, height // shrink[1]))
+        key = (path, tuple(size) if size else None)
+
+        img = self.images.get(key)
+        if img is not None:
+            self.images.move_to_end(key)
+            return img
+
+        with Image.open(path) as src:
+            if src.mode not in ("RGB", "RGBA"):
+                src = src.convert("RGBA")    # palette images would only resize with NEAREST
+            if size and tuple(size) != src.size:
+                # reducing_gap → cheap integer box-reduce first, then LANCZOS for the last step
+                src = src.resize(key[1], Image.LANCZOS, reducing_gap=2.0)
+            img = ImageTk.PhotoImage(src)
+
+        self.images[key] = img
+        if len(self.images) > self.capacity:
+            self.images.popitem(last=False)    # still shown? the widget's own reference keeps it alive
+        return img
+
+    def native_size(self, path):
+        if path not in self.sizes:
+            with Image.open(path) as src:    # lazy → only the PNG header is read
+                self.sizes[path] = src.size
+        return self.sizes[path]
+
+    # Decodes images the user is likely to open next, one per idle turn of the Tk loop, so the
+    # window stays responsive. Each item is a tuple of get() arguments: (path,), (path, size) or
+    # (path, None, shrink).
+    def warm_up(self, root, items):
+        self.pending.extend(items)
+        root.after_idle(self.warm_step, root)
+
+    def warm_step(self, root):
+        if not self.pending:
+            return
+        args = self.pending.pop(0)
+        try:
+            self.get(*args)
+        except OSError:
+            pass    # a missing file is reported when the screen that needs it is opened
+        if self.pending:
+            root.after_idle(self.warm_step, root)
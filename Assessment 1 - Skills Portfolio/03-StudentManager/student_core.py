@@ -0,0 +1,2746 @@
+# Student manager core → everything the student manager GUIs need that does not touch Tk:
+# parsing, grading, indexes, search, sorting, statistics, persistence and bulk import.
+import os    # File paths, sizes and atomic renames for the marks file, journal and snapshot
+import bisect    # Keeps the sorted secondary indexes (name, percent, …) in order without re-sorting
+import threading    # Background compaction, write-behind saving and search threads
+import queue    # Hands work to the background threads and their results back to the caller
+import itertools    # islice → stops the streaming parser after the first N rows, starmap → grades rows lazily
+from collections import OrderedDict, Counter    # LRU cache for recent searches + grade histogram
+import array    # Typed columns for the snapshot + compact int arrays for the in-memory indexes
+import mmap    # Maps the snapshot file into memory instead of reading + parsing it
+import struct    # Packs the snapshot header (row count + source file signature)
+import csv    # Reads external CSV files for bulk import + writes CSV exports
+import json    # JSON Lines exports + the compaction note other instances read
+import sqlite3    # Optional database backend → indexed queries instead of the text file + journal
+import contextlib    # Re-entrant SQLite write transactions
+try:
+    import fcntl    # Advisory file lock shared by every instance editing the same marks file
+except ImportError:    # Windows → msvcrt byte-range lock instead
+    fcntl = None
+    import msvcrt
+
+
+# One student → the six values read from the marks file (number, name, cw1, cw2, cw3, exam) plus
+# the derived coursework / total / percent / grade. Nothing parsed is thrown away, so the update form
+# and the journal get the exact component marks back from memory (`row` / `to_line()`).
+# __slots__ → no per-record __dict__; marks and totals are small cached ints and grades are the
+# shared GradingEngine letters, so a record is little more than its number and name strings.
+class StudentRecord:
+
+    __slots__ = ("number", "name", "cw1", "cw2", "cw3", "exam",
+                 "coursework", "total", "percent", "grade", "version", "seq")
+
+    def __init__(self, number, name, cw1, cw2, cw3, exam, coursework, total, percent, grade, version=0):
+        self.number = number
+        self.name = name
+        self.cw1 = cw1
+        self.cw2 = cw2
+        self.cw3 = cw3
+        self.exam = exam
+        self.coursework = coursework
+        self.total = total
+        self.percent = percent
+        self.grade = grade
+        self.version = version    # store version the record was saved at (row cache / search cache)
+        self.seq = -1             # position in the in-memory store (set by StudentStore)
+
+    # (number, name, cw1, cw2, cw3, exam) → the parsed fields, in marks-file order
+    @property
+    def row(self):
+        return (self.number, self.name, self.cw1, self.cw2, self.cw3, self.exam)
+
+    # The record as one marks-file line (no newline)
+    def to_line(self):
+        return ",".join(map(str, self.row))
+
+    def __repr__(self):
+        return f"StudentRecord({self.to_line()}, grade={self.grade})"
+
+
+# Grading engine → coursework total, overall total, percentage and grade for each student
+class GradingEngine:
+
+    MAX_TOTAL = 160    # 3 coursework marks + exam are out of 160 in total
+    BANDS = ((70, "A"), (60, "B"), (50, "C"), (40, "D"))
+    FAIL = "F"
+
+    @classmethod
+    def grade(cls, p):
+        for cutoff, letter in cls.BANDS:
+            if p >= cutoff:
+                return letter
+        return cls.FAIL
+
+    # One student record from its raw marks (the add / update forms and every loader)
+    @classmethod
+    def record(cls, num, name, cw1, cw2, cw3, exam):
+        coursework = cw1 + cw2 + cw3
+        total = coursework + exam
+        percent = total / cls.MAX_TOTAL * 100
+        return StudentRecord(num, name, cw1, cw2, cw3, exam, coursework, total, percent, cls.grade(percent))
+
+    # Student records from parsed (number, name, cw1, cw2, cw3, exam) rows → lazily, one row at a time,
+    # so a streamed file is never held in memory as a whole
+    @classmethod
+    def records(cls, rows):
+        return itertools.starmap(cls.record, rows)
+
+
+# Trigram substring index → every 3 letter piece of a student's number and name points to that
+# student's position (seq). Postings are compact int arrays kept in seq order, so a "contains" search
+# only checks the students listed under the query's rarest trigram. Queries shorter than 3 letters
+# have no trigram and are answered by a scan (they match most of the cohort anyway).
+class NGramIndex:
+
+    N = 3
+
+    def __init__(self):
+        self.postings = {}    # trigram → array of seqs, ascending
+
+    @classmethod
+    def grams(cls, *texts):
+        return {text[i:i + cls.N] for text in texts for i in range(len(text) - cls.N + 1)}
+
+    # New students always get the highest seq → a plain append keeps the postings sorted
+    def add(self, seq, *texts):
+        for g in self.grams(*texts):
+            posting = self.postings.get(g)
+            if posting is None:
+                posting = self.postings[g] = array.array("i")
+            if posting and posting[-1] > seq:
+                bisect.insort(posting, seq)    # edited student keeps its older seq
+            else:
+                posting.append(seq)
+
+    def remove(self, seq, *texts):
+        for g in self.grams(*texts):
+            posting = self.postings.get(g)
+            if posting is None:
+                continue
+            i = bisect.bisect_left(posting, seq)
+            if i < len(posting) and posting[i] == seq:
+                del posting[i]
+                if not posting:
+                    del self.postings[g]
+
+    # Seqs that *may* contain the query (the rarest trigram's posting, ascending), or None when
+    # the query is too short to use the index. The caller confirms each candidate.
+    def candidates(self, query):
+        if len(query) < self.N:
+            return None
+        return min((self.postings.get(g, ()) for g in self.grams(query)), key=len)
+
+
+# Rank index → a Fenwick (binary indexed) tree counting students per total mark. Totals are whole
+# numbers in a small range (0–160 for a normal cohort), so adding / removing a student and "how many
+# scored below / above this total" are O(log range) each, whatever the cohort size → ranks never need
+# a re-sort. A total outside the current range (odd marks in the file) grows the tree once.
+class RankIndex:
+
+    def __init__(self, low=0, high=GradingEngine.MAX_TOTAL):
+        self.low = low                            # smallest total the tree can hold
+        self.tree = [0] * (high - low + 2)        # 1-based Fenwick array over totals low..high
+        self.count = 0
+
+    @property
+    def high(self):
+        return self.low + len(self.tree) - 2
+
+    def add(self, total, delta=1):
+        if not self.low <= total <= self.high:
+            self._grow(total)
+        i, tree = total - self.low + 1, self.tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+        self.count += delta
+
+    def remove(self, total):
+        self.add(total, -1)
+
+    # Students with a total strictly below `total`
+    def below(self, total):
+        i = min(total - self.low, len(self.tree) - 1)
+        tree, n = self.tree, 0
+        while i > 0:
+            n += tree[i]
+            i &= i - 1
+        return n
+
+    # Students with a total strictly above `total`
+    def above(self, total):
+        return self.count - self.below(total + 1)
+
+    # Competition rank (1 = best, equal totals share a rank)
+    def rank(self, total):
+        return self.above(total) + 1
+
+    # Share of the cohort (0–100) scoring the same as `total` or lower → the top student is at 100
+    def percentile(self, total):
+        return self.below(total + 1) / self.count * 100 if self.count else 0.0
+
+    # Rebuilds the tree over a range that also covers `total` (doubled, so odd marks rarely cost twice)
+    def _grow(self, total):
+        counts = [self.below(t + 1) - self.below(t) for t in range(self.low, self.high + 1)]
+        low = min(self.low, total)
+        high = max(self.high, total, low + 2 * (self.high - self.low))
+        self.tree = tree = [0] * (high - low + 2)
+        for t, n in enumerate(counts, self.low - low + 1):
+            tree[t] = n
+        for i in range(1, len(tree)):    # O(range) bottom-up build from the per-total counts
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.low = low
+
+
+# Running cohort statistics → updated per add / update / delete instead of recomputed per screen.
+# Count, sum, mean and variance of the percentage (Welford, with removal), a grade histogram and
+# the rank index behind each student's rank / percentile.
+# Top-k / bottom-k by total are read off the store's maintained "total" sort index.
+class CohortStats:
+
+    def __init__(self, store):
+        self.store = store
+        self.count = 0
+        self.total = 0.0          # sum of percentages
+        self.mean = 0.0
+        self.m2 = 0.0             # sum of squared differences from the mean (Welford)
+        self.grades = Counter()
+        self.ranks = RankIndex()
+
+    def add(self, student):
+        x = student.percent
+        self.ranks.add(student.total)
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.grades[student.grade] += 1
+
+    def remove(self, student):
+        x = student.percent
+        self.ranks.remove(student.total)
+        if self.count <= 1:
+            self.count, self.total, self.mean, self.m2 = 0, 0.0, 0.0, 0.0
+        else:
+            old_mean = (self.count * self.mean - x) / (self.count - 1)
+            self.m2 -= (x - old_mean) * (x - self.mean)
+            self.mean = old_mean
+            self.count -= 1
+            self.total -= x
+        self.grades[student.grade] -= 1
+        if self.grades[student.grade] <= 0:
+            del self.grades[student.grade]
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    # Position of a student in the cohort by total (1 = best, ties share a rank) → O(log range)
+    def rank(self, student):
+        return self.ranks.rank(student.total)
+
+    def percentile(self, student):
+        return self.ranks.percentile(student.total)
+
+    # k highest (or lowest) students by total; ties keep file order. Returns [] for an empty cohort.
+    def top(self, k=1):
+        store = self.store
+        index, by_seq = store.sorted["total"], store.by_seq
+        best, end = [], len(index)
+        # the index is (total, seq) ascending → walk whole groups of equal totals from the end
+        while end and len(best) < k:
+            total = by_seq[index[end - 1]].total
+            start = bisect.bisect_left(index, (total, -1), 0, end, key=store.index_key("total"))
+            best.extend(by_seq[q] for q in index[start:end])
+            end = start
+        return best[:k]
+
+    def bottom(self, k=1):
+        by_seq = self.store.by_seq
+        return [by_seq[q] for q in self.store.sorted["total"][:k]]
+
+
+# Live, read-only view of one maintained sort order → supports len() and slicing, so the
+# virtual table only touches the page of records it is about to show
+class SortedView:
+
+    def __init__(self, store, name, reverse=False):
+        self.store = store
+        self.name = name          # sort index name → seqs ordered by (key, seq), owned by the store
+        self.reverse = reverse
+
+    # looked up on every use, so the view stays valid when the store reloads in place
+    @property
+    def index(self):
+        return self.store.sorted[self.name]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, item):
+        n = len(self.index)
+        by_seq = self.store.by_seq
+        if isinstance(item, slice):
+            start, stop, step = item.indices(n)
+            if step < 0:    # walks backwards → one position at a time (never what a table page asks for)
+                return [self[i] for i in range(start, stop, step)]
+            if self.reverse:
+                seqs = self.index[n - stop:n - start][::-1] if stop > start else []
+            else:
+                seqs = self.index[start:stop]
+            return [by_seq[q] for q in seqs][::step]
+
+        if item < 0:
+            item += n
+        if self.reverse:
+            item = n - 1 - item
+        return by_seq[self.index[item]]
+
+    def __iter__(self):
+        by_seq = self.store.by_seq
+        seqs = reversed(self.index) if self.reverse else self.index
+        for q in seqs:
+            yield by_seq[q]
+
+    # Records one by one from a copy of the index taken now (4 bytes per student) → a long export
+    # keeps the order it started with while edits go on; students deleted meanwhile are skipped
+    def stream(self):
+        index = array.array("i", self.index)
+        by_seq = self.store.by_seq
+        for q in (reversed(index) if self.reverse else index):
+            s = by_seq[q]
+            if s is not None:
+                yield s
+
+
+# In-memory student store → hash index keyed by student number + sorted indexes for every sort mode
+# (name, percent, number, coursework, exam, total) so delete / update / duplicate checks / sorting
+# don't walk or re-sort the whole list on every click.
+# Every record gets a seq (its display position); the sort indexes, the number index and the trigram
+# index are typed arrays of seqs, so each index costs a few bytes per student instead of a tuple.
+class StudentStore:
+
+    # sort index name → key function (ties are broken by seq → file order)
+    SORT_KEYS = {
+        "name": lambda s: s.name.lower(),
+        "percent": lambda s: s.percent,
+        "number": lambda s: int(s.number) if s.number.isdigit() else float("inf"),
+        "cw": lambda s: s.coursework,
+        "exam": lambda s: s.exam,
+        "total": lambda s: s.total,
+    }
+    # sort menu mode → (sort index, highest first?)
+    SORT_MODES = {
+        "name_asc": ("name", False),
+        "name_desc": ("name", True),
+        "percent_asc": ("percent", False),
+        "percent_desc": ("percent", True),
+        "number": ("number", False),
+        "cw": ("cw", True),
+        "exam": ("exam", True),
+        "total": ("total", True),
+    }
+
+    def __init__(self, students=()):
+        self.version = 0        # bumped on every change; each record keeps the version it was stored at
+        self.lock = threading.RLock()   # the search thread reads while the Tk thread edits
+        self.reset(students)
+
+    # (Re)builds every index from scratch in place → views and workers holding this store stay valid
+    def reset(self, students=()):
+        with self.lock:
+            self.by_number = {}     # number → StudentRecord
+            self.by_seq = []        # seq → StudentRecord (None once deleted) → file order for display
+            self.numbers = array.array("i")     # seqs ordered by number text → number prefix lookups
+            self.sorted = {name: array.array("i") for name in self.SORT_KEYS}   # seqs ordered by (key, seq)
+            self.sorted_upto = 0    # seqs below this are in `numbers` / `sorted` (see extend)
+            self.ngrams = NGramIndex()
+            self.ngrams_pending = False    # records appended without trigrams → search scans (see adopt)
+            self.stats = CohortStats(self)
+            self._load(students)
+
+    def __len__(self):
+        return len(self.by_number)
+
+    def __iter__(self):
+        return (s for s in self.by_seq if s is not None)
+
+    def __contains__(self, number):
+        return number in self.by_number
+
+    def get(self, number):
+        return self.by_number.get(number)
+
+    def all(self):
+        return list(self)
+
+    def add(self, student):
+        num = student.number
+        with self.lock:
+            if num in self.by_number:
+                raise KeyError(f"Student number {num} already exists")
+
+            self._sort_tail()
+            self.version += 1
+            student.version = self.version
+            student.seq = len(self.by_seq)
+            self.by_number[num] = student
+            self.by_seq.append(student)
+            self._index(student)
+
+    def remove(self, number):
+        with self.lock:
+            student = self.by_number[number]
+            self._sort_tail()
+            self.version += 1
+            self._unindex(student)
+            del self.by_number[number]
+            self.by_seq[student.seq] = None
+            return student
+
+    # Replaces a record (number may change) → keeps its table position when the number stays the same
+    def update(self, old_number, student):
+        num = student.number
+        with self.lock:
+            if num != old_number and num in self.by_number:
+                raise KeyError(f"Student number {num} already exists")
+
+            old = self.by_number[old_number]
+            self._sort_tail()
+            self.version += 1
+            student.version = self.version
+            self._unindex(old)
+            del self.by_number[old_number]
+
+            if num == old_number:
+                student.seq = old.seq
+                self.by_seq[old.seq] = student
+            else:
+                self.by_seq[old.seq] = None
+                student.seq = len(self.by_seq)
+                self.by_seq.append(student)
+            self.by_number[num] = student
+            self._index(student)
+
+    # Numbers of the students whose number or name contains the (lowercase) query, in file order
+    def search_ids(self, query):
+        with self.lock:
+            seqs = None if self.ngrams_pending else self.ngrams.candidates(query)
+            if seqs is None:
+                students = iter(self)
+            else:
+                students = (self.by_seq[q] for q in seqs)
+            return [s.number for s in students if query in s.number.lower() or query in s.name.lower()]
+
+    # Same as search_ids but returns the student records
+    def search(self, query):
+        with self.lock:
+            return self.lookup(self.search_ids(query))
+
+    # Records for a list of student numbers (numbers deleted in the meantime are skipped)
+    def lookup(self, numbers):
+        with self.lock:
+            return [self.by_number[n] for n in numbers if n in self.by_number]
+
+    # Students whose number starts with the prefix (binary search over the number index)
+    def number_prefix(self, prefix):
+        by_seq, key = self.by_seq, lambda q: self.by_seq[q].number
+        lo = bisect.bisect_left(self.numbers, prefix, key=key)
+        hi = bisect.bisect_left(self.numbers, prefix + "\uffff", key=key)
+        return [by_seq[q] for q in self.numbers[lo:hi]]
+
+    # Students whose name starts with the (lowercase) prefix, found with two binary searches
+    def name_prefix(self, prefix):
+        index, key = self.sorted["name"], self.index_key("name")
+        lo = bisect.bisect_left(index, (prefix, -1), key=key)
+        hi = bisect.bisect_left(index, (prefix + "\uffff", -1), key=key)
+        return [self.by_seq[q] for q in index[lo:hi]]
+
+    # Students in the order of a sort menu mode → a view over the maintained index, nothing is re-sorted
+    def sorted_view(self, mode):
+        name, reverse = self.SORT_MODES[mode]
+        return SortedView(self, name, reverse)
+
+    # seq → (key, seq) for one sort index (what bisect compares against)
+    def index_key(self, name):
+        key, by_seq = self.SORT_KEYS[name], self.by_seq
+        return lambda q: (key(by_seq[q]), q)
+
+    # Appends records while other threads read the store (background loading). The number, search
+    # and stats indexes take them at once; the sort indexes only when `sort` is set (or at the next
+    # sort_pending / edit), so a big load does not re-merge them for every batch.
+    # search_index=False → no trigrams either (searches scan) → for records whose indexes arrive
+    # prebuilt from the snapshot afterwards (adopt).
+    def extend(self, students, sort=True, search_index=True):
+        with self.lock:
+            for s in students:
+                self._append(s, search_index)
+        if sort:
+            self.sort_pending()
+
+    # Takes prebuilt indexes (the snapshot's) for the records appended so far, instead of sorting and
+    # tokenising them: (number index, {sort index name: seqs}, {trigram: seqs}). None, or indexes
+    # that don't cover exactly these records → they are built from the records after all.
+    def adopt(self, indexes=None):
+        with self.lock:
+            n = len(self.by_seq)
+            if indexes is not None:
+                numbers, sorted_, postings = indexes
+                if (len(numbers) != n or n != len(self.by_number)
+                        or any(len(sorted_.get(name, ())) != n for name in self.SORT_KEYS)):
+                    indexes = None
+            if indexes is not None:
+                self.numbers = numbers
+                self.sorted = {name: sorted_[name] for name in self.SORT_KEYS}
+                self.ngrams.postings = postings
+                self.sorted_upto = n
+            else:
+                if self.ngrams_pending:
+                    self.ngrams = NGramIndex()
+                    for s in self:
+                        self.ngrams.add(s.seq, s.number.lower(), s.name.lower())
+                self._sort_tail()
+            self.ngrams_pending = False
+
+    # Merges the records appended since the last sort into the sort indexes. The merge runs outside
+    # the lock and the new arrays are swapped in whole, so readers never see a half-built index.
+    # An edit in the meantime has already merged them itself (_sort_tail) → the result is dropped.
+    def sort_pending(self):
+        with self.lock:
+            version, start, end = self.version, self.sorted_upto, len(self.by_seq)
+            numbers, indexes = self.numbers, dict(self.sorted)
+        if start == end:
+            return
+
+        numbers, indexes = self._merged(numbers, indexes, start, end)
+        with self.lock:
+            if self.version == version:
+                self.numbers = numbers
+                self.sorted.update(indexes)
+                self.sorted_upto = end
+
+    # Bulk load → records are appended in file order and every index is sorted once at the end
+    # (instead of one binary insert per record per index)
+    def _load(self, students):
+        for s in students:
+            self._append(s)
+        self._sort_tail()
+
+    def _append(self, s, search_index=True):
+        if s.number in self.by_number:
+            raise KeyError(f"Student number {s.number} already exists")
+        self.version += 1
+        s.version = self.version
+        s.seq = len(self.by_seq)
+        self.by_number[s.number] = s
+        self.by_seq.append(s)
+        if search_index:
+            self.ngrams.add(s.seq, s.number.lower(), s.name.lower())
+        else:
+            self.ngrams_pending = True
+        self.stats.add(s)
+
+    # Index arrays for a snapshot, with seqs renumbered 0..n-1 in file order (the order the snapshot
+    # stores the records in) → (records, number index, {sort index: seqs}, {trigram: seqs}).
+    # Copied under the lock, so the snapshot can be written while the GUI goes on.
+    def export_indexes(self):
+        with self.lock:
+            if self.ngrams_pending:
+                self.adopt()
+            self._sort_tail()
+            students = [s for s in self.by_seq if s is not None]
+            if len(students) == len(self.by_seq):
+                remap = array.array    # no deleted seqs → the arrays are copied as they are
+            else:
+                pos = array.array("i", bytes(4 * len(self.by_seq)))
+                for i, s in enumerate(students):
+                    pos[s.seq] = i
+
+                def remap(code, seqs):
+                    return array.array(code, [pos[q] for q in seqs])    # order-preserving → still sorted
+            numbers = remap("i", self.numbers)
+            sorted_ = {name: remap("i", self.sorted[name]) for name in self.SORT_KEYS}
+            postings = {g: remap("i", seqs) for g, seqs in self.ngrams.postings.items()}
+        return students, numbers, sorted_, postings
+
+    # Sorts any records still waiting from extend() into the indexes (the caller holds the lock)
+    def _sort_tail(self):
+        end = len(self.by_seq)
+        if self.sorted_upto < end:
+            self.numbers, indexes = self._merged(self.numbers, self.sorted, self.sorted_upto, end)
+            self.sorted.update(indexes)
+            self.sorted_upto = end
+
+    # New index arrays with seqs [start, end) merged in. The old arrays are already sorted, so
+    # Timsort only sorts the new seqs and merges the two runs; sorted() is stable → equal keys stay
+    # in seq (file) order.
+    def _merged(self, numbers, indexes, start, end):
+        by_seq = self.by_seq
+        seqs = [q for q in range(start, end) if by_seq[q] is not None]
+        numbers = array.array("i", sorted(itertools.chain(numbers, seqs), key=lambda q: by_seq[q].number))
+        merged = {}
+        for name, key in self.SORT_KEYS.items():
+            merged[name] = array.array("i", sorted(itertools.chain(indexes[name], seqs),
+                                                   key=lambda q: key(by_seq[q])))
+        return numbers, merged
+
+    # Adds / removes one record in every secondary index
+    def _index(self, student):
+        seq = student.seq
+        bisect.insort(self.numbers, seq, key=lambda q: self.by_seq[q].number)
+        for name, key in self.SORT_KEYS.items():
+            index = self.sorted[name]
+            index.insert(bisect.bisect_left(index, (key(student), seq), key=self.index_key(name)), seq)
+        self.ngrams.add(seq, student.number.lower(), student.name.lower())
+        self.stats.add(student)
+        self.sorted_upto = len(self.by_seq)
+
+    def _unindex(self, student):
+        seq = student.seq
+        self._drop(self.numbers, student.number, lambda q: self.by_seq[q].number)
+        for name, key in self.SORT_KEYS.items():
+            self._drop(self.sorted[name], (key(student), seq), self.index_key(name))
+        self.ngrams.remove(seq, student.number.lower(), student.name.lower())
+        self.stats.remove(student)
+
+    @staticmethod
+    def _drop(index, target, key):
+        i = bisect.bisect_left(index, target, key=key)
+        if i < len(index) and key(index[i]) == target:
+            del index[i]
+
+
+# Turns the 6 text fields of one marks line into a compact record tuple
+# (number, name, cw1, cw2, cw3, exam) → raises ValueError with a readable reason
+def parse_marks_fields(parts):
+    if len(parts) != 6:
+        raise ValueError(f"expected 6 fields, found {len(parts)}")
+
+    num, name, c1, c2, c3, exam = (p.strip() for p in parts)
+    if not num or not name:
+        raise ValueError("missing student number or name")
+    try:
+        return (num, name, int(c1), int(c2), int(c3), int(exam))
+    except ValueError:
+        raise ValueError("marks must be whole numbers") from None
+
+
+# Streaming marks-file parser → yields one record at a time so huge files never sit in memory as a list.
+# Bad lines are reported in `errors` as (line number, line text, reason) instead of being silently dropped.
+# `seen` (a set) → a student number already used on an earlier line is reported and skipped too.
+def parse_marks_lines(lines, errors=None, seen=None):
+    for line_no, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text:
+            continue
+        if line_no == 1 and text.isdigit():
+            continue    # first line holds the number of students
+
+        try:
+            row = parse_marks_fields(text.split(","))
+        except ValueError as err:
+            if errors is not None:
+                errors.append((line_no, text, str(err)))
+            continue
+
+        if seen is not None:
+            if row[0] in seen:
+                if errors is not None:
+                    errors.append((line_no, text, "duplicate student number (the first one is kept)"))
+                continue
+            seen.add(row[0])
+        yield row
+
+
+# Raised by validate_student_fields → title + message are shown as-is in the error popup
+class StudentValidationError(ValueError):
+
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+
+
+# Raised when an edit was made from a version of the student that another instance has since changed
+# (or deleted) in a way the edit cannot be merged with. `current` is the record as it is now (or None).
+class StudentConflictError(Exception):
+
+    def __init__(self, title, message, current=None):
+        super().__init__(message)
+        self.title = title
+        self.current = current
+
+
+FIELD_LABELS = ("Student Number", "Name", "CW1", "CW2", "CW3", "Exam")
+
+
+# Optimistic concurrency check for one edit → the row to save (None for a delete).
+# `expected` is the record the user started from; when the stored record has moved on since
+# (another version), a field only one side changed is taken from that side, and a field both sides
+# changed to different values is a conflict. Deletes are only allowed on the version the user saw.
+def resolve_edit(number, current, expected, row=None):
+    if expected is None:
+        return row    # no version to check against → plain overwrite
+    if current is None:
+        raise StudentConflictError("Student Removed",
+                                   f"Student {number} was deleted or renumbered by another user.")
+    if current.version == expected.version or current.row == expected.row:
+        return row
+    if row is None:
+        raise StudentConflictError("Student Changed",
+                                   f"Student {number} was changed by another user after you selected it.\n"
+                                   "Please check the new values and try again.", current)
+
+    merged, clashes = [], []
+    for label, base, theirs, ours in zip(FIELD_LABELS, expected.row, current.row, row):
+        if ours == base or ours == theirs:
+            merged.append(theirs)
+        elif theirs == base:
+            merged.append(ours)
+        else:
+            merged.append(ours)
+            clashes.append(f"{label}: yours {ours}, theirs {theirs}")
+    if clashes:
+        raise StudentConflictError("Update Conflict",
+                                   f"Student {number} was changed by another user while you were editing:\n"
+                                   + "\n".join(clashes), current)
+    return tuple(merged)
+
+
+# Add-student validation rules (shared by the Add form and the bulk CSV import).
+# Returns the (number, name, cw1, cw2, cw3, exam) row or raises StudentValidationError.
+# Whether the number is already taken is checked by the caller against the store.
+def validate_student_fields(num, name, cw1, cw2, cw3, exam):
+    num, name = num.strip(), name.strip()
+    marks = [m.strip() for m in (cw1, cw2, cw3, exam)]
+
+    #Empty field validation
+    if num == "" or name == "" or any(m == "" for m in marks):
+        raise StudentValidationError("Missing Information",
+                                     "Please fill all the fields before saving.")
+
+    #Student Number validation
+    if not num.isdigit():
+        raise StudentValidationError("Invalid Student Number",
+                                     "Student Number must contain digits only.")
+
+    #Name validation
+    if any(ch.isdigit() for ch in name):
+        raise StudentValidationError("Invalid Name",
+                                     "Name must contain letters only, not numbers.")
+    if "," in name:    # commas separate the fields in the marks file
+        raise StudentValidationError("Invalid Name",
+                                     "Name cannot contain commas.")
+
+    #Marks must be valid numbers
+    try:
+        marks = [int(m) for m in marks]
+    except ValueError:
+        raise StudentValidationError("Invalid Marks",
+                                     "Marks must be numbers only (0–100).") from None
+
+    #Marks 0–100 range validation
+    if any(not (0 <= m <= 100) for m in marks):
+        raise StudentValidationError("Invalid Marks",
+                                     "All marks must be between 0 and 100.")
+
+    return (num, name, *marks)
+
+
+# Validates one chunk of CSV lines (runs inside a worker process).
+# Takes [(line number, fields)] and returns ([(line number, row)], [(line number, text, reason)]).
+# Bytes that are not UTF-8 arrive as U+FFFD (CsvImporter reads with errors="replace") → that row is rejected.
+def validate_csv_chunk(chunk):
+    valid, errors = [], []
+    for line_no, fields in chunk:
+        text = ",".join(fields)
+        if len(fields) != 6:
+            errors.append((line_no, text, f"expected 6 fields, found {len(fields)}"))
+            continue
+        if "\ufffd" in text:
+            errors.append((line_no, text, "not valid UTF-8 text"))
+            continue
+        try:
+            valid.append((line_no, validate_student_fields(*fields)))
+        except StudentValidationError as err:
+            errors.append((line_no, text, str(err)))
+    return valid, errors
+
+
+# (inode, size, mtime_ns) of a file, or None when it does not exist → "has this file changed?"
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+# Advisory lock on a small file next to the marks file, shared by every instance that edits it
+# (fcntl.flock on Linux / macOS, msvcrt.locking on Windows). Only short critical sections run under
+# it → catch up + check + append one edit, rename the journal, swap in the compacted marks file;
+# never an fsync or a full file rewrite. Re-entrant within one process.
+class StudentFileLock:
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.depth = 0
+        self.thread_lock = threading.RLock()    # the OS lock belongs to the file, not the thread
+
+    def acquire(self, blocking=True):
+        if not self.thread_lock.acquire(blocking):
+            return False
+        try:
+            if self.depth == 0:
+                if self.fd is None:
+                    self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                if not self._os_lock(self.fd, blocking):
+                    self.thread_lock.release()
+                    return False
+        except BaseException:
+            self.thread_lock.release()
+            raise
+        self.depth += 1
+        return True
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            self._os_unlock(self.fd)
+        self.thread_lock.release()
+
+    def close(self):
+        with self.thread_lock:
+            if self.fd is not None and self.depth == 0:
+                os.close(self.fd)
+                self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @staticmethod
+    def _os_lock(fd, blocking):
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:   # LK_LOCK gives up after ~10 s → keep waiting
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+
+    @staticmethod
+    def _os_unlock(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+# Append-only journal next to the marks file → every add / delete / update is one small line
+# instead of rewriting the whole text file. The base file is rebuilt (compacted) on a background
+# thread once the journal grows past the threshold.
+#   + ,num,name,cw1,cw2,cw3,exam        → added student
+#   - ,num                              → deleted student
+#   ~ ,old_num,num,name,cw1,cw2,cw3,exam → updated student (number may change)
+class StudentJournal:
+
+    FIELD_COUNTS = {"+": 7, "-": 2, "~": 8}    # entry type → fields on its line (type included)
+
+    def __init__(self, base_file, threshold=64 * 1024):
+        self.base_file = base_file
+        self.journal_file = base_file + ".journal"
+        self.compact_file = self.journal_file + ".compacting"   # journal being folded into the base file
+        self.fold_file = base_file + ".compacted"    # note on the last compaction (see write_fold_note)
+        self.threshold = threshold    # journal size (bytes) that triggers a compaction
+        self.lock = threading.Lock()
+        self.file_lock = StudentFileLock(base_file + ".lock")    # every instance → edits + journal rename
+        self.compact_lock = StudentFileLock(base_file + ".compact.lock")    # one compaction at a time
+        self.compactor = None
+        # Bookkeeping for StudentFileWatcher, so it can tell this process's writes from everyone else's
+        self.own_writes = None        # [(inode, start, end)] journal bytes appended here (None → not watched)
+        self.rotated = {}             # journal inode → (size, own ranges) when this process renamed it
+        self.compacted = None         # (inode, size, mtime_ns) of the base file this process last wrote
+
+    @classmethod
+    def add_line(cls, row):
+        return "+," + cls.join_fields(row)
+
+    @classmethod
+    def delete_line(cls, number):
+        return "-," + cls.join_fields([number])
+
+    @classmethod
+    def update_line(cls, old_number, row):
+        return "~," + cls.join_fields([old_number, *row])
+
+    # Fields as one journal line → a comma or line break inside a field would shift every field
+    # after it (and the line would be dropped on replay), so it is refused before anything is saved
+    @staticmethod
+    def join_fields(values):
+        values = [str(v) for v in values]
+        if any("," in v or "\n" in v or "\r" in v for v in values):
+            raise StudentValidationError("Invalid Characters",
+                                         "Student numbers and names cannot contain commas or line breaks.")
+        return ",".join(values)
+
+    # Writes a batch of record lines in one write → cost depends on the edits, not the file size.
+    # sync=False leaves the fsync to sync() (StudentWriter does it outside the file lock).
+    def append(self, lines, sync=True):
+        data = "".join(line + "\n" for line in lines).encode()
+        with self.file_lock, self.lock:
+            with open(self.journal_file, "ab") as f:
+                f.write(data)
+                f.flush()
+                if sync:
+                    os.fsync(f.fileno())
+                if self.own_writes is not None:
+                    end = f.tell()    # O_APPEND → where our bytes really ended up
+                    self.own_writes.append((os.fstat(f.fileno()).st_ino, end - len(data), end))
+        self.maybe_compact()
+
+    # Flushes appended lines to disk (a journal already folded into the marks file was synced with it)
+    def sync(self):
+        for path in (self.compact_file, self.journal_file):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # Yields the current student records: base file with the journal applied on top.
+    # `limit` stops after the first N records, `errors` collects bad base-file lines.
+    def iter_rows(self, limit=None, errors=None):
+        overlay = {}
+        with self.file_lock, self.lock:    # no other instance renames the journal halfway through
+            for path in (self.compact_file, self.journal_file):
+                self.replay(path, overlay, errors)
+        yield from itertools.islice(self.merge(self.read_base(errors, unique=True), overlay), limit)
+
+    # Plays a journal file into {number: row or None (deleted)}
+    @classmethod
+    def replay(cls, path, overlay, errors=None):
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            cls.replay_lines(f, overlay, errors, os.path.basename(path))
+
+    # Unreadable entries are reported in `errors` as (line number, line text, reason). A torn last
+    # line (crash mid-write, no newline yet) is simply ignored → it was never confirmed as saved.
+    @classmethod
+    def replay_lines(cls, lines, overlay, errors=None, source="journal"):
+        for line_no, line in enumerate(lines, 1):
+            text = line.rstrip("\n")
+            if not text:
+                continue
+            parts = text.split(",")
+            op = parts[0]
+            try:
+                if op not in cls.FIELD_COUNTS:
+                    raise ValueError("unknown journal entry")
+                if len(parts) != cls.FIELD_COUNTS[op]:
+                    raise ValueError(f"expected {cls.FIELD_COUNTS[op]} fields, found {len(parts)}")
+                if op == "+":
+                    overlay[parts[1]] = parse_marks_fields(parts[1:])
+                elif op == "-":
+                    overlay[parts[1]] = None
+                else:
+                    row = parse_marks_fields(parts[2:])
+                    if parts[1] != parts[2]:
+                        overlay[parts[1]] = None
+                    overlay[parts[2]] = row
+            except ValueError as err:
+                if errors is not None and line.endswith("\n"):
+                    errors.append((line_no, text, f"{source}: {err}"))
+
+    # Records streamed from the base file (skips the count header + blank lines).
+    # unique → repeated student numbers are skipped (reported in `errors`), as the store needs them
+    # unique; compaction copies them through, so the file itself never loses a line.
+    def read_base(self, errors=None, unique=False):
+        if not os.path.exists(self.base_file):
+            return
+        with open(self.base_file) as f:
+            yield from parse_marks_lines(f, errors, set() if unique else None)
+
+    # Student count from the marks file's first line (None when it has none) → a progress estimate only
+    def base_count(self):
+        try:
+            with open(self.base_file) as f:
+                first = f.readline().strip()
+        except OSError:
+            return None
+        return int(first) if first.isdigit() else None
+
+    # Base rows keep their position, journal changes replace them, brand-new students go last
+    @staticmethod
+    def merge(rows, overlay):
+        overlay = dict(overlay)
+        for parts in rows:
+            if parts[0] in overlay:
+                parts = overlay.pop(parts[0])
+                if parts is None:
+                    continue
+            yield parts
+        for parts in overlay.values():
+            if parts is not None:
+                yield parts
+
+    # Starts a background compaction when the journal has grown past the threshold
+    def maybe_compact(self):
+        try:
+            size = os.path.getsize(self.journal_file)
+        except OSError:
+            return
+        if size < self.threshold or (self.compactor and self.compactor.is_alive()):
+            return
+
+        self.compactor = threading.Thread(target=self.compact, daemon=True)
+        self.compactor.start()
+
+    # Folds the journal into the base file. New edits keep going to a fresh journal meanwhile.
+    # Replaying a half-finished compaction on restart is safe because every journal line is idempotent.
+    # Only one instance compacts at a time; the others skip it (their edits go to the fresh journal).
+    def compact(self):
+        if not self.compact_lock.acquire(blocking=False):
+            return
+        try:
+            self.fold_journal()
+        finally:
+            self.compact_lock.release()
+
+    def fold_journal(self):
+        with self.file_lock, self.lock:
+            if not os.path.exists(self.compact_file):
+                if not os.path.exists(self.journal_file):
+                    return
+                if self.own_writes is not None:
+                    # the inode may be reused by the next journal → its ranges move with it
+                    st = os.stat(self.journal_file)
+                    mine = [w for w in self.own_writes if w[0] == st.st_ino]
+                    self.own_writes = [w for w in self.own_writes if w[0] != st.st_ino]
+                    self.rotated[st.st_ino] = (st.st_size, mine)
+                os.replace(self.journal_file, self.compact_file)
+            folded = file_signature(self.compact_file)
+            source = file_signature(self.base_file)
+
+        overlay = {}
+        self.replay(self.compact_file, overlay)
+
+        # first pass counts rows so the file keeps its "number of students" header line
+        count = sum(1 for _ in self.merge(self.read_base(), overlay))
+
+        tmp = self.base_file + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(f"{count}\n")
+            for parts in self.merge(self.read_base(), overlay):
+                f.write(",".join(map(str, parts)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())   # data is on disk before the rename makes it the real file
+        with self.file_lock, self.lock:
+            self.write_fold_note(folded, source, file_signature(tmp))    # a rename keeps inode, size, mtime
+            os.replace(tmp, self.base_file)
+            self.compacted = file_signature(self.base_file)
+            os.remove(self.compact_file)
+
+    # Records which journal (inode, size) was folded into which marks file, and what that became →
+    # another instance that had already applied every line of that journal (StudentFileWatcher) keeps
+    # its store instead of reloading. Written before the swap, so it is there once the new file is.
+    # Only a hint: when it is missing or unreadable, the other instances reload as before.
+    def write_fold_note(self, journal, base, compacted):
+        tmp = self.fold_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"journal": journal[:2], "base": base, "compacted": compacted}, f)
+        os.replace(tmp, self.fold_file)
+
+    # The last compaction as ((journal inode, size), marks file before, marks file after), or None
+    def read_fold_note(self):
+        try:
+            with open(self.fold_file) as f:
+                note = json.load(f)
+            base = tuple(note["base"]) if note["base"] else None
+            return tuple(note["journal"]), base, tuple(note["compacted"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+# Binary columnar snapshot of the loaded cohort (studentMarks_ext.txt.snap) → on the next launch the
+# columns are memory-mapped instead of re-parsing the text file and recomputing totals / grades, and
+# the store's indexes (number, sort orders, trigrams) are copied in as stored instead of being sorted
+# and tokenised again. What is left of a warm start is creating the record objects.
+# It is only used while the marks file + journal still have the same mtime and size as when it was written.
+class StudentSnapshot:
+
+    MAGIC = b"SMSNAP02"
+    HEADER = struct.Struct("<8sI6q")    # magic, row count, (mtime_ns, size) of the 3 source files
+    GRADES = "ABCDF"
+    # column name → array typecode (numbers / names are stored as offsets + one UTF-8 blob)
+    COLUMNS = (("cw1", "i"), ("cw2", "i"), ("cw3", "i"), ("exam", "i"),
+               ("total", "i"), ("percent", "d"), ("grade", "B"))
+    RECORD_BLOCKS = 4 + len(COLUMNS)
+    # number index + one per sort index + trigrams (UTF-8 blob, its offsets, posting offsets, postings)
+    INDEX_BLOCKS = 1 + len(StudentStore.SORT_KEYS) + 4
+    # what a truncated or corrupt file raises while it is read → the snapshot is dropped, the text parsed
+    ERRORS = (struct.error, ValueError, TypeError, IndexError, BufferError)
+
+    def __init__(self, base_file):
+        self.path = base_file + ".snap"
+        self.sources = (base_file, base_file + ".journal", base_file + ".journal.compacting")
+
+    # (mtime_ns, size) of each source file → any edit, append or compaction changes it
+    def signature(self):
+        sig = []
+        for path in self.sources:
+            try:
+                st = os.stat(path)
+                sig += [st.st_mtime_ns, st.st_size]
+            except OSError:
+                sig += [0, -1]
+        return tuple(sig)
+
+    # Writes the snapshot from student records (temp file + rename so a half-written file is never used).
+    # `signature` is what the source files looked like when the records were read from them → taken
+    # before reading, so an edit that lands in between makes the snapshot stale instead of hiding it.
+    def save(self, store, signature):
+        students, index_numbers, sorted_, postings = store.export_indexes()
+        num_offsets, name_offsets = array.array("I", [0]), array.array("I", [0])
+        numbers, names = bytearray(), bytearray()
+        cols = {key: array.array(code) for key, code in self.COLUMNS}
+
+        for s in students:
+            numbers += s.number.encode()
+            names += s.name.encode()
+            num_offsets.append(len(numbers))
+            name_offsets.append(len(names))
+            for key, _ in self.COLUMNS[:-1]:
+                cols[key].append(getattr(s, key))
+            cols["grade"].append(self.GRADES.index(s.grade))
+
+        grams, gram_offsets = bytearray(), array.array("I", [0])
+        seqs, seq_offsets = array.array("i"), array.array("I", [0])
+        for gram, posting in postings.items():
+            grams += gram.encode()
+            gram_offsets.append(len(grams))
+            seqs.extend(posting)
+            seq_offsets.append(len(seqs))
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(num_offsets) - 1, *signature))
+            for block in (num_offsets, bytes(numbers), name_offsets, bytes(names),
+                          *(cols[key] for key, _ in self.COLUMNS),
+                          index_numbers, *(sorted_[name] for name in StudentStore.SORT_KEYS),
+                          bytes(grams), gram_offsets, seq_offsets, seqs):
+                data = block.tobytes() if isinstance(block, array.array) else block
+                f.write(struct.pack("<q", len(data)))
+                f.write(data)
+        os.replace(tmp, self.path)
+
+    # (magic, row count, source signature) from the file header, or None when it can't be read
+    def read_header(self):
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(self.HEADER.size)
+        except OSError:
+            return None
+        if len(head) != self.HEADER.size:
+            return None
+        magic, count, *sig = self.HEADER.unpack(head)
+        return magic, count, tuple(sig)
+
+    # True when the snapshot exists and was written from the current marks file + journal
+    def is_fresh(self):
+        head = self.read_header()
+        return head is not None and head[0] == self.MAGIC and head[2] == self.signature()
+
+    # Fresh and complete → a fresh snapshot that fails check() is deleted, so it is rewritten from the
+    # text file on this load instead of being tried again on every launch
+    def usable(self):
+        if not self.is_fresh():
+            return False
+        try:
+            self.check()
+            return True
+        except (OSError, *self.ERRORS):
+            self.drop()
+            return False
+
+    # Deletes the snapshot file (a missing one is fine)
+    def drop(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    # Number of students stored in the snapshot (0 when there is none)
+    def row_count(self):
+        head = self.read_header()
+        return head[1] if head and head[0] == self.MAGIC else 0
+
+    # The first `count` length-prefixed blocks after the header → memoryview slices, nothing is copied.
+    # A block running past the end of the file → ValueError (a slice would just come back short).
+    def blocks(self, mm, view, count):
+        pos = self.HEADER.size
+        blocks = []
+        for _ in range(count):
+            (size,) = struct.unpack_from("<q", mm, pos)
+            pos += 8
+            if size < 0 or pos + size > len(mm):
+                raise ValueError("snapshot block runs past the end of the file")
+            blocks.append(view[pos:pos + size])
+            pos += size
+        return blocks
+
+    # Checks the block sizes against the row count and the last offset of each blob → raises one of
+    # ERRORS for a truncated or corrupt file. Only sizes are compared, so it costs the same for any cohort.
+    def check(self):
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            blocks = ()
+            try:
+                magic, count, *_ = self.HEADER.unpack_from(mm, 0)
+                if magic != self.MAGIC:
+                    raise ValueError("not a student snapshot")
+                blocks = self.blocks(mm, view, self.RECORD_BLOCKS + self.INDEX_BLOCKS)
+                sizes = [len(b) for b in blocks]
+
+                def last_offset(block):
+                    return struct.unpack_from("<I", block, len(block) - 4)[0]
+
+                expected = [4 * (count + 1), None, 4 * (count + 1), None,
+                            *(count * array.array(code).itemsize for _, code in self.COLUMNS),
+                            *[4 * count] * (1 + len(StudentStore.SORT_KEYS))]
+                if any(e is not None and e != got for e, got in zip(expected, sizes)):
+                    raise ValueError("snapshot columns do not match its row count")
+                if last_offset(blocks[0]) != sizes[1] or last_offset(blocks[2]) != sizes[3]:
+                    raise ValueError("snapshot text offsets do not match its text")
+                if (sizes[-3] != sizes[-2] or last_offset(blocks[-3]) != sizes[-4]
+                        or 4 * last_offset(blocks[-2]) != sizes[-1]):
+                    raise ValueError("snapshot search index is incomplete")
+            finally:
+                for block in (*blocks, view):
+                    block.release()
+
+    # Yields student records straight from the mapped columns (no text parsing, no grading)
+    def iter_students(self):
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # every view is released in finally, also when the caller stops early (islice, close(),
+            # an exception) → otherwise closing the mmap fails with "exported pointers exist"
+            view = memoryview(mm)
+            blocks = casts = ()
+            try:
+                _, count, *_ = self.HEADER.unpack_from(mm, 0)
+                blocks = self.blocks(mm, view, self.RECORD_BLOCKS)
+                casts = [blocks[0].cast("I"), blocks[2].cast("I"),
+                         *(block.cast(code) for block, (_, code) in zip(blocks[4:], self.COLUMNS))]
+
+                num_offsets, numbers = casts[0], blocks[1]
+                name_offsets, names = casts[1], blocks[3]
+                cw1, cw2, cw3, exam, total, percent, grade = casts[2:]
+
+                for i in range(count):
+                    yield StudentRecord(
+                        str(numbers[num_offsets[i]:num_offsets[i + 1]], "utf-8"),
+                        str(names[name_offsets[i]:name_offsets[i + 1]], "utf-8"),
+                        cw1[i], cw2[i], cw3[i], exam[i],
+                        cw1[i] + cw2[i] + cw3[i], total[i], percent[i], self.GRADES[grade[i]])
+            finally:
+                for block in (*casts, *blocks, view):
+                    block.release()
+
+    # The stored indexes, copied out of the mapped file (one memcpy per array) → what
+    # StudentStore.adopt takes for the records iter_students yields
+    def read_indexes(self):
+        def ints(block):
+            values = array.array("i")
+            values.frombytes(block)
+            return values
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            blocks = casts = ()
+            try:
+                blocks = self.blocks(mm, view, self.RECORD_BLOCKS + self.INDEX_BLOCKS)[self.RECORD_BLOCKS:]
+                numbers, *sort_blocks = [ints(b) for b in blocks[:1 + len(StudentStore.SORT_KEYS)]]
+                casts = [blocks[-3].cast("I"), blocks[-2].cast("I")]
+                grams, (gram_offsets, seq_offsets) = blocks[-4], casts
+                seqs = ints(blocks[-1])
+
+                postings = {}
+                for i in range(len(gram_offsets) - 1):
+                    gram = str(grams[gram_offsets[i]:gram_offsets[i + 1]], "utf-8")
+                    postings[gram] = seqs[seq_offsets[i]:seq_offsets[i + 1]]
+            finally:
+                for block in (*casts, *blocks, view):
+                    block.release()
+        return numbers, dict(zip(StudentStore.SORT_KEYS, sort_blocks)), postings
+
+
+# Write-behind saver → edits are appended to the journal straight away (a short write under the
+# file lock, so every instance sees them in the order they were checked), and a worker thread makes
+# them durable: edits that arrive close together share one fsync, and the result is handed back to
+# the Tk thread through a queue polled with root.after.
+# `root` is anything with .after(ms, callback) (the Tk root); without one, call poll_results yourself.
+class StudentWriter:
+
+    def __init__(self, journal, root=None, on_saved=None, delay=0.25):
+        self.journal = journal
+        self.root = root
+        self.on_saved = on_saved     # called on the Tk thread as on_saved(count, error)
+        self.delay = delay           # seconds to wait for more edits before syncing
+        self.pending = queue.Queue()
+        self.results = queue.Queue()
+
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+        if self.root is not None:
+            self.root.after(100, self.poll_results)
+
+    # Appends journal lines (no fsync) and queues them for the next sync. The append happens here, on
+    # the caller's thread → when it fails the OSError goes straight to the caller (the edit is not
+    # applied); only a failed sync is reported later through on_saved.
+    def submit(self, lines):
+        lines = list(lines)
+        self.journal.append(lines, sync=False)
+        self.pending.put(len(lines))
+
+    # Worker loop: wait for one edit, collect any that follow within `delay`, sync them together
+    def run(self):
+        while True:
+            count = self.pending.get()
+            if count is None:
+                self.pending.task_done()
+                return
+
+            taken, stop = 1, False
+            while True:
+                try:
+                    more = self.pending.get(timeout=self.delay)
+                except queue.Empty:
+                    break
+                taken += 1
+                if more is None:
+                    stop = True
+                    break
+                count += more
+
+            try:
+                self.journal.sync()
+                self.results.put((count, None))
+            except OSError as err:
+                self.results.put((count, err))
+            for _ in range(taken):
+                self.pending.task_done()
+
+            if stop:
+                return
+
+    # Runs on the Tk thread → reports finished syncs back to the GUI
+    def poll_results(self):
+        while True:
+            try:
+                count, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.on_saved:
+                self.on_saved(count, error)
+        if self.root is not None:
+            self.root.after(100, self.poll_results)
+
+    # Blocks until every edit submitted so far is on disk (or has failed)
+    def flush(self):
+        self.pending.join()
+
+    # Syncs whatever is still pending (used when the window closes)
+    def close(self):
+        self.pending.put(None)
+        self.worker.join()
+
+
+# Bulk CSV import → streams the file in chunks, validates the chunks in a process pool with the
+# same rules as the Add form, and hands the valid rows back for one batched commit.
+# Runs on a background thread; wait on `done` (or poll it with root.after in the GUI).
+class CsvImporter:
+
+    def __init__(self, path, chunk_size=5000, workers=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 2
+        self.valid = []      # (line number, row) in file order
+        self.invalid = []    # (line number, line text, reason) → rows that failed validation
+        self.errors = []     # invalid rows + numbers already taken, by line (set by new_rows)
+        self.done = threading.Event()
+        self.failure = None  # whatever stopped the whole import (OSError, csv.Error, a broken pool, …)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    # Yields [(line number, fields)] chunks; skips blank lines, a header row and the marks-file count line
+    def read_chunks(self):
+        with open(self.path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            reader = csv.reader(f)
+            chunk = []
+            for fields in reader:
+                if not any(c.strip() for c in fields):
+                    continue
+                if reader.line_num == 1 and self.is_header(fields):
+                    continue
+
+                chunk.append((reader.line_num, fields))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    # "Number,Name,CW1,..." style first line, or the count line the marks files start with
+    @staticmethod
+    def is_header(fields):
+        if len(fields) == 1:
+            return fields[0].strip().isdigit()
+        return not fields[0].strip().isdigit() and not any(c.strip().isdigit() for c in fields[2:])
+
+    def run(self):
+        # imported here so the core module itself stays quick to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                # keep only a few chunks in flight so the CSV is never fully in memory
+                in_flight = []
+                for chunk in self.read_chunks():
+                    in_flight.append(pool.submit(validate_csv_chunk, chunk))
+                    if len(in_flight) >= self.workers * 2:
+                        self.collect(in_flight.pop(0))
+                for future in in_flight:
+                    self.collect(future)
+        except Exception as err:    # unreadable file, broken worker pool, … → nothing is imported
+            self.failure = err
+        finally:
+            self.done.set()
+
+    def collect(self, future):
+        valid, errors = future.result()
+        self.valid.extend(valid)
+        self.invalid.extend(errors)
+
+    # Drops rows whose number is already in the store or earlier in the file → [(row)] to commit.
+    # Safe to call again (e.g. after another marker added some of them) → `errors` is rebuilt each time.
+    def new_rows(self, store):
+        rows, seen, taken = [], set(), []
+        for line_no, row in self.valid:
+            num = row[0]
+            if num in store or num in seen:
+                taken.append((line_no, ",".join(map(str, row)),
+                              "a student with this number already exists"))
+                continue
+            seen.add(num)
+            rows.append(row)
+        self.errors = sorted(self.invalid + taken)
+        return rows
+
+    # Writes the error report next to the CSV (returns its path, or None when there were no errors)
+    def write_report(self):
+        if not self.errors:
+            return None
+        report = os.path.splitext(self.path)[0] + "_import_errors.txt"
+        with open(report, "w", encoding="utf-8") as f:
+            for line_no, text, reason in self.errors:
+                f.write(f"Line {line_no}: {reason} → {text}\n")
+        return report
+
+
+# Streaming export → writes the students of one view (full list, search result or sort order, from
+# memory or SQLite) to CSV or JSON Lines on a background thread, with the computed coursework, total,
+# percent and grade. Records come from a generator one at a time and go straight to the file, so even
+# a 1M-row export holds one row (one SQLite page) of output at a time. Written under a temporary name
+# and renamed at the end → a failed or cancelled export leaves nothing behind.
+# Poll `done` / `written` with root.after, like CsvImporter.
+class StudentExporter:
+
+    FIELDS = ("number", "name", "cw1", "cw2", "cw3", "exam", "coursework", "total", "percent", "grade")
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}    # file extension → format
+
+    def __init__(self, rows, path, fmt=None):
+        self.rows = rows          # list of records, SortedView or SqliteView (what the table shows)
+        self.path = path
+        self.fmt = fmt or self.FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+        self.total = len(rows)
+        self.written = 0          # rows written so far (read by the GUI for the progress bar)
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self.failure = None       # OSError / sqlite3.Error that stopped the export
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    # Students of the view in order → views stream themselves (index copy / SQLite cursor), lists are
+    # already a fixed result
+    def records(self):
+        stream = getattr(self.rows, "stream", None)
+        return stream() if stream else iter(self.rows)
+
+    # One tuple of output values per student (a mark out of 160 has at most 3 decimals as a percent)
+    def values(self):
+        for s in self.records():
+            yield (s.number, s.name, s.cw1, s.cw2, s.cw3, s.exam,
+                   s.coursework, s.total, round(s.percent, 3), s.grade)
+
+    def run(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                if self.fmt == "csv":
+                    writer = csv.writer(f)
+                    writer.writerow(self.FIELDS)
+                    write = writer.writerow
+                else:
+                    def write(values):
+                        f.write(json.dumps(dict(zip(self.FIELDS, values))) + "\n")
+
+                for values in self.values():
+                    if self.cancelled.is_set():
+                        break
+                    write(values)
+                    self.written += 1
+
+            if self.cancelled.is_set():
+                os.remove(tmp)
+            else:
+                os.replace(tmp, self.path)
+        except (OSError, sqlite3.Error) as err:
+            self.failure = err
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+        finally:
+            self.done.set()
+
+
+# Background search → queries run on a worker thread, only the newest one matters.
+# Older queries still waiting are skipped, results of superseded queries are thrown away, and
+# recent answers are cached as (query, dataset version) → the matching records. The records are
+# fetched on the worker thread too (for SQLite that is the slow part), so the Tk thread only draws them.
+# Like StudentWriter, `root` only needs .after(ms, callback).
+class SearchWorker:
+
+    def __init__(self, store, root, on_result, cache_size=64):
+        self.store = store
+        self.root = root
+        self.on_result = on_result    # called on the Tk thread as on_result(query, records)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.generation = 0           # id of the newest query; anything older is superseded
+        self.pending = queue.Queue()
+        self.results = queue.Queue()
+
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+        self.root.after(50, self.poll_results)
+
+    def submit(self, query):
+        self.generation += 1
+        self.pending.put((self.generation, query))
+
+    # Drops whatever is in flight (e.g. the search box was cleared)
+    def cancel(self):
+        self.generation += 1
+
+    def run(self):
+        while True:
+            gen, query = self.pending.get()
+            # jump straight to the newest query in the queue
+            while True:
+                try:
+                    gen, query = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+            if gen != self.generation:
+                continue
+
+            key = (query, self.store.version)
+            records = self.cache.get(key)
+            if records is None:
+                records = self.store.search(query)
+                self.cache[key] = records
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+
+            if gen == self.generation:
+                self.results.put((gen, query, records))
+
+    # Runs on the Tk thread → posts only the latest result to the table. A result that an edit made
+    # out of date is replaced soon after: the GUI submits the query again when the data changes.
+    def poll_results(self):
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest and latest[0] == self.generation:
+            _, query, records = latest
+            self.on_result(query, records)
+        self.root.after(50, self.poll_results)
+
+
+# Background loader → reads the cohort on a worker thread and adds it to the store the GUI is already
+# showing, so the first rows appear straight away and search / sort / stats work on whatever has
+# arrived so far. Records go into the store `batch` at a time (the first batch is small); the sort
+# indexes are merged in each time the loaded part has doubled and once more at the end, which costs
+# about one extra sort in total instead of one per batch.
+# Progress reaches the Tk thread through a queue polled with root.after, like StudentWriter.
+class StudentLoader:
+
+    def __init__(self, records, store, root, on_progress, total=None, on_loaded=None,
+                 first=1000, batch=10000, indexes=None, fallback=None):
+        self.records = records          # iterator of StudentRecord (snapshot columns or parsed text)
+        self.indexes = indexes          # callable → prebuilt indexes for the records (snapshot), or None
+        self.fallback = fallback        # callable → parsed text records, used when the snapshot is corrupt
+        self.store = store
+        self.root = root
+        self.on_progress = on_progress  # called on the Tk thread as on_progress(loaded, total, done, error)
+        self.total = total              # expected number of students (None → unknown)
+        self.on_loaded = on_loaded      # runs on the worker thread after the last batch (snapshot, watcher)
+        self.first = first
+        self.batch = batch
+        self.results = queue.Queue()
+        self.done = threading.Event()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.worker.start()
+        if self.root is not None:
+            self.root.after(20, self.poll_results)
+
+    def run(self):
+        error = None
+        try:
+            try:
+                self.fill()
+            except StudentSnapshot.ERRORS:
+                if self.fallback is None:
+                    raise
+                # snapshot broke part way → start over from the text file with an empty store
+                self.store.reset()
+                self.records, self.indexes, self.fallback = self.fallback(), None, None
+                self.fill()
+            if self.on_loaded:
+                self.on_loaded()
+        except (OSError, KeyError, *StudentSnapshot.ERRORS) as err:
+            error = err
+        finally:
+            self.done.set()
+            self.results.put((len(self.store), True, error))
+
+    # Adds every record to the store, a batch at a time, and finishes its indexes
+    def fill(self):
+        # prebuilt indexes → records only go into the number / stats indexes while they arrive
+        # (searches scan meanwhile, sorted views fill in at the end), then the indexes are adopted
+        prebuilt = self.indexes is not None
+        size, sort_at = self.first, self.first
+        while True:
+            chunk = list(itertools.islice(self.records, size))
+            if not chunk:
+                break
+            loaded = len(self.store.by_seq) + len(chunk)
+            sort = not prebuilt and loaded >= sort_at
+            if sort:
+                sort_at = loaded * 2
+            self.store.extend(chunk, sort=sort, search_index=not prebuilt)
+            self.results.put((len(self.store), False, None))
+            size = self.batch
+        if prebuilt:
+            self.store.adopt(self.indexes())
+        else:
+            self.store.sort_pending()
+
+    # Runs on the Tk thread → reports the newest count (a few batches may arrive between two polls).
+    # Polls quickly until the first rows are in, then four times a second.
+    def poll_results(self):
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+        if latest:
+            loaded, done, error = latest
+            self.on_progress(loaded, self.total, done, error)
+            if done:
+                return
+        self.root.after(250 if latest or len(self.store) else 20, self.poll_results)
+
+
+# Headless student repository → loading, grading, search, sort, statistics and persistence in one
+# object with no Tk / PIL dependency, so scripts, tests and benchmarks can use the same code as the GUIs
+class StudentRepository:
+
+    def __init__(self, path, use_snapshot=True):
+        self.path = path
+        self.journal = StudentJournal(path)
+        self.snapshot = StudentSnapshot(path) if use_snapshot else None
+        self.store = StudentStore()
+        self.writer = None        # optional StudentWriter → edits are synced to disk in the background
+        self.watcher = None       # StudentFileWatcher → other instances' changes (polled once started)
+        self.loader = None        # StudentLoader while a background load is running
+        self.loading = None       # (root, on_progress) of start_loading → reloads go the same way
+        self.load_errors = []     # (line number, line text, reason) from the last load
+        self.loaded_signatures = (None, None)    # marks file + journal as they were when loading started
+
+    # Loads the cohort → from the binary snapshot when it is still fresh, otherwise streamed from the text file
+    def load(self, limit=None):
+        self.load_errors = []
+        self.loaded_signatures = (file_signature(self.path), file_signature(self.journal.journal_file))
+        source = self.snapshot.signature() if self.snapshot else None    # before anything is read
+        self.store = self.load_snapshot() if limit is None else None
+        if self.store is None:
+            self.store = StudentStore(self.iter_records(limit, self.load_errors))
+            if limit is None:
+                self.save_snapshot(source)
+        if self.watcher is None:
+            self.watcher = StudentFileWatcher(self)
+        else:
+            self.watcher.track(*self.loaded_signatures)
+        self.journal.maybe_compact()
+        return self.store
+
+    # The cohort from the binary snapshot, or None when there is no usable one. A snapshot that only
+    # turns out to be corrupt while it is read is deleted too → load() parses the text and rewrites it.
+    def load_snapshot(self):
+        if not (self.snapshot and self.snapshot.usable()):
+            return None
+        try:
+            store = StudentStore()
+            store.extend(self.snapshot.iter_students(), sort=False, search_index=False)
+            store.adopt(self.snapshot.read_indexes())
+            return store
+        except StudentSnapshot.ERRORS:
+            self.snapshot.drop()
+            return None
+
+    # Same as load(), but the records are read on a worker thread (StudentLoader) → returns the store
+    # straight away, empty, and fills it in batches. on_progress(loaded, total, done, error) runs on
+    # the Tk thread; edits and start_watcher() should wait until it reports done.
+    def start_loading(self, root, on_progress):
+        self.loading = (root, on_progress)
+        self.load_errors = []
+        self.loaded_signatures = (file_signature(self.path), file_signature(self.journal.journal_file))
+        source = self.snapshot.signature() if self.snapshot else None    # before anything is read
+        self.store.reset()
+        indexes = None
+        if self.snapshot and self.snapshot.usable():
+            records, total, text = self.snapshot.iter_students(), self.snapshot.row_count(), False
+            indexes = self.snapshot.read_indexes
+        else:
+            records, total, text = self.iter_records(errors=self.load_errors), self.journal.base_count(), True
+
+        # worker thread, when the snapshot turns out to be corrupt while it is read → the text file instead
+        def fallback_records():
+            nonlocal text
+            self.snapshot.drop()
+            text = True
+            return self.iter_records(errors=self.load_errors)
+
+        def loaded():
+            if self.watcher is None:
+                self.watcher = StudentFileWatcher(self)
+            else:
+                self.watcher.track(*self.loaded_signatures)
+            self.loader = None    # watcher follows the new files first → edits catch up from there
+            if text:
+                self.save_snapshot(source)
+            self.journal.maybe_compact()
+
+        self.loader = StudentLoader(records, self.store, root, on_progress, total, on_loaded=loaded,
+                                    indexes=indexes, fallback=None if text else fallback_records)
+        self.loader.start()
+        return self.store
+
+    # Graded student records streamed from the marks file (+ journal), without building the store
+    def iter_records(self, limit=None, errors=None):
+        return GradingEngine.records(self.journal.iter_rows(limit, errors))
+
+    # Re-reads everything from disk into the same store (after the files were rewritten elsewhere)
+    def reload(self):
+        self.load_errors = []
+        self.loaded_signatures = (file_signature(self.path), file_signature(self.journal.journal_file))
+        self.store.reset(self.iter_records(errors=self.load_errors))
+        if self.watcher is not None:
+            self.watcher.track(*self.loaded_signatures)
+        return self.store
+
+    # Full re-read the watcher asked for → on a worker thread through StudentLoader, with the same
+    # progress reports as the first load, when the students were loaded that way; inline otherwise
+    # (a script using load() has no window to keep responsive). Edits are refused until it is done.
+    def start_reload(self):
+        if self.loader is not None:
+            return
+        if self.loading is None:
+            self.reload()
+        else:
+            self.start_loading(*self.loading)
+
+    # Applies rows changed on disk by someone else → {number: row or None (deleted)}.
+    # Goes straight to the store (the lines are already in the files). Returns (added, updated, removed).
+    def apply_changes(self, overlay):
+        added = updated = removed = 0
+        for num, row in overlay.items():
+            current = self.store.get(num)
+            if row is None:
+                if current is not None:
+                    self.store.remove(num)
+                    removed += 1
+            elif current is None:
+                self.store.add(GradingEngine.record(*row))
+                added += 1
+            elif current.row != row:
+                self.store.update(num, GradingEngine.record(*row))
+                updated += 1
+        return added, updated, removed
+
+    # Writes the binary snapshot for the next launch (a failure only means a slower next start).
+    # Skipped while a background load is still running → a half-loaded cohort is never saved.
+    # `signature` → the files the store was just read from; without one (closing after edits) the
+    # store first catches up with other instances under the file lock, and the files as they are then
+    # go in the header. Files that still moved (a tool not using the lock) → no snapshot this time.
+    def save_snapshot(self, signature=None):
+        if self.snapshot is None or self.loader is not None:
+            return
+        try:
+            if signature is None:
+                if self.watcher is None:
+                    return    # never loaded → nothing worth saving
+                with self.journal.file_lock:
+                    signature = self.snapshot.signature()
+                    self.catch_up()
+                    if self.snapshot.signature() != signature:
+                        return
+            self.snapshot.save(self.store, signature)
+        except (OSError, StudentConflictError):    # files rewritten elsewhere → the next launch parses
+            pass
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, number):
+        return self.store.get(number)
+
+    def search(self, query):
+        return self.store.search(query.strip().lower())
+
+    def sorted_view(self, mode):
+        return self.store.sorted_view(mode)
+
+    @property
+    def stats(self):
+        return self.store.stats
+
+    # CRUD → rows are (number, name, cw1, cw2, cw3, exam); the journal line is appended first, then
+    # memory is updated, so an append that fails (OSError) leaves the store as it was and the caller
+    # never reports an edit that is not on disk. Everything that could refuse the edit is therefore
+    # checked before the append: a row the journal cannot hold (StudentValidationError), a duplicate
+    # or missing number (KeyError, as before).
+    # Each edit runs under the file lock: catch up with other instances, check, append, apply → no
+    # instance can slip a change in between the check and the write. `expected` is the record the
+    # user started from (see resolve_edit).
+    def add(self, row):
+        record = GradingEngine.record(*row)
+        line = StudentJournal.add_line(record.row)
+        with self.journal.file_lock:
+            self.catch_up()
+            if record.number in self.store:
+                raise KeyError(f"Student number {record.number} already exists")
+            self.write([line])
+            self.store.add(record)
+        return record
+
+    # Bulk add (CSV import) → appended with store.extend, so the sort indexes take the whole batch in
+    # one merge instead of one binary insert per record per index. Every number is checked first →
+    # a KeyError (or a failed append) leaves the store and the journal untouched.
+    def add_many(self, rows):
+        records = list(GradingEngine.records(rows))
+        lines = [StudentJournal.add_line(record.row) for record in records]
+        with self.journal.file_lock:
+            self.catch_up()
+            numbers = set()
+            for r in records:
+                if r.number in self.store or r.number in numbers:
+                    raise KeyError(f"Student number {r.number} already exists")
+                numbers.add(r.number)
+            self.write(lines)
+            self.store.extend(records)
+
+    def update(self, old_number, row, expected=None):
+        with self.journal.file_lock:
+            self.catch_up()
+            row = resolve_edit(old_number, self.store.get(old_number), expected, row)
+            record = GradingEngine.record(*row)
+            line = StudentJournal.update_line(old_number, record.row)
+            if old_number not in self.store:
+                raise KeyError(old_number)
+            if record.number != old_number and record.number in self.store:
+                raise KeyError(f"Student number {record.number} already exists")
+            self.write([line])
+            self.store.update(old_number, record)
+        return record
+
+    def delete(self, number, expected=None):
+        with self.journal.file_lock:
+            self.catch_up()
+            resolve_edit(number, self.store.get(number), expected)
+            if number not in self.store:
+                raise KeyError(number)
+            self.write([StudentJournal.delete_line(number)])
+            record = self.store.remove(number)
+        return record
+
+    # Applies whatever other instances wrote since the last poll (the caller holds the file lock).
+    # While the students are being (re)loaded the store is not ready to check an edit against →
+    # StudentConflictError, nothing is saved.
+    def catch_up(self):
+        if self.loader is not None:
+            raise StudentConflictError("Students Loading",
+                                       "The students are still being loaded from disk.\n"
+                                       "Nothing was saved, please try again once loading has finished.")
+        if self.watcher is not None:
+            self.watcher.sync()
+
+    def write(self, lines):
+        if self.writer is not None:
+            self.writer.submit(lines)
+        else:
+            self.journal.append(lines)
+
+    # Saves edits in the background from now on (results are reported through root.after)
+    def start_writer(self, root, on_saved=None):
+        self.writer = StudentWriter(self.journal, root, on_saved=on_saved)
+        return self.writer
+
+    # Polls the files for changes made by other instances from now on (reported through root.after)
+    def start_watcher(self, root, on_change, interval=1000):
+        if self.watcher is None:
+            self.watcher = StudentFileWatcher(self)
+        self.watcher.start(root, on_change, interval)
+        return self.watcher
+
+    # Syncs pending edits and writes the snapshot for the next launch (after catching up with the
+    # edits other instances made since the last poll)
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.save_snapshot()
+
+
+
+# Live file watcher → polls the marks file and its journal (inode / size / mtime) with root.after and
+# brings the store up to date when another instance or tool changed them:
+#   journal grew               → only the new lines are replayed
+#   marks file grew (appended) → only the appended lines are parsed, upserted by student number
+#   anything rewritten         → one full reload (an editor saving, lines folded away before we read them)
+# Lines this process wrote itself are not applied (the store is already at or ahead of them); when
+# a foreign line and one of ours touch the same student, whichever comes later in the file wins.
+# A compaction only rewrites the marks file with lines the store has already seen → the marks file
+# this process's own compaction wrote is not reloaded, nor one where the journal fold note
+# (StudentJournal.write_fold_note) shows another instance folded exactly the journal we had read.
+# Full reloads go through repo.start_reload → on the loader's worker thread, outside the file lock.
+# Every repository has one, so edits can catch up (sync) before they are checked; polling starts with
+# start(). on_change(summary) runs on the Tk thread with {"added", "updated", "removed", "reloaded"}.
+class StudentFileWatcher:
+
+    TAIL_CHECK = 64    # bytes before the old end of the marks file that must be unchanged for an "append"
+    OWN = object()     # overlay marker → last written by this process, keep what the store has
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.journal = repo.journal
+        self.root = None
+        self.on_change = None
+        self.interval = 1000
+        self.reload_pending = False    # sync() found the files rewritten → reload scheduled on the Tk thread
+        self.track(*repo.loaded_signatures)
+
+    # Polling keeps running across reloads → starting it again only swaps the callback
+    def start(self, root, on_change, interval=1000):
+        polling = self.root is not None
+        self.root = root
+        self.on_change = on_change
+        self.interval = interval
+        if not polling:
+            self.root.after(self.interval, self.poll)
+
+    # Starts following the files from the given signatures (what the store was loaded from).
+    # The store now holds everything up to there → earlier byte ranges of our own no longer matter.
+    def track(self, base, log):
+        self.track_base(base)
+        self.log_ino = log[0] if log else None
+        self.log_offset = log[1] if log else 0
+        with self.journal.lock:
+            self.journal.own_writes = []
+
+    def track_base(self, base):
+        self.base = base
+        self.base_offset = base[1] if base else 0
+        self.base_tail = self.read_tail(self.base_offset) if base else b""
+        self.folded = None    # (inode, size) of a renamed journal read to its end, until the marks file moves
+
+    # Nothing is checked while the store is being reloaded (it is not following any file meanwhile)
+    def poll(self):
+        if self.repo.loader is None and not self.reload_pending:
+            try:
+                summary = self.check()
+            except OSError:
+                summary = None    # a file vanished mid-rename → look again next time
+            if summary:
+                if summary["reloaded"]:
+                    self.repo.start_reload()
+                self.on_change(summary)
+        self.root.after(self.interval, self.poll)
+
+    # Catches up right now (an edit is about to be checked, under the file lock) → the GUI hears
+    # about it on its next idle turn. A full reload is not run here: it is scheduled on the Tk thread
+    # and the edit is refused (StudentConflictError) → nothing waits on it under the lock.
+    def sync(self):
+        if self.reload_pending:
+            raise self.reloading()
+        try:
+            summary = self.check()
+        except OSError:
+            return None
+        if summary and summary["reloaded"] and self.root is None:
+            self.repo.start_reload()    # headless → no window to keep responsive
+        elif summary and summary["reloaded"]:
+            self.reload_pending = True
+            self.root.after(0, self.reload)
+            self.root.after(0, lambda: self.on_change(summary))
+            raise self.reloading()
+        elif summary and self.root is not None:
+            self.root.after(0, lambda: self.on_change(summary))
+        return summary
+
+    def reload(self):
+        self.reload_pending = False
+        self.repo.start_reload()
+
+    @staticmethod
+    def reloading():
+        return StudentConflictError("Students Reloading",
+                                    "Another marker rewrote the marks file, so the students are being "
+                                    "reloaded from disk.\nNothing was saved, please try again once "
+                                    "loading has finished.")
+
+    # One round of change detection → summary dict, or None when nothing changed.
+    # A full reload is only reported ({"reloaded": True}); the caller starts it.
+    def check(self):
+        j = self.journal
+        base_rows, overlay = {}, {}
+        reload = False
+        lost = None    # (inode, offset read) of a journal another instance folded away since last time
+        with j.lock:    # no append / journal rotation by this process while we look
+            own, rotated = j.own_writes, j.rotated
+            j.rotated = {}
+            log = file_signature(j.journal_file)
+
+            # 1. journal → tail the file we were following, or finish it if it was renamed.
+            # Same inode is not enough: a new journal can reuse the inode of the one compacted away.
+            if (log and log[0] == self.log_ino and self.log_ino not in rotated
+                    and log[1] >= self.log_offset):
+                if self.only_own(self.log_offset, log[1], [w for w in own if w[0] == self.log_ino]):
+                    self.log_offset = log[1]    # nothing but our own edits since last time → nothing to read
+                elif log[1] > self.log_offset:
+                    self.log_offset = self.read_journal(j.journal_file, self.log_ino, self.log_offset, own, overlay)
+            else:
+                # the journal we followed was renamed for compaction (or there was none yet, in which
+                # case any journal that was renamed since the last poll is one we never read)
+                prev = self.log_ino
+                old = file_signature(j.compact_file)
+                if old and (prev is None or old[0] == prev):
+                    # not folded into the marks file yet → read what is left of it
+                    mine = rotated[old[0]][1] if old[0] in rotated else own
+                    end = self.read_journal(j.compact_file, old[0], self.log_offset, mine, overlay)
+                    self.folded = (old[0], end)    # applied up to here → folding it changes nothing for us
+                else:
+                    unread = [v for ino, v in rotated.items() if prev is None or ino == prev]
+                    if prev is not None and prev not in rotated:
+                        lost = (prev, self.log_offset)    # somebody else folded it → did we see all of it?
+                    elif any(not self.only_own(self.log_offset, size, mine) for size, mine in unread):
+                        reload = True    # our own compaction took lines from others along with it
+                self.log_ino = log[0] if log else None
+                self.log_offset = 0
+                if log:
+                    self.log_offset = self.read_journal(j.journal_file, log[0], 0, own, overlay)
+            j.own_writes = [w for w in own if w[0] == self.log_ino and w[2] > self.log_offset]
+
+            # 2. marks file → appended lines, a compaction of lines already applied, or a rewrite.
+            # Looked at after the journal → a compaction finishing in between is seen from both sides.
+            base = file_signature(j.base_file)
+            if base != self.base:
+                if base is not None and base == j.compacted:
+                    self.track_base(base)    # written by this process from what the store already has
+                elif (base and self.base and base[0] == self.base[0] and base[1] > self.base_offset
+                      and self.read_tail(self.base_offset) == self.base_tail):
+                    self.base = base
+                    self.base_offset = self.read_base(self.base_offset, base_rows)
+                    self.base_tail = self.read_tail(self.base_offset)
+                elif self.folded_into(base, lost):
+                    self.track_base(base)    # another instance folded a journal we had fully applied
+                    lost = None
+                else:
+                    reload = True
+            if lost is not None:
+                reload = True    # lines we never saw went into the marks file
+
+        if reload:
+            return {"added": 0, "updated": 0, "removed": 0, "reloaded": True}
+
+        base_rows.update(overlay)    # journal lines are newer than marks-file lines
+        changes = {num: row for num, row in base_rows.items() if row is not self.OWN}
+        if not changes:
+            return None
+        added, updated, removed = self.repo.apply_changes(changes)
+        if not (added or updated or removed):
+            return None
+        return {"added": added, "updated": updated, "removed": removed, "reloaded": False}
+
+    # True when the marks file `base` is the last compaction's result, made from the marks file we
+    # follow plus a journal we had read to the end (`lost`, or the .compacting file we finished)
+    def folded_into(self, base, lost):
+        note = self.journal.read_fold_note()
+        return (note is not None and base is not None and note[2] == base and note[1] == self.base
+                and note[0] in (lost, self.folded))
+
+    # Replays the whole lines from `offset` on, in file order → new offset.
+    # Students last touched by one of this process's own byte ranges end up as OWN.
+    def read_journal(self, path, ino, offset, own, overlay):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino != ino:
+                raise FileNotFoundError(path)    # swapped between stat and open → next poll
+            f.seek(offset)
+            data = f.read()
+        end = offset + data.rfind(b"\n") + 1    # a line still being written waits for the next poll
+
+        pos = offset
+        mine = sorted((start, stop) for w_ino, start, stop in own
+                      if w_ino == ino and start >= offset and stop <= end)
+        for start, stop in mine + [(end, end)]:
+            StudentJournal.replay_lines(data[pos - offset:start - offset].decode().splitlines(), overlay)
+            ours = {}
+            StudentJournal.replay_lines(data[start - offset:stop - offset].decode().splitlines(), ours)
+            overlay.update(dict.fromkeys(ours, self.OWN))
+            pos = stop
+        return end
+
+    # True when every byte in [offset, size) of a rotated journal was written by this process
+    @staticmethod
+    def only_own(offset, size, mine):
+        written = sum(stop - start for _, start, stop in mine if start >= offset)
+        return written >= size - offset
+
+    # Parses the whole lines appended to the marks file after `offset` → {number: row}; returns new offset
+    def read_base(self, offset, rows):
+        with open(self.journal.base_file, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        text = data[:end].decode()
+        # the first appended line must not be mistaken for the count header
+        for row in parse_marks_lines([""] + text.splitlines()):
+            rows[row[0]] = row
+        return offset + end
+
+    # Last few bytes before `offset` → if they change, the file was rewritten, not appended to
+    def read_tail(self, offset):
+        try:
+            with open(self.journal.base_file, "rb") as f:
+                f.seek(max(0, offset - self.TAIL_CHECK))
+                return f.read(min(offset, self.TAIL_CHECK))
+        except OSError:
+            return b""
+
+
+# Live, read-only view of one SQLite ordering → same len() / slicing / iteration as SortedView,
+# but every page is one indexed query (ORDER BY … LIMIT … OFFSET …) instead of a list slice
+class SqliteView:
+
+    def __init__(self, store, order, where="", params=()):
+        self.store = store
+        self.order = order        # ORDER BY clause, always ending in seq so ties keep file order
+        self.where = where
+        self.params = tuple(params)
+        self.count = None         # (store version, row count) → COUNT(*) only reruns after an edit
+
+    def __len__(self):
+        if self.count is None or self.count[0] != self.store.version:
+            (n,), = self.store.query(f"SELECT COUNT(*) FROM students {self.where}", self.params)
+            self.count = (self.store.version, n)
+        return self.count[1]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step < 0:    # walks backwards → the same rows fetched forwards, then reversed
+                return self.page(stop + 1, start - stop)[::-1][::-step] if start > stop else []
+            if stop <= start:
+                return []
+            return self.page(start, stop - start)[::step]
+
+        if item < 0:
+            item += len(self)
+        rows = self.page(item, 1)
+        if not rows:
+            raise IndexError("student index out of range")
+        return rows[0]
+
+    def __iter__(self):
+        return iter(self.store.records(f"{self.where} ORDER BY {self.order}", self.params))
+
+    def page(self, offset, limit):
+        return self.store.records(f"{self.where} ORDER BY {self.order} LIMIT ? OFFSET ?",
+                                  self.params + (limit, offset))
+
+    # Records one by one through a cursor on a connection of its own → one consistent read (WAL keeps
+    # it stable while edits are committed) with only `page` rows fetched at a time. For worker threads.
+    def stream(self, page=5000):
+        conn = sqlite3.connect(self.store.db_file)
+        try:
+            cur = conn.execute(f"SELECT {self.store.columns} FROM students {self.where} "
+                               f"ORDER BY {self.order}", self.params)
+            while True:
+                rows = cur.fetchmany(page)
+                if not rows:
+                    return
+                for row in rows:
+                    yield StudentRecord(*row)
+        finally:
+            conn.close()
+
+
+# Cohort statistics answered by the database → count / mean / variance in one aggregate query
+# (cached until the next edit) and top / bottom students straight off the total index
+class SqliteStats:
+
+    def __init__(self, store):
+        self.store = store
+        self.cached = None        # (store version, count, mean, mean of squares)
+        self.ranked = None        # (store version, RankIndex)
+
+    def summary(self):
+        if self.cached is None or self.cached[0] != self.store.version:
+            (count, mean, squares), = self.store.query(
+                "SELECT COUNT(*), AVG(percent), AVG(percent * percent) FROM students")
+            self.cached = (self.store.version, count, mean or 0.0, squares or 0.0)
+        return self.cached
+
+    @property
+    def count(self):
+        return self.summary()[1]
+
+    @property
+    def mean(self):
+        return self.summary()[2]
+
+    @property
+    def total(self):
+        _, count, mean, _ = self.summary()
+        return count * mean
+
+    @property
+    def variance(self):
+        _, count, mean, squares = self.summary()
+        return max(0.0, squares - mean * mean) if count else 0.0
+
+    @property
+    def grades(self):
+        return Counter(dict(self.store.query("SELECT grade, COUNT(*) FROM students GROUP BY grade")))
+
+    # Rank index filled from one GROUP BY over the total index (one row per distinct total), rebuilt
+    # after an edit only when a rank is asked for → a table page ranks its rows without a query each
+    @property
+    def ranks(self):
+        if self.ranked is None or self.ranked[0] != self.store.version:
+            ranks = RankIndex()
+            for total, n in self.store.query("SELECT total, COUNT(*) FROM students GROUP BY total"):
+                ranks.add(total, n)
+            self.ranked = (self.store.version, ranks)
+        return self.ranked[1]
+
+    def rank(self, student):
+        return self.ranks.rank(student.total)
+
+    def percentile(self, student):
+        return self.ranks.percentile(student.total)
+
+    # k highest (or lowest) students by total; ties keep file order. Returns [] for an empty cohort.
+    def top(self, k=1):
+        return self.store.records("ORDER BY total DESC, seq LIMIT ?", (k,))
+
+    def bottom(self, k=1):
+        return self.store.records("ORDER BY total, seq LIMIT ?", (k,))
+
+
+# SQLite student store → drop-in for StudentStore (same methods, same StudentRecords) backed by
+# a table with indexes on number, name, percent and every other sort key. Lookups, duplicate checks,
+# edits and sorting are indexed queries; "contains" searches use an FTS5 trigram index when the
+# SQLite build has one (queries shorter than 3 letters, or builds without FTS5, fall back to LIKE).
+# SQLite's NOCASE and LIKE only fold ASCII letters → names are also stored lowercased by Python
+# (name_key, the same str.lower() StudentStore uses), so "é" finds "Élodie" in both backends.
+class SqliteStudentStore:
+
+    # column order = StudentRecord argument order
+    FIELDS = ("number", "name", "cw1", "cw2", "cw3", "exam",
+              "coursework", "total", "percent", "grade", "version")
+    COLUMNS = FIELDS + ("name_key",)    # what every write sets → the fields + the lowercased name
+    # sort index name → indexed SQL expression
+    SORT_COLUMNS = {
+        "name": "name_key",
+        "percent": "percent",
+        "number": "CAST(number AS INTEGER)",
+        "cw": "coursework",
+        "exam": "exam",
+        "total": "total",
+    }
+    SORT_MODES = StudentStore.SORT_MODES
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            seq INTEGER PRIMARY KEY,        -- display position (file order)
+            number TEXT NOT NULL UNIQUE,    -- UNIQUE → indexed lookups + duplicate checks
+            name TEXT NOT NULL,
+            cw1 INTEGER NOT NULL,
+            cw2 INTEGER NOT NULL,
+            cw3 INTEGER NOT NULL,
+            coursework INTEGER NOT NULL,
+            exam INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            percent REAL NOT NULL,
+            grade TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            name_key TEXT NOT NULL DEFAULT ''    -- name.lower() → name sort, prefix + LIKE search
+        );
+        DROP INDEX IF EXISTS students_name;    -- NOCASE name index of older databases
+        CREATE INDEX IF NOT EXISTS students_name_key ON students (name_key);
+        CREATE INDEX IF NOT EXISTS students_percent ON students (percent);
+        CREATE INDEX IF NOT EXISTS students_number_value ON students (CAST(number AS INTEGER));
+        CREATE INDEX IF NOT EXISTS students_coursework ON students (coursework);
+        CREATE INDEX IF NOT EXISTS students_exam ON students (exam);
+        CREATE INDEX IF NOT EXISTS students_total ON students (total);
+        CREATE INDEX IF NOT EXISTS students_version ON students (version);
+    """
+    # trigram full-text index over number + name, kept in sync by triggers
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5 (
+            number, name, content='students', content_rowid='seq', tokenize='trigram');
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts (rowid, number, name) VALUES (new.seq, new.number, new.name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, number, name)
+            VALUES ('delete', old.seq, old.number, old.name);
+        END;
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, number, name)
+            VALUES ('delete', old.seq, old.number, old.name);
+            INSERT INTO students_fts (rowid, number, name) VALUES (new.seq, new.number, new.name);
+        END;
+    """
+
+    def __init__(self, db_file):
+        # the search thread shares the connection → every statement runs under self.lock
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.in_transaction = False
+        with self.lock, self.conn:
+            # WAL + NORMAL → each edit is one short transaction without a full fsync of the database
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+            self.add_name_key()
+            self.conn.executescript(self.SCHEMA)
+            try:
+                self.conn.executescript(self.FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:    # SQLite built without FTS5 / trigram tokenizer
+                self.fts = False
+            (version,), = self.conn.execute("SELECT COALESCE(MAX(version), 0) FROM students")
+        self.version = version    # bumped on every change, like StudentStore.version
+        self.stats = SqliteStats(self)
+        self.columns = ", ".join(self.FIELDS)
+        self.write_columns = ", ".join(self.COLUMNS)
+
+    # Databases made before name_key existed → the column is added and filled in once, in one write
+    # transaction (a second instance opening the same file meanwhile waits, then finds it there)
+    def add_name_key(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(students)")}
+            if columns and "name_key" not in columns:
+                self.conn.execute("ALTER TABLE students ADD COLUMN name_key TEXT NOT NULL DEFAULT ''")
+                names = self.conn.execute("SELECT seq, name FROM students").fetchall()
+                self.conn.executemany("UPDATE students SET name_key = ? WHERE seq = ?",
+                                      ((name.lower(), seq) for seq, name in names))
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    # One write transaction (re-entrant). BEGIN IMMEDIATE takes SQLite's write lock up front, so a
+    # read-check-write sequence cannot interleave with another process; other writers wait on
+    # SQLite's busy timeout. Versions continue from the highest one in the database → a record's
+    # version changes on every write, whichever connection made it.
+    @contextlib.contextmanager
+    def transaction(self):
+        with self.lock:
+            if self.in_transaction:
+                yield
+                return
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.in_transaction = True
+            try:
+                (latest,), = self.conn.execute("SELECT COALESCE(MAX(version), 0) FROM students")
+                self.version = max(self.version, latest)
+                yield
+            except BaseException:
+                self.conn.rollback()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self.in_transaction = False
+
+    # Raw query → list of tuples
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Student records for "SELECT <fields> FROM students <tail>"
+    def records(self, tail="", params=()):
+        rows = self.query(f"SELECT {self.columns} FROM students {tail}", params)
+        return [StudentRecord(*row) for row in rows]
+
+    def __len__(self):
+        return self.stats.count
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __contains__(self, number):
+        return bool(self.query("SELECT 1 FROM students WHERE number = ?", (number,)))
+
+    def get(self, number):
+        rows = self.records("WHERE number = ?", (number,))
+        return rows[0] if rows else None
+
+    # Everything in file order → a paged view, so showing a huge table never loads it all
+    def all(self):
+        return SqliteView(self, "seq")
+
+    def add(self, student):
+        self.add_many([student])
+
+    # Inserts many records in one transaction (used by the bulk import and the migration)
+    def add_many(self, students):
+        with self.lock:
+            try:
+                with self.transaction():
+                    self.conn.executemany(
+                        f"INSERT INTO students ({self.write_columns}) "
+                        f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                        (self._row(s) for s in students))
+            except sqlite3.IntegrityError:
+                raise KeyError("Student number already exists") from None
+
+    def remove(self, number):
+        with self.transaction():
+            student = self.get(number)
+            if student is None:
+                raise KeyError(number)
+            self.version += 1
+            self.conn.execute("DELETE FROM students WHERE number = ?", (number,))
+            return student
+
+    # Replaces a record (number may change) → keeps its table position when the number stays the same
+    def update(self, old_number, student):
+        num = student.number
+        with self.lock:
+            try:
+                with self.transaction():
+                    if num == old_number:
+                        row = self._row(student)
+                        cur = self.conn.execute(
+                            f"UPDATE students SET ({self.write_columns}) = ({', '.join('?' * len(row))}) "
+                            "WHERE number = ?", row + (old_number,))
+                    else:
+                        cur = self.conn.execute("DELETE FROM students WHERE number = ?", (old_number,))
+                        if cur.rowcount:
+                            self.conn.execute(
+                                f"INSERT INTO students ({self.write_columns}) "
+                                f"VALUES ({', '.join('?' * len(self.COLUMNS))})", self._row(student))
+                    if not cur.rowcount:
+                        raise KeyError(old_number)
+            except sqlite3.IntegrityError:
+                raise KeyError(f"Student number {num} already exists") from None
+
+    # Numbers of the students whose number or name contains the (lowercase) query, in file order
+    def search_ids(self, query):
+        return [r.number for r in self.search(query)]
+
+    def search(self, query):
+        if self.fts and len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            return self.records("WHERE seq IN (SELECT rowid FROM students_fts WHERE students_fts MATCH ?) "
+                                "ORDER BY seq", (phrase,))
+
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return self.records("WHERE number LIKE ? ESCAPE '\\' OR name_key LIKE ? ESCAPE '\\' ORDER BY seq",
+                            (pattern, pattern))
+
+    # Records for a list of student numbers (numbers deleted in the meantime are skipped)
+    def lookup(self, numbers):
+        found = {}
+        numbers = list(numbers)
+        for i in range(0, len(numbers), 500):    # stays under SQLite's bound-parameter limit
+            chunk = numbers[i:i + 500]
+            for r in self.records(f"WHERE number IN ({', '.join('?' * len(chunk))})", chunk):
+                found[r.number] = r
+        return [found[n] for n in numbers if n in found]
+
+    # Students whose number starts with the prefix (range scan on the number index)
+    def number_prefix(self, prefix):
+        return self.records("WHERE number >= ? AND number < ? ORDER BY number",
+                            (prefix, prefix + "\uffff"))
+
+    # Students whose name starts with the (lowercase) prefix (range scan on the name_key index)
+    def name_prefix(self, prefix):
+        return self.records("WHERE name_key >= ? AND name_key < ? ORDER BY name_key, seq",
+                            (prefix, prefix + "\uffff"))
+
+    # Students in the order of a sort menu mode → the matching index walked page by page
+    def sorted_view(self, mode):
+        name, reverse = self.SORT_MODES[mode]
+        direction = "DESC" if reverse else "ASC"
+        return SqliteView(self, f"{self.SORT_COLUMNS[name]} {direction}, seq {direction}")
+
+    # Stamps the next version on the record and returns its column values (COLUMNS order)
+    def _row(self, student):
+        self.version += 1
+        student.version = self.version
+        return tuple(getattr(student, f) for f in self.FIELDS) + (student.name.lower(),)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Other connections' commits → SQLite bumps PRAGMA data_version for this connection. The store's
+# version is bumped too, so cached counts / stats / search results are queried again.
+class SqliteChangeWatcher:
+
+    def __init__(self, store, root, on_change, interval=1000):
+        self.store = store
+        self.root = root
+        self.on_change = on_change
+        self.interval = interval
+        self.seen = self.data_version()
+        self.root.after(self.interval, self.poll)
+
+    def data_version(self):
+        (version,), = self.store.query("PRAGMA data_version")
+        return version
+
+    def poll(self):
+        try:
+            version = self.data_version()
+        except sqlite3.Error:
+            version = self.seen
+        if version != self.seen:
+            self.seen = version
+            with self.store.lock:
+                self.store.version += 1
+            self.on_change({"added": 0, "updated": 0, "removed": 0, "reloaded": True})
+        self.root.after(self.interval, self.poll)
+
+
+# First launch of the SQLite backend → the text file (+ journal) is migrated on a worker thread through
+# a connection of its own, so the window paints and stays responsive meanwhile (the GUI's connection
+# shows an empty table until the one import transaction commits). Progress reaches the Tk thread like
+# StudentLoader's: on_progress(read, total, done, error), polled with root.after.
+class SqliteMigrator:
+
+    def __init__(self, repo, root, on_progress, total=None):
+        self.repo = repo
+        self.root = root
+        self.on_progress = on_progress
+        self.total = total              # students in the marks file (None → unknown)
+        self.read = 0                   # records read from the text file so far
+        self.results = queue.Queue()
+        self.done = threading.Event()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.worker.start()
+        self.root.after(100, self.poll_results)
+
+    def run(self):
+        error, store = None, None
+        try:
+            store = SqliteStudentStore(self.repo.db_file)
+            self.repo.migrate(store, self.counted)
+        except (OSError, ValueError, KeyError, sqlite3.Error) as err:
+            error = err
+        finally:
+            if store is not None:
+                store.close()
+            self.done.set()
+            self.results.put(error)
+
+    # Passes the records through, counting them for the progress bar
+    def counted(self, records):
+        for record in records:
+            self.read += 1
+            yield record
+
+    # Runs on the Tk thread → progress four times a second, then the result once the import committed
+    def poll_results(self):
+        try:
+            error = self.results.get_nowait()
+        except queue.Empty:
+            self.on_progress(self.read, self.total, False, None)
+            self.root.after(250, self.poll_results)
+            return
+
+        store = self.repo.store
+        self.repo.loader = None
+        with store.lock:
+            store.version += 1    # counts / pages cached before the import committed are stale
+        self.on_progress(len(store), self.total, True, error)
+
+
+# Same facade as StudentRepository, stored in SQLite (studentMarks_ext.db next to the marks file).
+# The first load migrates the text file (+ journal) into the database once; after that the database
+# is the only copy that changes. Every edit is its own transaction, so no writer thread is needed.
+class SqliteStudentRepository:
+
+    def __init__(self, path, db_file=None):
+        self.path = path
+        self.db_file = db_file or os.path.splitext(path)[0] + ".db"
+        self.store = None
+        self.writer = None
+        self.watcher = None
+        self.loader = None        # SqliteMigrator while the first launch imports the text file
+        self.load_errors = []
+
+    def load(self, limit=None):
+        self.load_errors = []
+        if self.store is None:
+            self.store = SqliteStudentStore(self.db_file)
+            (migrated,), = self.store.query("PRAGMA user_version")
+            if not migrated:
+                self.migrate()
+        return self.store
+
+    # The database is queried lazily, so there is nothing to stream → reports done on the next turn of
+    # the Tk loop, like StudentRepository.start_loading. The first launch migrates in the background.
+    def start_loading(self, root, on_progress):
+        self.load_errors = []
+        if self.store is None:
+            self.store = SqliteStudentStore(self.db_file)
+        (migrated,), = self.store.query("PRAGMA user_version")
+        if migrated:
+            root.after(0, on_progress, len(self.store), len(self.store), True, None)
+        else:
+            self.loader = SqliteMigrator(self, root, on_progress, StudentJournal(self.path).base_count())
+            self.loader.start()
+        return self.store
+
+    # One-shot import of the marks file → user_version marks the database as migrated, so an
+    # emptied table is not refilled from the old text file on the next launch. One transaction,
+    # checked again inside it → two instances launched together do not both import.
+    # `store` → the connection to import through (SqliteMigrator's own); `progress` wraps the records.
+    def migrate(self, store=None, progress=None):
+        store = store or self.store
+        with store.transaction():
+            (migrated,), = store.query("PRAGMA user_version")
+            if migrated:
+                return
+            text = StudentRepository(self.path, use_snapshot=False)
+            records = text.iter_records(errors=self.load_errors)
+            store.add_many(progress(records) if progress else records)
+            store.conn.execute("PRAGMA user_version = 1")
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, number):
+        return self.store.get(number)
+
+    def search(self, query):
+        return self.store.search(query.strip().lower())
+
+    def sorted_view(self, mode):
+        return self.store.sorted_view(mode)
+
+    @property
+    def stats(self):
+        return self.store.stats
+
+    # CRUD → rows are (number, name, cw1, cw2, cw3, exam), each call commits one transaction.
+    # `expected` works as in StudentRepository; the check and the write share the transaction.
+    def add(self, row):
+        record = GradingEngine.record(*row)
+        self.store.add(record)
+        return record
+
+    def add_many(self, rows):
+        self.store.add_many(GradingEngine.records(rows))
+
+    def update(self, old_number, row, expected=None):
+        with self.store.transaction():
+            row = resolve_edit(old_number, self.store.get(old_number), expected, row)
+            record = GradingEngine.record(*row)
+            self.store.update(old_number, record)
+        return record
+
+    def delete(self, number, expected=None):
+        with self.store.transaction():
+            resolve_edit(number, self.store.get(number), expected)
+            return self.store.remove(number)
+
+    # Commits are synchronous → nothing to run in the background
+    def start_writer(self, root, on_saved=None):
+        return None
+
+    # Notices commits made by other processes (PRAGMA data_version) and reports them like the file watcher
+    def start_watcher(self, root, on_change, interval=1000):
+        self.watcher = SqliteChangeWatcher(self.store, root, on_change, interval)
+        return self.watcher
+
+    def save_snapshot(self):
+        pass
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
@@ -1,10 +1,20 @@
+# OS used to dynamically load files (favicon, studentMarks.txt, buttons, backgrounds)
+import os
+import sys    # finds the shared startup profiler one folder up
+# startup profiler (off unless --profile-startup / STARTUP_PROFILE is set) → started before the heavy imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from startup_profiler import StartupProfiler
+profiler = StartupProfiler("Student Manager")
+
 # Tkinter UI components used for interactive student management system
 import tkinter as tk
 from tkinter import ttk, messagebox  
-# PIL for loading and displaying icons, backgrounds, and button images
-from PIL import Image, ImageTk
-# OS used to dynamically load files (favicon, studentMarks.txt, buttons, backgrounds)
-import os
+# Loads icons, backgrounds, and button images on first use (Pillow resize + LRU cache)
+from image_cache import ImageCache
+# Tk-free data layer shared with the extension version (parsing, grading, search, sort, stats)
+from student_core import StudentRepository
+
+profiler.mark("tkinter, PIL, student_core", "imports")
 
 # reference: # Learned OOP class pattern from LinkedIn Tkinter exercises (CH-08)
 class StudentManagerGUI:
@@ -23,25 +33,34 @@ class StudentManagerGUI:
         except Exception:
             pass
 
+        profiler.mark("window + icon", "ui")
+
         #LOAD BACKGROUND IMAGE 
+        # Only the main background is decoded now; the score one on first use (or in idle time below)
+        self.images = ImageCache()
         self.bg_main_path = os.path.join(os.path.dirname(__file__), "background", "bg.png")
         self.bg_score_path = os.path.join(os.path.dirname(__file__), "background", "bg_score.png")
 
-        # Load both now (prevents garbage-collection)
-        self.bg_main_img = ImageTk.PhotoImage(Image.open(self.bg_main_path))
-        self.bg_score_img = ImageTk.PhotoImage(Image.open(self.bg_score_path))
-
         # Create ONE background label that we will update later
-        self.bg_label = tk.Label(self.root, image=self.bg_main_img)
+        self.bg_label = tk.Label(self.root)
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+        self.set_background("main")
+        self.images.warm_up(self.root, [(self.bg_score_path,)])
+        profiler.mark("main background", "assets")
 
         #LOAD STUDENT FILE
         self.student_file = os.path.join(os.path.dirname(__file__), "studentMarks.txt")
+        self.repo = StudentRepository(self.student_file)
+        self.loading = (0, None)     # (loaded, expected) while the students load in the background, then None
+        self.current_view = None     # redraws what the records frame shows (all / search / sort / scores)
+        profiler.wait_for("students loaded")    # the report also says when the worker finished
         self.students = self.load_students()
+        profiler.mark("start loading studentMarks.txt", "data")
 
         #SIDEBAR BUTTONs
         self.btn_dir = os.path.join(os.path.dirname(__file__), "buttons")
         self.create_sidebar_buttons()
+        profiler.mark("sidebar buttons", "assets")
 
         #MAIN RECORDS FRAME
         self.records_frame = tk.Frame(self.root, bg="#0F1A24")
@@ -63,23 +82,18 @@ class StudentManagerGUI:
         #SUMMARY FRAME 
         self.summary_frame = tk.Frame(self.root, bg="#0F1A24")
         self.summary_frame.place(x=230, y=543, width=600, height=40)
+        self.show_summary()    # loading progress until every student is in
+        profiler.mark("records frame, search bar, summary", "ui")
 
-    #Load icon image 
+    #Load icon image (sub → same size the old subsample(x, y) gave, resized once and cached)
     def load_image(self, folder, name, sub=None):
-        path = os.path.join(folder, name)
-        img = tk.PhotoImage(file=path)  # Load image
-        if sub:
-            img = img.subsample(*sub)  # Resize via subsampling
-        return img 
+        return self.images.get(os.path.join(folder, name), shrink=sub)
     
     # swaps between main and score background without recreating widgets
     def set_background(self, mode):
-        if mode == "main":
-            self.bg_label.config(image=self.bg_main_img)
-            self.bg_label.image = self.bg_main_img
-        else:
-            self.bg_label.config(image=self.bg_score_img)
-            self.bg_label.image = self.bg_score_img
+        img = self.images.get(self.bg_main_path if mode == "main" else self.bg_score_path)
+        self.bg_label.config(image=img)
+        self.bg_label.image = img
 
     # hides or shows main homepage widgets depending on active section
     def toggle_main_ui(self, visible=True):
@@ -142,47 +156,28 @@ class StudentManagerGUI:
 
     # LOADING STUDENTS FROM TEXT FILE
     def load_students(self):
-        students = []
         if not os.path.exists(self.student_file):
             messagebox.showerror("Error", "studentMarks.txt not found!")
-            return students
         
-        # reads studentMarks.txt and converts each line into a student dictionary
-        with open(self.student_file, "r") as f:   # concepts demonstrated from Lecture Notes
-            for line in f:
-                parts = line.strip().split(",")
-                if len(parts) != 6:
-                    continue
-
-                num, name, c1, c2, c3, exam = parts
-                try:  # also calculates total, percentage, and grade for table + score screen
-                    cw_total = int(c1) + int(c2) + int(c3)
-                    exam = int(exam)
-                    total = cw_total + exam
-                    percent = total / 160 * 100
-
-                    students.append({
-                        "number": num,
-                        "name": name,
-                        "coursework": cw_total,
-                        "exam": exam,
-                        "total": total,
-                        "percent": percent,
-                        "grade": self.calc_grade(percent)
-                    })
-                except:
-                    continue
-
-        return students
-
-    #grading logic used after computing each student’s percentage
-    def calc_grade(self, p):
-        if p >= 70: return "A"
-        if p >= 60: return "B"
-        if p >= 50: return "C"
-        if p >= 40: return "D"
-        return "F"
-    
+        # reads studentMarks.txt on a worker thread and converts each line into a student record
+        # (totals, percentage and grade are calculated by the shared core) → the store fills in batches
+        return self.repo.start_loading(self.root, self.on_students_loaded)
+
+    # Called (on the Tk thread) as batches of students arrive → the summary line shows the progress,
+    # and whatever is on screen is redrawn once when all are in. (This table is a plain Treeview, so a
+    # redraw per batch would insert the whole cohort again every time and jump back to the top.)
+    def on_students_loaded(self, loaded, total, done, error):
+        self.loading = None if done else (loaded, total)
+        if done:
+            profiler.done("students loaded")
+        if error:
+            messagebox.showerror("Load Failed", f"Only {loaded:,} students could be loaded:\n{error}")
+
+        if done and self.current_view is not None:
+            self.current_view()
+        if self.summary_frame.winfo_children():
+            self.show_summary()
+
      # builds the sort dropdown menu with multiple sorting criteria 
     def open_sort_menu(self):
         menu = tk.Menu(     # Reference: Menu structure setup (LinkedIn Course CH-05)
@@ -220,24 +215,9 @@ class StudentManagerGUI:
 
     # applies chosen sorting method and refreshes the displayed table
     def sort_records(self, mode):
-        data = self.students.copy()
-
-        if mode == "name_asc":
-            data.sort(key=lambda s: s["name"].lower())
-        elif mode == "name_desc":
-            data.sort(key=lambda s: s["name"].lower(), reverse=True)
-        elif mode == "percent_asc":
-            data.sort(key=lambda s: s["percent"])
-        elif mode == "percent_desc":
-            data.sort(key=lambda s: s["percent"], reverse=True)
-        elif mode == "number":
-            data.sort(key=lambda s: int(s["number"]))
-        elif mode == "cw":
-            data.sort(key=lambda s: s["coursework"], reverse=True)
-        elif mode == "exam":
-            data.sort(key=lambda s: s["exam"], reverse=True)
-        elif mode == "total":
-            data.sort(key=lambda s: s["total"], reverse=True)
+        # the shared store keeps every sort order ready, so this is just a view
+        data = self.students.sorted_view(mode)
+        self.current_view = lambda: self.sort_records(mode)
 
         self.show_table(data)
 
@@ -249,7 +229,7 @@ class StudentManagerGUI:
             w.destroy()
 
         # Table columns names
-        columns = ("Number", "Name", "CW", "Exam", "Total", "Percent", "Grade")
+        columns = ("Number", "Name", "CW", "Exam", "Total", "Percent", "Grade", "Rank", "Pctl")
 
         # Created TreeView (reference: used this idea from minerva linkedin course CH-05)
         tree = ttk.Treeview(
@@ -282,17 +262,19 @@ class StudentManagerGUI:
         tree.configure(yscrollcommand=scroll.set)
 
         # Column widths for the rectangle in bg image
-        widths = [80, 150, 70, 70, 80, 90, 70]
+        widths = [75, 130, 50, 50, 55, 70, 50, 65, 65]
 
         for (col, w) in zip(columns, widths):
             tree.heading(col, text=col)
             tree.column(col, width=w, anchor="center")
 
-        # Insert rows
+        # Insert rows (rank / percentile → counts in the cohort's rank index, no re-sort)
+        stats = self.students.stats
         for s in dataset:
             tree.insert("", "end",
-                        values=(s["number"], s["name"], s["coursework"], s["exam"],
-                                s["total"], f"{s['percent']:.1f}%", s["grade"]))
+                        values=(s.number, s.name, s.coursework, s.exam,
+                                s.total, f"{s.percent:.1f}%", s.grade,
+                                stats.rank(s), f"{stats.percentile(s):.0f}"))
             
 
     # displays total student count + class average under the main table        
@@ -301,8 +283,26 @@ class StudentManagerGUI:
         for w in self.summary_frame.winfo_children():
             w.destroy()
 
-        count = len(self.students)
-        avg = sum(s['percent'] for s in self.students) / count if count else 0
+        # Still loading → students read so far + a progress bar instead of the totals
+        if self.loading:
+            loaded, total = self.loading
+            tk.Label(
+                self.summary_frame,
+                text=f"Loading students… {loaded:,}" + (f" of {total:,}" if total else ""),
+                font=("Consolas", 11, "bold"),
+                bg="#0F1A24",
+                fg="#F2F8FA"
+            ).pack(side="left", padx=11)
+            ttk.Progressbar(
+                self.summary_frame,
+                length=180,
+                maximum=total or 1,
+                value=min(loaded, total or 0)
+            ).pack(side="right", padx=11)
+            return
+
+        count = self.students.stats.count
+        avg = self.students.stats.mean
 
         text = f"Total Students: {count}   |   Average Percentage: {avg:.2f}%"
 
@@ -317,23 +317,21 @@ class StudentManagerGUI:
 
     # real-time search that filters students by number or name
     def run_search(self, *args):
+        self.current_view = self.run_search
         query = self.search_var.get().strip().lower()
 
         if query == "":
             # Empty search → show all
-            self.show_table(self.students)
+            self.show_table(self.students.all())
             return
 
-        result = [
-            s for s in self.students
-            if query in s["number"].lower()
-            or query in s["name"].lower()
-        ]
+        result = self.students.search(query)
 
         self.show_table(result)
     
     # displays highest and lowest scoring students using clean card layout
     def show_scores_screen(self):
+        self.current_view = self.show_scores_screen
 
         self.set_background("score")
         self.toggle_main_ui(False)     # to HIDE search, sort, summary
@@ -350,9 +348,18 @@ class StudentManagerGUI:
         cards_frame.grid_columnconfigure(0, weight=1)
         cards_frame.grid_columnconfigure(1, weight=1)
 
-        # Find highest + lowest
-        highest = max(self.students, key=lambda s: s["total"])
-        lowest  = min(self.students, key=lambda s: s["total"])
+        # Find highest + lowest (kept up to date by the shared stats)
+        highest = self.students.stats.top(1)
+        lowest  = self.students.stats.bottom(1)
+        if not highest:
+            tk.Label(
+                cards_frame,
+                text="No students found in studentMarks.txt",
+                font=("Consolas", 13, "bold"),
+                fg="white",
+                bg="#0F1A24"
+            ).grid(row=0, column=0, columnspan=2, pady=40)
+            return
 
         # created a Card creator function 
         def create_card(parent, title, student, color, column):
@@ -371,13 +378,13 @@ class StudentManagerGUI:
             ).pack(anchor="w", pady=(0,10))
 
             text = (
-                f"Name: {student['name']}\n\n"
-                f"Number: {student['number']}\n\n"
-                f"Coursework Total: {student['coursework']}\n\n"
-                f"Exam Marks: {student['exam']}\n\n"
-                f"Overall Total: {student['total']}\n\n"
-                f"Percentage: {student['percent']:.1f}%\n\n"
-                f"Grade: {student['grade']}"
+                f"Name: {student.name}\n\n"
+                f"Number: {student.number}\n\n"
+                f"Coursework Total: {student.coursework}\n\n"
+                f"Exam Marks: {student.exam}\n\n"
+                f"Overall Total: {student.total}\n\n"
+                f"Percentage: {student.percent:.1f}%\n\n"
+                f"Grade: {student.grade}"
             )
 
             tk.Label(
@@ -390,15 +397,16 @@ class StudentManagerGUI:
             ).pack(anchor="w")
 
         # Create cards side by side so it appears clean
-        create_card(cards_frame, "Highest Scoring Student", highest, "#66FF7F", column=0)
-        create_card(cards_frame, "Lowest Scoring Student", lowest, "#FF6B6B", column=1)
+        create_card(cards_frame, "Highest Scoring Student", highest[0], "#66FF7F", column=0)
+        create_card(cards_frame, "Lowest Scoring Student", lowest[0], "#FF6B6B", column=1)
 
 
     # default home screen → resets background and loads full student table
     def show_all_students(self):
         self.set_background("main")
         self.toggle_main_ui(True)       # to SHOW search, sort, summary again
-        self.show_table(self.students)
+        self.show_table(self.students.all())
+        self.current_view = lambda: self.show_table(self.students.all())
         self.show_summary() #show the summary frame 
 
 
@@ -407,4 +415,5 @@ class StudentManagerGUI:
 if __name__ == "__main__":
     root = tk.Tk()
     StudentManagerGUI(root)
+    profiler.first_frame(root)  # reports once the dashboard is on screen
     root.mainloop()
@@ -1,12 +1,117 @@
-import tkinter as tk           # Core GUI framework — builds all windows, frames, buttons for the manager
-from tkinter import ttk, messagebox   # ttk → styled widgets (treeview tables), messagebox → alerts & confirmations
-from PIL import Image, ImageTk    # Loads / converts background images & button icons for smooth UI rendering
 import os    # Helps locate resource folders (icons, backgrounds, text files)
+import sys    # Reads the --sqlite launch flag + finds the shared startup profiler one folder up
+# startup profiler (off unless --profile-startup / STARTUP_PROFILE is set) → started before the heavy imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from startup_profiler import StartupProfiler
+profiler = StartupProfiler("Student Manager (extension)")
+
+import tkinter as tk           # Core GUI framework — builds all windows, frames, buttons for the manager
+from tkinter import ttk, messagebox, filedialog   # ttk → styled widgets (treeview tables), messagebox → alerts & confirmations, filedialog → pick CSV to import
+from image_cache import ImageCache    # Decodes background images & button icons on first use (Pillow resize + LRU)
+from student_core import (StudentRepository, SqliteStudentRepository, SearchWorker, CsvImporter,
+                          StudentExporter, validate_student_fields, StudentValidationError,
+                          StudentConflictError)   # Tk-free data layer
+
+profiler.mark("tkinter, PIL, student_core", "imports")
+
+
+# Virtual-scrolling records table → the Treeview only ever holds the rows that fit in the viewport
+# (a fixed pool of items whose values get swapped while scrolling). The scrollbar is mapped to the
+# logical row count of the dataset, so a redraw costs the same for 10 or 1,000,000 students.
+class VirtualTable(tk.Frame):
+
+    def __init__(self, parent, columns, widths, row_values, visible_rows=10, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.row_values = row_values    # turns one record into the tuple shown in its row
+        self.visible = visible_rows
+        self.rows = []                  # the full dataset (only referenced, never copied into Tk)
+        self.first = 0                  # index of the record shown in the top row
+
+        self.tree = ttk.Treeview(
+            self,
+            columns=columns,
+            show="headings",
+            selectmode="browse",
+            height=visible_rows
+        )
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        # Scrollbar talks to the table, not the Treeview (Treeview only knows about the visible rows)
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scroll.pack(side="right", fill="y")
+
+        for (col, w) in zip(columns, widths):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=w, anchor="center")
+
+        # Fixed pool of row items → reused for whatever part of the dataset is on screen
+        self.items = [self.tree.insert("", "end", values=()) for _ in range(visible_rows)]
+        self.shown = [None] * visible_rows    # values currently in each pool item (to skip no-op updates)
+        self.attached = visible_rows
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self.on_wheel)
+
+    # Points the table at a new dataset and jumps back to the top
+    def set_rows(self, rows):
+        self.rows = rows
+        self.first = 0
+        self.render()
+
+    # Re-reads the visible rows (after the data changed underneath) without jumping back to the top
+    def refresh(self, rows=None):
+        if rows is not None:
+            self.rows = rows
+        self.scroll_to(self.first)
+
+    def scroll_to(self, first):
+        self.first = max(0, min(first, len(self.rows) - self.visible))
+        self.render()
+
+    # Scrollbar drag ("moveto") and arrow / trough clicks ("scroll")
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        elif action == "scroll":
+            step = int(amount) * (self.visible if unit == "pages" else 1)
+            self.scroll_to(self.first + step)
+
+    # Mouse wheel (Windows/macOS send delta, Linux sends button 4/5)
+    def on_wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        self.scroll_to(self.first + (-3 if up else 3))
+        return "break"
+
+    # Copies just the visible slice into the pooled items and updates the scrollbar.
+    # Rows whose values did not change are left alone, so Tk only redraws what actually differs.
+    def render(self):
+        shown = self.rows[self.first:self.first + self.visible]
+
+        for i, iid in enumerate(self.items):
+            if i < len(shown):
+                values = self.row_values(shown[i])
+                if values != self.shown[i]:
+                    self.tree.item(iid, values=values)
+                    self.shown[i] = values
+
+        # hide unused pool items when the dataset is shorter than the viewport
+        if len(shown) < self.attached:
+            self.tree.detach(*self.items[len(shown):self.attached])
+        for i in range(self.attached, len(shown)):
+            self.tree.move(self.items[i], "", i)
+        self.attached = len(shown)
+
+        total = len(self.rows)
+        if total:
+            self.scroll.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scroll.set(0.0, 1.0)
+
 
 # reference: # Learned OOP class pattern from LinkedIn Tkinter exercises (CH-08)
 class StudentManagerGUI:
 
-    def __init__(self, root):
+    def __init__(self, root, use_sqlite=False):
         self.root = root
         self.root.title("Student Work Management")
         self.root.geometry("850x600")
@@ -19,35 +124,74 @@ class StudentManagerGUI:
         except Exception:
             pass
 
-        #LOAD BACKGROUND IMAGE 
-        self.bg_main_path = os.path.join(os.path.dirname(__file__), "background", "bg_1.png")
-        self.bg_score_path = os.path.join(os.path.dirname(__file__), "background", "bg_2.png")
-        self.bg_edit_path = os.path.join(os.path.dirname(__file__), "background", "bg_3.png")
+        profiler.mark("window + icon", "ui")
 
-        # Load both now (prevents garbage-collection)
-        self.bg_main_img = ImageTk.PhotoImage(Image.open(self.bg_main_path))
-        self.bg_score_img = ImageTk.PhotoImage(Image.open(self.bg_score_path))
-        self.bg_edit_img = ImageTk.PhotoImage(Image.open(self.bg_edit_path))
+        #LOAD BACKGROUND IMAGE 
+        # Only the main background is decoded now; the others on first use (or in idle time below)
+        self.images = ImageCache()
+        bg_dir = os.path.join(os.path.dirname(__file__), "background")
+        self.backgrounds = {
+            "main": os.path.join(bg_dir, "bg_1.png"),
+            "score": os.path.join(bg_dir, "bg_2.png"),
+            "edit": os.path.join(bg_dir, "bg_3.png"),
+        }
 
         # Create ONE background label that we will update later
-        self.bg_label = tk.Label(self.root, image=self.bg_main_img)
+        self.bg_label = tk.Label(self.root)
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
+        self.set_background("main")
+        profiler.mark("main background", "assets")
 
         #LOAD STUDENT FILE
         self.student_file = os.path.join(os.path.dirname(__file__), "studentMarks_ext.txt")
-        self.students = self.load_students()
+        if not os.path.exists(self.student_file):
+            messagebox.showerror("Error", "studentMarks.txt not found!")
+
+        # Tk-free core: journal (small per-edit writes), binary snapshot (fast start), indexed store.
+        # With --sqlite the same data lives in studentMarks_ext.db instead (migrated on first launch).
+        if use_sqlite:
+            self.repo = SqliteStudentRepository(self.student_file)
+        else:
+            self.repo = StudentRepository(self.student_file)
+        # Students are read on a worker thread and show up batch by batch (on_students_loaded);
+        # the Manage menu waits until the whole cohort is in
+        self.loading = (0, None)      # (loaded, expected) while the background load runs, then None
+        self.load_failed = False      # the load stopped part-way → editing stays off
+        self.load_progress = None     # (label, progress bar) in the summary frame while loading
+        profiler.wait_for("students loaded")    # the report also says when the worker finished
+        self.students = self.repo.start_loading(self.root, self.on_students_loaded)
+        profiler.mark("start background load", "data")
+
+        # Saves edits on a worker thread so disk writes never block the window (text file only)
+        self.repo.start_writer(self.root, on_saved=self.on_students_saved)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        profiler.mark("writer", "data")
 
         #SIDEBAR BUTTONs
         self.btn_dir = os.path.join(os.path.dirname(__file__), "buttons")
         self.create_sidebar_buttons()
+        profiler.mark("sidebar buttons", "assets")
+
+        # Decode the other screens' images while the window sits idle after it first shows
+        self.images.warm_up(self.root, [
+            (self.backgrounds["score"],),
+            (self.backgrounds["edit"],),
+            *((os.path.join(self.btn_dir, name), None, (3, 3))
+              for name in ("save_btn.png", "update_btn.png", "delete_btn.png")),
+        ])
 
         #MAIN RECORDS FRAME
         self.records_frame = tk.Frame(self.root, bg="#0F1A24")
         self.records_frame.place(x=230, y=230, width=600, height=310)
+        self.table = None        # one persistent records table, built on first use
+        self.row_cache = {}      # number → (record version, formatted row values)
 
         # SEARCH BAR
         self.search_var = tk.StringVar()
         self.search_var.trace("w", self.run_search)  # Live search
+        self.search_job = None    # pending debounce timer
+        self.shown_query = None   # search whose result the table shows (refreshed in place)
+        self.searcher = SearchWorker(self.students, self.root, self.show_search_result)
 
         self.search_entry = tk.Entry(
             self.root,
@@ -62,26 +206,78 @@ class StudentManagerGUI:
         self.summary_frame = tk.Frame(self.root, bg="#0F1A24")
         self.summary_frame.place(x=230, y=543, width=600, height=40)
 
-    #Load icon image 
+        # Records table on screen from the start → it fills in while the students load
+        self.show_all_students()
+        profiler.mark("records table, search bar, summary", "ui")
+
+    # Called (on the Tk thread) while the background loader fills the store → the table, search
+    # results and progress bar follow along. Once everything is in, editing and the watcher start.
+    def on_students_loaded(self, loaded, total, done, error):
+        self.loading = None if done else (loaded, total)
+        if done:
+            profiler.done("students loaded")
+            self.load_failed = error is not None
+            if error:
+                messagebox.showerror("Load Failed",
+                                     f"Only {loaded:,} students could be loaded, so editing is switched off:\n{error}")
+            else:
+                # Picks up students added / changed by other instances or markers on a shared drive
+                self.repo.start_watcher(self.root, self.on_file_changed)
+            self.report_load_errors()
+
+        self.refresh_records()
+        if self.summary_frame.winfo_children():
+            self.show_summary()
+
+    # Called (on the Tk thread) after the writer flushed a batch of edits
+    def on_students_saved(self, count, error):
+        if error:
+            messagebox.showerror("Save Failed",
+                                f"{count} change(s) could not be written to the marks file:\n{error}")
+
+    # An edit whose journal append failed (disk full, file locked, …) → refused before anything changed
+    def show_write_failed(self, error):
+        messagebox.showerror("Save Failed",
+                            f"The change could not be written to the marks file:\n{error}\n\n"
+                            "Nothing was changed, please try again.")
+
+    # Called (on the Tk thread) when the watcher applied changes made by someone else →
+    # redraws the table in place and the summary below it
+    def on_file_changed(self, change):
+        if change["reloaded"]:
+            self.row_cache.clear()
+
+        self.refresh_records()
+        if self.summary_frame.winfo_children():
+            self.show_summary()
+
+    # Redraws whatever the records table shows (search result, full list or sorted view) in place.
+    # winfo_manager → the table is packed, even before the window has been mapped for the first time.
+    def refresh_records(self):
+        if self.table is not None and self.table.winfo_manager():
+            query = self.search_var.get().strip().lower()
+            if query:
+                self.searcher.submit(query)
+            elif isinstance(self.table.rows, list):
+                self.table.refresh(self.students.all())    # full list → rebuild it
+            else:
+                self.table.refresh()    # sorted views are live, just redraw
+
+    # Makes sure queued edits reach the file before the window goes away
+    def on_close(self):
+        self.repo.close()    # flushes the writer + saves the snapshot the next launch maps
+        self.root.destroy()
+
+    #Load icon image (sub → same size the old subsample(x, y) gave, resized once and cached)
     def load_image(self, folder, name, sub=None):
-        path = os.path.join(folder, name)
-        img = tk.PhotoImage(file=path)  # Load image
-        if sub:
-            img = img.subsample(*sub)  # Resize via subsampling
-        return img 
+        return self.images.get(os.path.join(folder, name), shrink=sub)
     
     # Switches background based on screen mode → lets app visually change between 
     # main, score view, and edit pages without recreating widgets
     def set_background(self, mode):
-        if mode == "main":
-            self.bg_label.config(image=self.bg_main_img)
-            self.bg_label.image = self.bg_main_img
-        elif mode == "score":
-            self.bg_label.config(image=self.bg_score_img)
-            self.bg_label.image = self.bg_score_img
-        elif mode == "edit":
-            self.bg_label.config(image=self.bg_edit_img)
-            self.bg_label.image = self.bg_edit_img
+        img = self.images.get(self.backgrounds[mode])
+        self.bg_label.config(image=img)
+        self.bg_label.image = img
 
     
     # Shows or hides main-page elements (search bar, sort, summary)
@@ -157,57 +353,22 @@ class StudentManagerGUI:
         self.btn_ext.image = self.btn_ext_img
         self.btn_ext.place(x=1, y=255)   
 
-        #Save button for Add student page
-        self.save_btn_img = self.load_image(self.btn_dir, "save_btn.png", (3, 3))
+        # Save / update / delete button images are loaded when their forms open
+     
+    # Tells the user which lines of the marks file could not be read (first few only)
+    def report_load_errors(self):
+        errors = self.repo.load_errors
+        if not errors:
+            return
 
-        # UPDATE BUTTON IMAGE
-        self.update_btn_img = self.load_image(self.btn_dir, "update_btn.png", (3, 3))
+        lines = "\n".join(f"Line {no}: {reason}  ({text[:30]})"
+                          for no, text, reason in errors[:5])
+        more = len(errors) - 5
+        if more > 0:
+            lines += f"\n…and {more} more"
 
-        # DELETE BUTTON IMAGE
-        self.delete_btn_img = self.load_image(self.btn_dir, "delete_btn.png", (3, 3))
-   
-     
-    # Reads studentMarks_ext.txt, converts raw text into usable student dictionaries
-    def load_students(self):
-        students = []
-        if not os.path.exists(self.student_file):
-            messagebox.showerror("Error", "studentMarks.txt not found!")
-            return students
-
-        with open(self.student_file, "r") as f: # concepts demonstrated from Lecture Notes
-            for line in f:
-                parts = line.strip().split(",")
-                if len(parts) != 6:
-                    continue
-
-                num, name, c1, c2, c3, exam = parts
-                try: # calculates totals/percentages, and prepares all data for UI display
-                    cw_total = int(c1) + int(c2) + int(c3)
-                    exam = int(exam)
-                    total = cw_total + exam
-                    percent = total / 160 * 100
-
-                    students.append({
-                        "number": num,
-                        "name": name,
-                        "coursework": cw_total,
-                        "exam": exam,
-                        "total": total,
-                        "percent": percent,
-                        "grade": self.calc_grade(percent)
-                    })
-                except:
-                    continue
-
-        return students
-
-    # Converts percentage into final letter grade → used when loading, adding, or updating students
-    def calc_grade(self, p):
-        if p >= 70: return "A"
-        if p >= 60: return "B"
-        if p >= 50: return "C"
-        if p >= 40: return "D"
-        return "F"
+        messagebox.showwarning("Skipped Rows",
+                               f"{len(errors)} line(s) in the marks file were skipped:\n\n{lines}")
     
     #Created Sort Menu with varieties of commands 
     def open_sort_menu(self):
@@ -247,46 +408,28 @@ class StudentManagerGUI:
 
     #Crested sort records function that links to command menu for specific tasks
     def sort_records(self, mode):
-        data = self.students.copy()
-
         # Works for name, percentage, exam, cw, total, and student number
-        if mode == "name_asc":
-            data.sort(key=lambda s: s["name"].lower())
-        elif mode == "name_desc":
-            data.sort(key=lambda s: s["name"].lower(), reverse=True)
-        elif mode == "percent_asc":
-            data.sort(key=lambda s: s["percent"])
-        elif mode == "percent_desc":
-            data.sort(key=lambda s: s["percent"], reverse=True)
-        elif mode == "number":
-            data.sort(key=lambda s: int(s["number"]))
-        elif mode == "cw":
-            data.sort(key=lambda s: s["coursework"], reverse=True)
-        elif mode == "exam":
-            data.sort(key=lambda s: s["exam"], reverse=True)
-        elif mode == "total":
-            data.sort(key=lambda s: s["total"], reverse=True)
+        # → the store keeps every order up to date, so this is just a view over the right index
+        data = self.students.sorted_view(mode)
 
         self.show_table(data)
 
 
-    # Builds the main TreeView table each time data changes
+    # Shows the dataset in the records table → the table is built once and then only re-pointed
+    # at new data, so search / sort / edits never tear down the Treeview or restyle it
     def show_table(self, dataset):
-        # Clear old widgets 
-        for w in self.records_frame.winfo_children():
-            w.destroy()
+        if self.table is None:
+            self.build_table()
+        self.shown_query = None
 
-        # Table columns names
-        columns = ("Number", "Name", "CW", "Exam", "Total", "Percent", "Grade")
+        # Clear other screens' widgets but keep the table
+        self.clear_records_frame()
+        if not self.table.winfo_ismapped():
+            self.table.pack(fill="both", expand=True)
 
-        # Created TreeView (reference: used this idea from minerva linkedin course)
-        tree = ttk.Treeview(
-            self.records_frame,
-            columns=columns,
-            show="headings",
-            selectmode="browse"
-        )
+        self.table.set_rows(dataset)
 
+    def build_table(self):
         # created a custom Style
         style = ttk.Style() #Reference: ttk.Style customization technique from LinkedIn course CH-05
         style.configure(
@@ -301,34 +444,54 @@ class StudentManagerGUI:
                         font=("Consolas", 10, "bold"),
                         foreground="black")
 
-        tree.pack(side="left", fill="both", expand=True)
+        # Table columns names + widths for the rectangle in bg image
+        columns = ("Number", "Name", "CW", "Exam", "Total", "Percent", "Grade", "Rank", "Pctl")
+        widths = [75, 130, 50, 50, 55, 70, 50, 65, 65]
 
-        # Attached scrollbar (Reference: Adapted Scrollbar concept from Linkedin course CH-05)
-        scroll = ttk.Scrollbar(self.records_frame, orient="vertical", command=tree.yview)
-        scroll.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=scroll.set)
+        # Virtual table (reference: TreeView + Scrollbar idea from minerva linkedin course CH-05)
+        # → only the ~10 rows in view are ever inserted into the Treeview
+        self.table = VirtualTable(self.records_frame, columns, widths, self.row_values, bg="#0F1A24")
 
-        # Column widths for the rectangle in bg image
-        widths = [80, 150, 70, 70, 80, 90, 70]
+    # Removes everything from the records frame except the persistent table (which is only hidden)
+    def clear_records_frame(self):
+        for w in self.records_frame.winfo_children():
+            if w is self.table:
+                continue
+            w.destroy()
+        if self.table is not None:
+            self.table.pack_forget()
+
+    # Formats one student into the values shown in a table row.
+    # Cached per record version → the "%.1f%" formatting only happens again after an edit.
+    # Rank / percentile move whenever anyone else's total changes, so they are looked up fresh
+    # (two O(log) counts in the stats rank index per visible row).
+    def row_values(self, s):
+        cached = self.row_cache.get(s.number)
+        if cached and cached[0] == s.version:
+            values = cached[1]
+        else:
+            values = (s.number, s.name, s.coursework, s.exam,
+                      s.total, f"{s.percent:.1f}%", s.grade)
+            self.row_cache[s.number] = (s.version, values)
+
+        stats = self.students.stats
+        return values + (stats.rank(s), f"{stats.percentile(s):.0f}")
 
-        for (col, w) in zip(columns, widths):
-            tree.heading(col, text=col)
-            tree.column(col, width=w, anchor="center")
-
-        # Clears old rows, applies custom theme, and inserts formatted student rows
-        for s in dataset:
-            tree.insert("", "end",
-                        values=(s["number"], s["name"], s["coursework"], s["exam"],
-                                s["total"], f"{s['percent']:.1f}%", s["grade"]))
-            
     def show_summary(self):
+        # Still loading → progress line instead of the summary
+        if self.loading:
+            self.show_load_progress(*self.loading)
+            return
+        self.load_progress = None
+
         # Clear old content
         for w in self.summary_frame.winfo_children():
             w.destroy()
 
-        # Shows quick stats below the table (student count + average %)
-        count = len(self.students)
-        avg = sum(s['percent'] for s in self.students) / count if count else 0
+        # Shows quick stats below the table (student count + average %) → read from the running totals
+        stats = self.students.stats
+        count = stats.count
+        avg = stats.mean
 
         # Auto updates whenever records are changed
         text = f"Total Students: {count}   |   Average Percentage: {avg:.2f}%"
@@ -341,24 +504,62 @@ class StudentManagerGUI:
             fg="#F2F8FA"
         ).pack(anchor="w", padx=11)
 
-    # Live search system → filters students as the user types
+    # Progress line under the table while loading → students read so far + a progress bar
+    # (built once, then only updated; it bounces until the loader knows how many to expect)
+    def show_load_progress(self, loaded, total):
+        if self.load_progress is None:
+            for w in self.summary_frame.winfo_children():
+                w.destroy()
+
+            label = tk.Label(
+                self.summary_frame,
+                font=("Consolas", 11, "bold"),
+                bg="#0F1A24",
+                fg="#F2F8FA"
+            )
+            label.pack(side="left", padx=11)
+
+            bar = ttk.Progressbar(self.summary_frame, length=180, mode="indeterminate")
+            bar.pack(side="right", padx=11)
+            bar.start(20)
+            self.load_progress = (label, bar)
+
+        label, bar = self.load_progress
+        label.config(text=f"Loading students… {loaded:,}" + (f" of {total:,}" if total else ""))
+        if total:
+            bar.stop()
+            bar.config(mode="determinate", maximum=total, value=min(loaded, total))
+
+    # Live search system → filters students as the user types.
+    # Debounced: the search only starts once typing pauses for 150 ms.
     def run_search(self, *args):
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(150, self.start_search)
+
+    def start_search(self):
+        self.search_job = None
         query = self.search_var.get().strip().lower()
 
         if query == "":
             # Empty search → show all
-            self.show_table(self.students)
+            self.searcher.cancel()
+            self.show_table(self.students.all())
             return
-        
-        # Matches by student number or name for fast lookup
-        result = [
-            s for s in self.students
-            if query in s["number"].lower()
-            or query in s["name"].lower()
-        ]
 
-        self.show_table(result)
-    
+        # Matches by student number or name → n-gram index lookup on the search thread
+        self.searcher.submit(query)
+
+    # Called by the search worker (on the Tk thread) with the newest finished query
+    def show_search_result(self, query, result):
+        if query != self.search_var.get().strip().lower():
+            return
+        if query == self.shown_query and self.table.winfo_manager():
+            self.table.refresh(result)    # same search, more matches (still loading) → keep the scroll position
+        else:
+            self.show_table(result)
+        self.shown_query = query
+
     #Score section (this includes Highest and lowest)
     def show_scores_screen(self):
 
@@ -368,9 +569,8 @@ class StudentManagerGUI:
         # RESET FRAME SIZE
         self.records_frame.place(x=230, y=230, width=600, height=310)
 
-        # Clear old content
-        for w in self.records_frame.winfo_children():
-            w.destroy()
+        # Clear old content (table is kept, just hidden)
+        self.clear_records_frame()
 
         # Frame to hold cards
         cards_frame = tk.Frame(self.records_frame, bg="#0F1A24")
@@ -380,9 +580,20 @@ class StudentManagerGUI:
         cards_frame.grid_columnconfigure(0, weight=1)
         cards_frame.grid_columnconfigure(1, weight=1)
 
-        # Find highest + lowest
-        highest = max(self.students, key=lambda s: s["total"])
-        lowest  = min(self.students, key=lambda s: s["total"])
+        # Find highest + lowest → both ends of the "total" sort index the store keeps up to date on every
+        # edit (SQLite: its total index); the rank / percentile columns come from RankIndex instead
+        highest = self.students.stats.top(1)
+        lowest  = self.students.stats.bottom(1)
+
+        if not highest:
+            tk.Label(
+                cards_frame,
+                text="No students yet — add one from the Manage menu.",
+                font=("Consolas", 13, "bold"),
+                fg="white",
+                bg="#0F1A24"
+            ).grid(row=0, column=0, columnspan=2, pady=40)
+            return
 
         # created a Card creator function 
         def create_card(parent, title, student, color, column):
@@ -401,13 +612,13 @@ class StudentManagerGUI:
             ).pack(anchor="w", pady=(0,10))
 
             text = (
-                f"Name: {student['name']}\n\n"
-                f"Number: {student['number']}\n\n"
-                f"Coursework Total: {student['coursework']}\n\n"
-                f"Exam Marks: {student['exam']}\n\n"
-                f"Overall Total: {student['total']}\n\n"
-                f"Percentage: {student['percent']:.1f}%\n\n"
-                f"Grade: {student['grade']}"
+                f"Name: {student.name}\n\n"
+                f"Number: {student.number}\n\n"
+                f"Coursework Total: {student.coursework}\n\n"
+                f"Exam Marks: {student.exam}\n\n"
+                f"Overall Total: {student.total}\n\n"
+                f"Percentage: {student.percent:.1f}%\n\n"
+                f"Grade: {student.grade}"
             )
 
             tk.Label(
@@ -420,13 +631,24 @@ class StudentManagerGUI:
             ).pack(anchor="w")
 
         # Create cards side by side so it appears clean
-        create_card(cards_frame, "Highest Scoring Student", highest, "#66FF7F", column=0)
-        create_card(cards_frame, "Lowest Scoring Student", lowest, "#FF6B6B", column=1)
+        create_card(cards_frame, "Highest Scoring Student", highest[0], "#66FF7F", column=0)
+        create_card(cards_frame, "Lowest Scoring Student", lowest[0], "#FF6B6B", column=1)
 
 
     # Opens manage menu (add / delete / update)
     # Keeps student modification actions grouped and accessible
     def open_extension_menu(self):
+        # Adding / deleting / updating needs the whole cohort (duplicate numbers, record versions)
+        if self.loading:
+            messagebox.showinfo("Still Loading",
+                                f"Students are still loading ({len(self.students):,} so far).\n"
+                                "The Manage menu opens once they are all in.")
+            return
+        if self.load_failed:
+            messagebox.showerror("Editing Disabled",
+                                 "The marks file could not be loaded completely, so editing is switched off.")
+            return
+
         menu = tk.Menu(  #Concept from linkedin course CH-05
             self.root,
             tearoff=0,
@@ -448,6 +670,14 @@ class StudentManagerGUI:
         menu.add_command(
             label="Update Student", 
             command=self.update_student_window)
+        menu.add_separator()
+        menu.add_command(
+            label="Import CSV",
+            command=self.import_csv)
+        menu.add_separator()
+        menu.add_command(
+            label="Export View",
+            command=self.export_view)
 
         # open menu near extension button
         menu.tk_popup(self.btn_ext.winfo_rootx(), self.btn_ext.winfo_rooty() + 35)
@@ -460,7 +690,7 @@ class StudentManagerGUI:
         # Resets background, UI elements, and table data
         self.records_frame.place(x=230, y=230, width=600, height=310)
         self.toggle_main_ui(True)    # to SHOW search, sort, summary again
-        self.show_table(self.students)
+        self.show_table(self.students.all())
         self.show_summary() #show the summary frame 
 
 
@@ -473,9 +703,8 @@ class StudentManagerGUI:
         # Resize + reposition records frame 
         self.records_frame.place(x=297, y=190, width=450, height=387)
 
-        # Clear old content
-        for w in self.records_frame.winfo_children():
-            w.destroy()
+        # Clear old content (table is kept, just hidden)
+        self.clear_records_frame()
 
         # Created centered form inside frame
         form = tk.Frame(self.records_frame, bg="#0F1A24")
@@ -496,6 +725,7 @@ class StudentManagerGUI:
             self.add_entries[text] = entry
 
         # Save Button Image
+        self.save_btn_img = self.load_image(self.btn_dir, "save_btn.png", (3, 3))
         save_btn = tk.Button(
             form,
             image=self.save_btn_img,
@@ -518,44 +748,19 @@ class StudentManagerGUI:
         cw3 = self.add_entries["CW3 Marks:"].get().strip()
         exam = self.add_entries["Exam Marks:"].get().strip()
 
-        fields = [num, name, cw1, cw2, cw3, exam]
-
-        #Empty field validation
-        if any(f == "" for f in fields):
-            messagebox.showerror("Missing Information",
-                                "Please fill all the fields before saving.")
-            return
-
-        #Student Number validation
-        if not num.isdigit():
-            messagebox.showerror("Invalid Student Number",
-                                "Student Number must contain digits only.")
+        # Same rules as the bulk CSV import (empty fields, digits-only number, no digits in name, marks 0–100)
+        try:
+            num, name, cw1, cw2, cw3, exam = validate_student_fields(num, name, cw1, cw2, cw3, exam)
+        except StudentValidationError as err:
+            messagebox.showerror(err.title, str(err))
             return
 
-        #Name validation
-        if any(ch.isdigit() for ch in name):
-            messagebox.showerror("Invalid Name",
-                                "Name must contain letters only, not numbers.")
+        #Unique number validation (hash lookup, no list scan)
+        if num in self.students:
+            messagebox.showerror("Duplicate Number",
+                                "A student with this number already exists.")
             return
 
-        #Marks must be valid numbers
-        try:
-            cw1 = int(cw1)
-            cw2 = int(cw2)
-            cw3 = int(cw3)
-            exam = int(exam)
-        except:
-            messagebox.showerror("Invalid Marks",
-                                "Marks must be numbers only (0–100).")
-            return
-
-        #Marks 0–100 range validation
-        for m in (cw1, cw2, cw3, exam):
-            if not (0 <= m <= 100):
-                messagebox.showerror("Invalid Marks",
-                                    "All marks must be between 0 and 100.")
-                return
-
         #Confirm popup
         confirm = messagebox.askyesno(
             "Confirm New Student",
@@ -569,33 +774,150 @@ class StudentManagerGUI:
             return
 
         # Calculates totals, grade, appends to text file, updates memory, and refreshes UI
-        coursework_total = cw1 + cw2 + cw3
-        total = coursework_total + exam
-        percent = total / 160 * 100
-        grade = self.calc_grade(percent)
-
-        #Append to file
-        with open(self.student_file, "a") as f:
-            f.write(f"\n{num},{name},{cw1},{cw2},{cw3},{exam}\n")
-
-        #Update memory
-        self.students.append({
-            "number": num,
-            "name": name,
-            "cw1": cw1,
-            "cw2": cw2,
-            "cw3": cw3,
-            "coursework": coursework_total,
-            "exam": exam,
-            "total": total,
-            "percent": percent,
-            "grade": grade
-        })
+        #One journal line (synced to disk in the background), then memory
+        try:
+            self.repo.add((num, name, cw1, cw2, cw3, exam))
+        except KeyError:    # another marker added this number while the popup was open
+            messagebox.showerror("Duplicate Number",
+                                "A student with this number already exists.")
+            return
+        except StudentConflictError as err:    # the students are being reloaded from disk
+            messagebox.showerror(err.title, str(err))
+            return
+        except OSError as err:
+            self.show_write_failed(err)
+            return
 
         messagebox.showinfo("Success ✔", "Student added successfully!")
         self.show_all_students()
 
 
+    # Bulk import → pick a CSV (number,name,cw1,cw2,cw3,exam per line) and import it in the background
+    def import_csv(self):
+        path = filedialog.askopenfilename(
+            title="Import Students",
+            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        self.importer = CsvImporter(path)
+        self.importer.start()
+        self.root.after(200, self.finish_import)
+
+    # Polls the import thread; once done, commits every valid new student in one batched write
+    def finish_import(self):
+        importer = self.importer
+        if not importer.done.is_set():
+            self.root.after(200, self.finish_import)
+            return
+
+        if importer.failure:
+            messagebox.showerror("Import Failed", f"Could not read the CSV file:\n{importer.failure}")
+            return
+
+        rows = importer.new_rows(self.students)   # duplicate check against the store + within the file
+        if rows:
+            try:
+                self.repo.add_many(rows)   # one batched journal write
+            except KeyError:
+                # another marker added some of these meanwhile (the store has them now) → import the rest
+                rows = importer.new_rows(self.students)
+                try:
+                    if rows:
+                        self.repo.add_many(rows)
+                except KeyError as err:
+                    messagebox.showerror("Import Failed",
+                                         f"Other markers are adding the same students, nothing was imported:\n{err}")
+                    self.show_all_students()
+                    return
+                except StudentConflictError as err:
+                    messagebox.showerror(err.title, str(err))
+                    return
+                except OSError as err:
+                    self.show_write_failed(err)
+                    return
+            except StudentConflictError as err:    # the students are being reloaded from disk
+                messagebox.showerror(err.title, str(err))
+                return
+            except OSError as err:
+                self.show_write_failed(err)
+                return
+
+        text = f"Imported {len(rows)} student(s)."
+        if importer.errors:
+            try:
+                report = importer.write_report()
+                text += f"\n\n{len(importer.errors)} row(s) were rejected.\nDetails: {report}"
+            except OSError as err:
+                text += f"\n\n{len(importer.errors)} row(s) were rejected (report not saved: {err})."
+
+        messagebox.showinfo("Import Finished", text)
+        self.show_all_students()
+
+    # Exports what the records table shows (full list, search result or sort order) with totals,
+    # percentages and grades → CSV or JSON Lines (picked by the file extension), written on a worker
+    # thread while a small window shows the progress
+    def export_view(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Students",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        rows = self.table.rows if self.table is not None else self.students.all()
+        self.exporter = StudentExporter(rows, path)
+        self.exporter.start()
+
+        self.export_win = tk.Toplevel(self.root)
+        self.export_win.title("Export Students")
+        self.export_win.geometry("380x170")
+        self.export_win.resizable(False, False)
+        self.export_win.configure(bg="#0F1A24")
+        self.export_win.protocol("WM_DELETE_WINDOW", self.exporter.cancel)
+
+        self.export_label = tk.Label(
+            self.export_win,
+            text=f"Exporting {self.exporter.total:,} students…",
+            font=("Consolas", 12),
+            fg="white",
+            bg="#0F1A24"
+        )
+        self.export_label.pack(pady=(20, 10))
+
+        self.export_bar = ttk.Progressbar(self.export_win, length=300, maximum=max(1, self.exporter.total))
+        self.export_bar.pack()
+
+        tk.Button(
+            self.export_win,
+            text="Cancel",
+            font=("Consolas", 11, "bold"),
+            bg="#FF6B6B",
+            fg="white",
+            width=10,
+            command=self.exporter.cancel
+        ).pack(pady=15)
+
+        self.root.after(100, self.poll_export)
+
+    # Moves the progress bar until the export thread is done, then reports where the file went
+    def poll_export(self):
+        exporter = self.exporter
+        if not exporter.done.is_set():
+            self.export_bar["value"] = exporter.written
+            self.export_label.config(text=f"Exported {exporter.written:,} of {exporter.total:,} students…")
+            self.root.after(100, self.poll_export)
+            return
+
+        self.export_win.destroy()
+        if exporter.failure:
+            messagebox.showerror("Export Failed", f"Could not write the export:\n{exporter.failure}")
+        elif not exporter.cancelled.is_set():
+            messagebox.showinfo("Export Finished",
+                                f"Exported {exporter.written:,} student(s) to:\n{exporter.path}")
+
     # Popup window for deleting students
     def delete_student_window(self):
         self.delete_win = tk.Toplevel(self.root)
@@ -645,6 +967,7 @@ class StudentManagerGUI:
         self.del_combo.pack()
 
         # DELETE BUTTON
+        self.delete_btn_img = self.load_image(self.btn_dir, "delete_btn.png", (3, 3))
         delete_btn = tk.Button(
             self.delete_win,
             image=self.delete_btn_img,
@@ -667,9 +990,12 @@ class StudentManagerGUI:
         results = []
 
         #Only shows matches in the dropdown (name or number starts with input)
-        for s in self.students:
-            if s["number"].lower().startswith(query) or s["name"].lower().startswith(query):
-                results.append(f"{s['number']} - {s['name']}")
+        matched = self.students.number_prefix(query)
+        matched_nums = {s.number for s in matched}
+        matched += [s for s in self.students.name_prefix(query) if s.number not in matched_nums]
+
+        for s in matched:
+            results.append(f"{s.number} - {s.name}")
 
         # update dropdown
         self.del_combo["values"] = results
@@ -692,8 +1018,8 @@ class StudentManagerGUI:
         # extract the real student number from dropdown
         student_num = selected.split(" - ")[0].strip()
 
-        # final check: check if num exists in list
-        match = next((s for s in self.students if s["number"] == student_num), None)
+        # final check: check if num exists in store (hash lookup)
+        match = self.students.get(student_num)
         if not match:
             messagebox.showerror("Invalid Selection", "The selected student does not exist.")
             return
@@ -706,15 +1032,19 @@ class StudentManagerGUI:
         if not ok:
             return
 
-        # remove from memory
-        self.students = [s for s in self.students if s["number"] != student_num]
-
-        # rewrite full file (reference: lecture notes)
-        with open(self.student_file, "w") as f:
-            for s in self.students:
-                # store exactly as originally read
-                cw1 = cw2 = cw3 = s["coursework"] // 3
-                f.write(f"{s['number']},{s['name']},{cw1},{cw2},{cw3},{s['exam']}\n")
+        # record the delete in the journal instead of rewriting the full file, then remove from memory
+        # (refused if another marker changed or deleted the student while the popup was open)
+        try:
+            self.repo.delete(student_num, expected=match)
+        except StudentConflictError as err:
+            messagebox.showerror(err.title, str(err))
+            self.filter_delete_results()
+            self.show_all_students()
+            return
+        except OSError as err:
+            self.show_write_failed(err)
+            return
+        self.row_cache.pop(student_num, None)
 
         messagebox.showinfo("Deleted Successfully", "Student record has been removed.")
         self.delete_win.destroy()
@@ -821,14 +1151,14 @@ class StudentManagerGUI:
 
         results = []
 
-        for s in self.students:
-            num = s["number"].lower()
-            name = s["name"].lower()
+        # FILTER:
+        # Supports full number match or name starting with query
+        exact = self.students.get(query)
+        matched = [exact] if exact else []
+        matched += [s for s in self.students.name_prefix(query) if s is not exact]
 
-            # FILTER:
-            # Supports full number match or name starting with query
-            if num == query or name.startswith(query):
-                results.append(f"{s['number']} - {s['name']}")
+        for s in matched:
+            results.append(f"{s.number} - {s.name}")
 
         self.update_combo["values"] = results
 
@@ -872,6 +1202,7 @@ class StudentManagerGUI:
         )
         self.update_combo.pack()
         self.update_combo.bind("<<ComboboxSelected>>", self.fill_update_fields)
+        self.update_base = None    # the record the form was filled from → version checked on save
 
         #FORM FIELDS (This section includes auto-fill)
 
@@ -891,6 +1222,7 @@ class StudentManagerGUI:
             self.update_entries[txt] = e
 
         #UPDATE BUTTON    
+        self.update_btn_img = self.load_image(self.btn_dir, "update_btn.png", (3, 3))
         update_btn = tk.Button(
                 self.update_win,
                 image=self.update_btn_img,
@@ -909,39 +1241,45 @@ class StudentManagerGUI:
 
         num = selected.split(" - ")[0]
 
-        # Find selected student
-        for s in self.students:
-            if s["number"] == num:
-                self.update_entries["Student Number:"].delete(0, tk.END)
-                self.update_entries["Student Number:"].insert(0, s["number"])
+        # Find selected student (hash lookup by number)
+        s = self.students.get(num)
+        if not s:
+            return
+        self.load_update_form(s)
+
+    def load_update_form(self, s):
+        self.update_base = s
+
+        self.update_entries["Student Number:"].delete(0, tk.END)
+        self.update_entries["Student Number:"].insert(0, s.number)
 
-                self.update_entries["Name:"].delete(0, tk.END)
-                self.update_entries["Name:"].insert(0, s["name"])
+        self.update_entries["Name:"].delete(0, tk.END)
+        self.update_entries["Name:"].insert(0, s.name)
 
-                # saved only coursework sum; so rewrite split values from file
-                # reload raw exact CW values from file
-                with open(self.student_file) as f:
-                    for line in f:
-                        p = line.strip().split(",")
-                        if p[0] == num:
-                            cw1, cw2, cw3 = p[2], p[3], p[4]
-                            exam = p[5]
+        # exact CW values are kept in memory (the base file may not have the journal edits yet)
+        cw1, cw2, cw3, exam = s.cw1, s.cw2, s.cw3, s.exam
 
-                self.update_entries["CW1:"].delete(0, tk.END)
-                self.update_entries["CW1:"].insert(0, cw1)
+        self.update_entries["CW1:"].delete(0, tk.END)
+        self.update_entries["CW1:"].insert(0, cw1)
 
-                self.update_entries["CW2:"].delete(0, tk.END)
-                self.update_entries["CW2:"].insert(0, cw2)
+        self.update_entries["CW2:"].delete(0, tk.END)
+        self.update_entries["CW2:"].insert(0, cw2)
 
-                self.update_entries["CW3:"].delete(0, tk.END)
-                self.update_entries["CW3:"].insert(0, cw3)
+        self.update_entries["CW3:"].delete(0, tk.END)
+        self.update_entries["CW3:"].insert(0, cw3)
 
-                self.update_entries["Exam:"].delete(0, tk.END)
-                self.update_entries["Exam:"].insert(0, exam)
-                break
+        self.update_entries["Exam:"].delete(0, tk.END)
+        self.update_entries["Exam:"].insert(0, exam)
 
     # Validates changes, rewrites the record inside text file
     def save_updated_student(self):
+        # The student being updated comes from the dropdown → nothing picked, nothing to update
+        selected = self.update_combo.get()
+        old_number = selected.split(" - ")[0].strip()
+        if old_number == "":
+            messagebox.showerror("No Student Selected", "Please select a valid student from the list.")
+            return
+
         # Extract inputs
         num = self.update_entries["Student Number:"].get().strip()
         name = self.update_entries["Name:"].get().strip()
@@ -950,26 +1288,17 @@ class StudentManagerGUI:
         cw3 = self.update_entries["CW3:"].get().strip()
         exam = self.update_entries["Exam:"].get().strip()
 
-        # Basic validation
-        if not num or not name or not cw1 or not cw2 or not cw3 or not exam:
-            messagebox.showerror("Missing Fields", "Please fill all fields.")
+        # Same rules as the Add form (no commas in names → the journal line keeps its 8 fields)
+        try:
+            num, name, cw1, cw2, cw3, exam = validate_student_fields(num, name, cw1, cw2, cw3, exam)
+        except StudentValidationError as err:
+            messagebox.showerror(err.title, str(err))
             return
 
         # Check duplicate student number
-        selected = self.update_combo.get()
-        old_number = selected.split(" - ")[0]
-
-        if num != old_number:
-            for s in self.students:
-                if s["number"] == num:
-                    messagebox.showerror("Duplicate Number",
-                                        "A student with this number already exists.")
-                    return
-
-        try:
-            cw1, cw2, cw3, exam = int(cw1), int(cw2), int(cw3), int(exam)
-        except:
-            messagebox.showerror("Invalid Marks", "Enter valid numbers for marks.")
+        if num != old_number and num in self.students:
+            messagebox.showerror("Duplicate Number",
+                                "A student with this number already exists.")
             return
 
         # Confirm popup
@@ -980,22 +1309,39 @@ class StudentManagerGUI:
         if not ok:
             return
 
-        # Update file (rewrite)
-        new_lines = []
-        with open(self.student_file) as f:
-            for line in f:
-                p = line.strip().split(",")
-                if p[0] == old_number:
-                    new_lines.append(f"{num},{name},{cw1},{cw2},{cw3},{exam}\n")
-                else:
-                    new_lines.append(line)
-
-        with open(self.student_file, "w") as f:
-            f.writelines(new_lines)
-
-        # Update internal list
-        self.students = self.load_students()
+        # One journal line (compacted later), then the internal store in place (re-indexes just
+        # this record, no reload). Checked against the version the form was filled from:
+        # another marker's changes to other fields are merged in, clashing changes are refused.
+        base = self.update_base if self.update_base and self.update_base.number == old_number else None
+        row = (num, name, cw1, cw2, cw3, exam)
+        try:
+            record = self.repo.update(old_number, row, expected=base)
+        except StudentConflictError as err:
+            if err.current is not None:
+                self.load_update_form(err.current)
+                messagebox.showerror(err.title, f"{err}\n\nThe form now shows their values.")
+            else:
+                messagebox.showerror(err.title, str(err))
+            self.show_all_students()
+            return
+        except KeyError:
+            if old_number not in self.students:    # deleted by another marker meanwhile
+                messagebox.showerror("Student Removed",
+                                    f"Student {old_number} was deleted or renumbered by another user.")
+                self.show_all_students()
+            else:    # new number was taken by another marker meanwhile
+                messagebox.showerror("Duplicate Number",
+                                    "A student with this number already exists.")
+            return
+        except OSError as err:    # journal append failed → the student was left as it was
+            self.show_write_failed(err)
+            return
+        self.row_cache.pop(old_number, None)
 
+        if record.row != row:
+            messagebox.showinfo("Merged",
+                                "Another marker changed this student while you were editing.\n"
+                                "Their changes to the other fields were kept.")
         messagebox.showinfo("Success", "Student updated successfully!")
         self.update_win.destroy()
         self.show_all_students()
@@ -1004,5 +1350,6 @@ class StudentManagerGUI:
 # RUN APP
 if __name__ == "__main__":
     root = tk.Tk()
-    StudentManagerGUI(root)
+    StudentManagerGUI(root, use_sqlite="--sqlite" in sys.argv[1:])
+    profiler.first_frame(root)  # reports once the dashboard is on screen
     root.mainloop()
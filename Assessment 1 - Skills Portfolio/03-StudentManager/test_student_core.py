@@ -0,0 +1,924 @@
+# Tests for the Tk-free core (run with `python -m pytest` from this folder or the repo root).
+# Every test works on its own marks file in tmp_path; nothing here needs a display, PIL or NumPy.
+import csv
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from student_core import (StudentStore, StudentRepository, StudentJournal, StudentSnapshot,
+                          StudentConflictError, StudentValidationError, GradingEngine, NGramIndex,
+                          RankIndex, CsvImporter, resolve_edit, SqliteStudentRepository,
+                          validate_student_fields, validate_csv_chunk, SearchWorker, StudentRecord,
+                          StudentWriter, StudentExporter, SqliteStudentStore)
+
+FIRST = ("John", "Sam", "Lee", "Amira", "Chen", "Sofia", "Élodie", "Øyvind")
+LAST = ("Curry", "Scott", "Khan", "Patel", "Wong", "Garcia", "Ångström")
+
+
+# Seeded (number, name, cw1, cw2, cw3, exam) rows with unique digit-only numbers
+def make_rows(count, seed=1):
+    rng = random.Random(seed)
+    return [(str(num), f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+             rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 100))
+            for num in rng.sample(range(10000, 99999), count)]
+
+
+def write_marks(path, rows, extra_lines=()):
+    with open(path, "w") as f:
+        f.write(f"{len(rows)}\n")
+        for row in rows:
+            f.write(",".join(map(str, row)) + "\n")
+        for line in extra_lines:
+            f.write(line + "\n")
+    return str(path)
+
+
+# What a fresh text parse of the files gives → the reference every store must end up matching
+def disk_rows(path):
+    return sorted(r.row for r in StudentRepository(path, use_snapshot=False).iter_records())
+
+
+def store_rows(store):
+    return sorted(s.row for s in store)
+
+
+# Every index of the store against the same thing rebuilt by brute force from its live records
+def assert_consistent(store):
+    live = [s for s in store.by_seq if s is not None]
+    assert len(store) == len(live)
+    assert all(store.by_number[s.number] is s for s in live)
+    assert [store.by_seq[q].number for q in store.numbers] == sorted(s.number for s in live)
+    for name, key in StudentStore.SORT_KEYS.items():
+        expected = [s.seq for s in sorted(live, key=lambda s: (key(s), s.seq))]
+        assert list(store.sorted[name]) == expected, name
+
+    rebuilt = NGramIndex()
+    for s in live:
+        rebuilt.add(s.seq, s.number.lower(), s.name.lower())
+    assert ({g: list(v) for g, v in store.ngrams.postings.items()}
+            == {g: list(v) for g, v in rebuilt.postings.items()})
+
+    stats = store.stats
+    percents = [s.percent for s in live]
+    assert stats.count == len(live)
+    if live:
+        mean = sum(percents) / len(live)
+        assert stats.mean == pytest.approx(mean)
+        assert stats.variance == pytest.approx(sum((p - mean) ** 2 for p in percents) / len(live))
+    assert +stats.grades == Counter(s.grade for s in live)
+
+
+# Stand-in for a Tk root → after() callbacks are queued and run by step() / run_until()
+class FakeRoot:
+
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, func, *args):
+        self.calls.append((func, args))
+
+    def step(self):
+        calls, self.calls = self.calls, []
+        for func, args in calls:
+            func(*args)
+
+    def run_until(self, condition, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "timed out"
+            time.sleep(0.001)
+            self.step()
+
+
+# Repository loaded the way the ext GUI does it (background loader + watcher) → (repo, root, changes)
+def gui_repo(path):
+    repo, root, changes, done = StudentRepository(path), FakeRoot(), [], []
+    repo.start_loading(root, lambda loaded, total, finished, error: done.append(finished))
+    root.run_until(lambda: done and done[-1])
+    repo.start_watcher(root, changes.append)
+    return repo, root, changes
+
+
+# --- StudentStore -------------------------------------------------------------------------------
+
+def test_store_indexes_follow_add_update_delete():
+    rng = random.Random(7)
+    rows = make_rows(300)
+    store = StudentStore(GradingEngine.records(rows[:200]))
+    assert_consistent(store)
+
+    for row in rows[200:]:
+        store.add(GradingEngine.record(*row))
+    for num in rng.sample(sorted(store.by_number), 60):
+        store.remove(num)
+    for num in rng.sample(sorted(store.by_number), 60):
+        s = store.get(num)
+        new_num = num if rng.random() < 0.5 else str(int(num) + 100000)
+        store.update(num, GradingEngine.record(new_num, s.name[::-1], s.exam % 21, s.cw1, s.cw2, s.cw3))
+    assert_consistent(store)
+
+
+def test_store_extend_sorts_pending_records_on_the_next_edit():
+    rows = make_rows(120)
+    store = StudentStore()
+    store.extend(GradingEngine.records(rows[:100]), sort=False)
+    store.add(GradingEngine.record(*rows[100]))
+    store.extend(GradingEngine.records(rows[101:]), sort=False, search_index=False)
+    store.adopt()
+    assert_consistent(store)
+
+
+def test_store_refuses_duplicate_numbers():
+    rows = make_rows(5)
+    store = StudentStore(GradingEngine.records(rows))
+    with pytest.raises(KeyError):
+        store.add(GradingEngine.record(*rows[0]))
+    with pytest.raises(KeyError):
+        store.update(rows[1][0], GradingEngine.record(rows[2][0], "Other Name", 1, 1, 1, 1))
+    assert_consistent(store)
+
+
+def test_search_and_prefix_lookups_match_a_scan():
+    store = StudentStore(GradingEngine.records(make_rows(400)))
+    for query in ("jo", "curry", "n sc", "123", "élodie", "zzz"):
+        expected = [s.number for s in store if query in s.number.lower() or query in s.name.lower()]
+        assert store.search_ids(query) == expected, query
+    assert ({s.number for s in store.name_prefix("sam")}
+            == {s.number for s in store if s.name.lower().startswith("sam")})
+    assert ({s.number for s in store.number_prefix("12")}
+            == {s.number for s in store if s.number.startswith("12")})
+
+
+# Regression → slices with a negative step came back empty or in the wrong place
+def test_sorted_views_slice_like_lists(tmp_path):
+    path = write_marks(tmp_path / "marks.txt", make_rows(25))
+    sqlite = SqliteStudentRepository(path, str(tmp_path / "marks.db"))
+    sqlite.load()
+    for store in (StudentStore(GradingEngine.records(make_rows(25))), sqlite.store):
+        for mode in StudentStore.SORT_MODES:
+            view = store.sorted_view(mode)
+            full = list(view)
+            assert len(view) == len(full) == 25
+            assert [view[i].number for i in range(-25, 25)] == [s.number for s in full + full]
+            for start, stop, step in itertools.product([None, 0, 3, -4, 30, -30], [None, 0, 5, -2, 30],
+                                                       [None, 1, 2, -1, -3]):
+                assert ([s.number for s in view[start:stop:step]]
+                        == [s.number for s in full[start:stop:step]]), (mode, start, stop, step)
+    sqlite.close()
+
+
+# --- RankIndex / CohortStats --------------------------------------------------------------------
+
+def test_rank_index_matches_brute_force():
+    rng = random.Random(3)
+    ranks, totals = RankIndex(), []
+    for _ in range(2000):
+        if totals and rng.random() < 0.3:
+            ranks.remove(totals.pop(rng.randrange(len(totals))))
+        else:
+            total = rng.randint(-20, 400)    # outside 0–160 → the tree grows
+            ranks.add(total)
+            totals.append(total)
+    assert ranks.count == len(totals)
+    for t in range(-25, 410, 7):
+        assert ranks.below(t) == sum(1 for x in totals if x < t)
+        assert ranks.above(t) == sum(1 for x in totals if x > t)
+        assert ranks.rank(t) == 1 + sum(1 for x in totals if x > t)
+        assert ranks.percentile(t) == pytest.approx(100 * sum(1 for x in totals if x <= t) / len(totals))
+
+
+def test_top_and_bottom_by_total():
+    store = StudentStore(GradingEngine.records(make_rows(200)))
+    by_total = sorted(store, key=lambda s: (s.total, s.seq))
+    assert [s.total for s in store.stats.top(10)] == sorted((s.total for s in store), reverse=True)[:10]
+    assert store.stats.bottom(5) == by_total[:5]
+    assert StudentStore().stats.top(3) == []
+
+
+# --- resolve_edit -------------------------------------------------------------------------------
+
+def test_resolve_edit_merges_other_fields_and_refuses_clashes():
+    base = GradingEngine.record("1001", "Ann Lee", 10, 10, 10, 50)
+    theirs = GradingEngine.record("1001", "Ann Lee", 15, 10, 10, 50)
+    theirs.version = base.version + 1
+
+    assert resolve_edit("1001", theirs, None, ("1001", "Ann Lee", 1, 1, 1, 1)) == ("1001", "Ann Lee", 1, 1, 1, 1)
+    assert resolve_edit("1001", base, base, ("1001", "Ann Li", 10, 10, 10, 50)) == ("1001", "Ann Li", 10, 10, 10, 50)
+    # they changed CW1, we changed the exam → both kept
+    assert resolve_edit("1001", theirs, base, ("1001", "Ann Lee", 10, 10, 10, 70)) == ("1001", "Ann Lee", 15, 10, 10, 70)
+    # both changed CW1 to different values → refused, with their record attached
+    with pytest.raises(StudentConflictError) as err:
+        resolve_edit("1001", theirs, base, ("1001", "Ann Lee", 12, 10, 10, 50))
+    assert err.value.title == "Update Conflict" and err.value.current is theirs
+    # delete from a stale version, and any edit of a student that is gone
+    with pytest.raises(StudentConflictError, match="changed"):
+        resolve_edit("1001", theirs, base)
+    with pytest.raises(StudentConflictError, match="deleted"):
+        resolve_edit("1001", None, base, ("1001", "Ann Lee", 10, 10, 10, 50))
+
+
+# --- SearchWorker -------------------------------------------------------------------------------
+
+# Store whose searches are logged and can be held at a gate → (store, searched, gate)
+def gated_store(count=300):
+    store, searched, gate = StudentStore(GradingEngine.records(make_rows(count))), [], threading.Event()
+    gate.set()
+    search = store.search
+
+    def held_search(query):
+        searched.append(query)
+        gate.wait()
+        return search(query)
+    store.search = held_search
+    return store, searched, gate
+
+
+def test_search_worker_posts_only_the_newest_query():
+    store, searched, gate = gated_store()
+    root, results = FakeRoot(), []
+    worker = SearchWorker(store, root, lambda query, records: results.append((query, records)))
+
+    gate.clear()
+    worker.submit("jo")
+    root.run_until(lambda: searched)
+    worker.submit("sam")    # skipped → a newer query is already waiting
+    worker.submit("lee")
+    gate.set()
+    root.run_until(lambda: results)
+    assert searched == ["jo", "lee"]
+    assert [(query, [s.number for s in records]) for query, records in results] == [
+        ("lee", [s.number for s in store.search("lee")])]
+
+    gate.clear()
+    worker.submit("khan")
+    root.run_until(lambda: searched[-1] == "khan")
+    worker.cancel()         # search box cleared while it ran → its result is dropped
+    gate.set()
+    worker.submit("wong")
+    root.run_until(lambda: len(results) == 2)
+    assert [query for query, _ in results] == ["lee", "wong"]
+
+
+def test_search_worker_cache_follows_the_store_version():
+    store, searched, gate = gated_store()
+    root, results = FakeRoot(), []
+    worker = SearchWorker(store, root, lambda query, records: results.append((query, records)), cache_size=2)
+
+    def search(query):
+        count = len(results)
+        worker.submit(query)
+        root.run_until(lambda: len(results) > count)
+        return [s.number for s in results[-1][1]]
+
+    first = search("scott")
+    assert search("scott") == first and searched == ["scott"]    # cached
+    store.add(GradingEngine.record("12345", "Brand Scott", 1, 2, 3, 4))
+    assert search("scott") == first + ["12345"] and searched == ["scott"] * 2
+    search("khan")
+    search("wong")          # cache of 2 → "scott" is evicted
+    search("scott")
+    assert searched == ["scott", "scott", "khan", "wong", "scott"]
+
+
+# --- Journal ------------------------------------------------------------------------------------
+
+def test_journal_replay_and_compaction_keep_every_edit(tmp_path):
+    rows = make_rows(50)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    repo.add(("55555", "New Student", 1, 2, 3, 4))
+    repo.update(rows[0][0], (rows[0][0], "Renamed", 5, 5, 5, 5))
+    repo.update(rows[1][0], ("66666", rows[1][1], *rows[1][2:]))
+    repo.delete(rows[2][0])
+    expected = store_rows(repo.store)
+
+    assert disk_rows(path) == expected    # marks file + journal replayed
+    repo.journal.fold_journal()
+    assert not os.path.exists(repo.journal.journal_file)
+    assert disk_rows(path) == expected    # folded into the marks file
+    with open(path) as f:
+        assert int(f.readline()) == len(expected)
+    fresh = StudentRepository(path, use_snapshot=False)
+    fresh.load()
+    assert_consistent(fresh.store)
+
+
+def test_half_finished_compaction_is_replayed(tmp_path):
+    rows = make_rows(20)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    repo.update(rows[0][0], (rows[0][0], "Before Rename", 1, 1, 1, 1))
+    os.replace(repo.journal.journal_file, repo.journal.compact_file)    # crash right after the rename
+    repo.update(rows[1][0], (rows[1][0], "After Rename", 2, 2, 2, 2))
+    assert disk_rows(path) == store_rows(repo.store)
+
+
+# Regression → a name with a comma was saved in memory but written as a 9-field journal line
+def test_update_with_a_comma_is_refused_before_anything_changes(tmp_path):
+    rows = make_rows(5)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    with pytest.raises(StudentValidationError):
+        repo.update(rows[0][0], (rows[0][0], "Curry, John", 1, 1, 1, 1))
+    with pytest.raises(StudentValidationError):
+        repo.add(("77777", "Line\nBreak", 1, 1, 1, 1))
+    assert repo.get(rows[0][0]).name == rows[0][1]
+    assert not os.path.exists(repo.journal.journal_file)
+
+
+def test_malformed_journal_lines_are_reported_and_a_torn_tail_ignored(tmp_path):
+    rows = make_rows(5)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    with open(path + ".journal", "w") as f:
+        f.write(StudentJournal.update_line(rows[0][0], (rows[0][0], "Good Edit", 1, 1, 1, 1)) + "\n")
+        f.write(f"~,{rows[1][0]},{rows[1][0]},Curry, John,1,1,1,1\n")
+        f.write(f"+,{rows[2][0]},Torn")    # crash mid-write, no newline
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    assert repo.get(rows[0][0]).name == "Good Edit"
+    assert [(line_no, reason) for line_no, _, reason in repo.load_errors] == [
+        (2, "marks.txt.journal: expected 8 fields, found 9")]
+
+
+# Regression → a repeated student number aborted the whole load
+def test_repeated_numbers_keep_the_first_and_are_reported(tmp_path):
+    rows = make_rows(10)
+    dup = (rows[3][0], "Second Copy", 1, 1, 1, 1)
+    path = write_marks(tmp_path / "marks.txt", rows, [",".join(map(str, dup))])
+    repo = StudentRepository(path, use_snapshot=False)
+    store = repo.load()
+    assert len(store) == 10 and store.get(rows[3][0]).name == rows[3][1]
+    assert [reason for _, _, reason in repo.load_errors] == ["duplicate student number (the first one is kept)"]
+
+
+# Regression → add_many added rows one at a time, so a duplicate half-way left the batch half-added
+def test_add_many_is_all_or_nothing(tmp_path):
+    rows = make_rows(30)
+    path = write_marks(tmp_path / "marks.txt", rows[:20])
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    with pytest.raises(KeyError):
+        repo.add_many(rows[20:25] + [rows[0]])
+    with pytest.raises(KeyError):
+        repo.add_many(rows[20:25] + [rows[20]])
+    assert len(repo.store) == 20
+    repo.add_many(rows[20:])
+    assert_consistent(repo.store)
+    assert disk_rows(path) == store_rows(repo.store)
+
+
+# Regression → the store was changed before the journal append, so a failed write left an edit in
+# memory that was never saved (and the GUI reported both "Save Failed" and success)
+@pytest.mark.parametrize("background", [False, True])
+def test_failed_append_changes_nothing(tmp_path, monkeypatch, background):
+    rows = make_rows(20)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = StudentRepository(path, use_snapshot=False)
+    repo.load()
+    saved, writer = [], None
+    if background:
+        writer = repo.start_writer(None, lambda count, error: saved.append((count, error)))
+
+    def full_disk(self, lines, sync=True):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(StudentJournal, "append", full_disk)
+    before, version = store_rows(repo.store), repo.store.version
+    for edit in (lambda: repo.add(("12345", "Brand New", 1, 2, 3, 4)),
+                 lambda: repo.add_many([("12345", "Brand New", 1, 2, 3, 4)]),
+                 lambda: repo.update(rows[0][0], (rows[0][0], "New Name", 1, 2, 3, 4)),
+                 lambda: repo.delete(rows[1][0])):
+        with pytest.raises(OSError):
+            edit()
+    assert store_rows(repo.store) == before and repo.store.version == version
+    assert_consistent(repo.store)
+
+    monkeypatch.undo()
+    with pytest.raises(KeyError):
+        repo.update("00000", ("00000", "Nobody", 1, 1, 1, 1))
+    with pytest.raises(KeyError):
+        repo.update(rows[0][0], (rows[2][0], "Clash", 1, 1, 1, 1))
+    repo.delete(rows[1][0])
+    repo.close()
+    if writer:
+        writer.poll_results()
+    assert saved == ([(1, None)] if background else [])
+    assert disk_rows(path) == sorted(rows[:1] + rows[2:]) == store_rows(repo.store)
+
+
+def test_writer_shares_one_sync_between_close_edits_and_reports_failures(tmp_path, monkeypatch):
+    path = write_marks(tmp_path / "marks.txt", [])
+    journal, syncs, saved = StudentJournal(path), [], []
+    writer = StudentWriter(journal, on_saved=lambda count, error: saved.append((count, error)), delay=0.5)
+    monkeypatch.setattr(journal, "sync", lambda: syncs.append(1))
+    for row in make_rows(5):
+        writer.submit([StudentJournal.add_line(row)])
+    writer.flush()
+    writer.poll_results()
+    assert (len(syncs), saved) == (1, [(5, None)])
+
+    def failing_sync():
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(journal, "sync", failing_sync)
+    writer.submit([StudentJournal.delete_line(make_rows(1)[0][0])])
+    writer.close()
+    writer.poll_results()
+    assert saved[1][0] == 1 and isinstance(saved[1][1], OSError)
+    assert len(disk_rows(path)) == 4    # appended straight away, only the fsync failed
+
+
+# Regression → a retried import listed the numbers that were already taken twice
+def test_csv_importer_rebuilds_its_errors_on_each_call(tmp_path):
+    rows = make_rows(6)
+    store = StudentStore(GradingEngine.records(rows[:2]))
+    importer = CsvImporter(str(tmp_path / "import.csv"))
+    importer.valid = [(i + 1, row) for i, row in enumerate(rows + [rows[4]])]
+    importer.invalid = [(9, "bad,line", "expected 6 fields, found 2")]
+    assert importer.new_rows(store) == rows[2:]
+    store.add(GradingEngine.record(*rows[2]))
+    assert importer.new_rows(store) == rows[3:]
+    assert [line_no for line_no, _, _ in importer.errors] == [1, 2, 3, 7, 9]
+
+
+def test_validate_student_fields():
+    assert validate_student_fields(" 1001 ", " Ann Lee ", "10", "0", "20", "100") == ("1001", "Ann Lee", 10, 0, 20, 100)
+    for fields, title in [(("", "Ann", "1", "1", "1", "1"), "Missing Information"),
+                          (("10a", "Ann", "1", "1", "1", "1"), "Invalid Student Number"),
+                          (("1001", "Ann 2", "1", "1", "1", "1"), "Invalid Name"),
+                          (("1001", "Lee, Ann", "1", "1", "1", "1"), "Invalid Name"),
+                          (("1001", "Ann", "x", "1", "1", "1"), "Invalid Marks"),
+                          (("1001", "Ann", "1", "1", "1", "101"), "Invalid Marks")]:
+        with pytest.raises(StudentValidationError) as err:
+            validate_student_fields(*fields)
+        assert err.value.title == title, fields
+
+
+def test_validate_csv_chunk_splits_valid_and_rejected_rows():
+    valid, errors = validate_csv_chunk([(1, ["1001", "Ann Lee", "1", "2", "3", "4"]),
+                                        (2, ["1002", "Bob"]),
+                                        (3, ["1003", "Bad�Name", "1", "2", "3", "4"]),
+                                        (4, ["1004", "Cy", "1", "2", "3", "400"])])
+    assert valid == [(1, ("1001", "Ann Lee", 1, 2, 3, 4))]
+    assert [(line_no, reason) for line_no, _, reason in errors] == [
+        (2, "expected 6 fields, found 2"), (3, "not valid UTF-8 text"), (4, "All marks must be between 0 and 100.")]
+
+
+def run_import(importer):
+    importer.start()
+    assert importer.done.wait(60)
+    return importer
+
+
+# Regression → a non-UTF-8 byte stopped the import thread with failure unset, so the rows read so far
+# were committed as if the import had succeeded
+def test_csv_import_rejects_bad_bytes_per_row(tmp_path):
+    path = tmp_path / "import.csv"
+    rows = make_rows(30)
+    lines = [b"Number,Name,CW1,CW2,CW3,Exam"] + [",".join(map(str, r)).encode() for r in rows]
+    lines[11] = b"55555,Ren\xe9e Khan,1,2,3,4"    # Latin-1 é
+    lines.append("66666,Élodie Wong,1,2,3,4".encode())
+    path.write_bytes(b"\n".join(lines) + b"\n")
+
+    importer = run_import(CsvImporter(str(path), chunk_size=7, workers=2))
+    assert importer.failure is None
+    assert [row for _, row in sorted(importer.valid)] == [*rows[:10], *rows[11:], ("66666", "Élodie Wong", 1, 2, 3, 4)]
+    assert [(line_no, reason) for line_no, _, reason in importer.invalid] == [(12, "not valid UTF-8 text")]
+    importer.new_rows(StudentStore())
+    with open(importer.write_report(), encoding="utf-8") as f:
+        assert "Line 12: not valid UTF-8 text" in f.read()
+
+
+def test_csv_import_failure_is_reported_not_swallowed(tmp_path, monkeypatch):
+    assert isinstance(run_import(CsvImporter(str(tmp_path / "missing.csv"))).failure, OSError)
+
+    path = tmp_path / "import.csv"
+    path.write_text("1001,Ann Lee,1,2,3,4\n")
+
+    def broken_chunks(self):
+        yield [(1, ["1001", "Ann Lee", "1", "2", "3", "4"])]
+        raise ValueError("worker went away")
+
+    monkeypatch.setattr(CsvImporter, "read_chunks", broken_chunks)
+    importer = run_import(CsvImporter(str(path), workers=1))
+    assert isinstance(importer.failure, ValueError)
+
+
+# --- Export -------------------------------------------------------------------------------------
+
+def run_export(exporter):
+    exporter.start()
+    assert exporter.done.wait(60)
+    return exporter
+
+
+def expected_export(view):
+    return [[s.number, s.name, s.cw1, s.cw2, s.cw3, s.exam, s.coursework, s.total, round(s.percent, 3), s.grade]
+            for s in view]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_export_writes_the_view_in_order_as_csv_and_jsonl(tmp_path, backend):
+    path = write_marks(tmp_path / "marks.txt", make_rows(400))
+    if backend == "memory":
+        repo = StudentRepository(path, use_snapshot=False)
+    else:
+        repo = SqliteStudentRepository(path, str(tmp_path / "marks.db"))
+    repo.load()
+    view = repo.sorted_view("percent_desc")
+    expected = expected_export(view)
+
+    exporter = run_export(StudentExporter(view, str(tmp_path / "out.csv")))
+    assert (exporter.failure, exporter.written, exporter.total) == (None, 400, 400)
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+    assert tuple(header) == StudentExporter.FIELDS
+    assert rows == [[str(v) for v in row] for row in expected]
+
+    run_export(StudentExporter(repo.search("élodie"), str(tmp_path / "out.JSONL")))
+    with open(tmp_path / "out.JSONL", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [dict(zip(StudentExporter.FIELDS, row)) for row in expected_export(repo.search("élodie"))]
+    assert lines
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    repo.close()
+
+
+def test_cancelled_or_failed_export_leaves_nothing_behind(tmp_path):
+    store = StudentStore(GradingEngine.records(make_rows(50)))
+    exporter = StudentExporter(store.sorted_view("name_asc"), str(tmp_path / "out.csv"))
+    exporter.cancel()
+    assert run_export(exporter).failure is None
+    exporter = run_export(StudentExporter(store.all(), str(tmp_path / "missing" / "out.csv")))
+    assert isinstance(exporter.failure, OSError)
+    assert os.listdir(tmp_path) == []
+
+
+# --- Snapshot -----------------------------------------------------------------------------------
+
+def test_warm_start_matches_a_cold_load(tmp_path):
+    rows = make_rows(500)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = StudentRepository(path)
+    repo.load()
+    for row in rows[:40]:
+        repo.delete(row[0])    # gaps in the seqs → remapped in the snapshot
+    repo.update(rows[50][0], (rows[50][0], "Zed Last", 20, 20, 20, 100))
+    repo.close()
+
+    warm = StudentRepository(path)
+    assert warm.snapshot.is_fresh()
+    store = warm.load()
+    assert store_rows(store) == disk_rows(path)
+    assert_consistent(store)
+    assert [s.number for s in store] == [s.number for s in StudentStore(warm.iter_records())]
+
+    warm.add(("12345", "Brand New", 1, 2, 3, 4))
+    warm.delete(rows[60][0])
+    assert_consistent(warm.store)
+
+
+def test_background_warm_start_adopts_the_stored_indexes(tmp_path):
+    path = write_marks(tmp_path / "marks.txt", make_rows(3000))
+    StudentRepository(path).load()    # text load → writes the snapshot
+    repo, _, _ = gui_repo(path)
+    assert not repo.store.ngrams_pending
+    assert_consistent(repo.store)
+
+
+def test_snapshot_with_a_mismatched_signature_is_not_used(tmp_path):
+    path = write_marks(tmp_path / "marks.txt", make_rows(20))
+    repo = StudentRepository(path)
+    repo.load()
+    with open(path, "a") as f:
+        f.write("99999,Late Addition,1,1,1,1\n")
+    assert not StudentSnapshot(path).is_fresh()
+    assert StudentRepository(path).load().get("99999") is not None
+
+
+# Regression → closing stamped the snapshot with files that held another instance's newer edits
+def test_snapshot_written_on_close_includes_other_instances_edits(tmp_path):
+    rows = make_rows(100)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    a, b = StudentRepository(path), StudentRepository(path)
+    a.load()
+    b.load()
+    b.add(("99999", "From B", 1, 2, 3, 4))
+    b.close()
+    a.close()    # last one out writes the snapshot → must have caught up with B first
+
+    warm = StudentRepository(path)
+    assert warm.snapshot.is_fresh()
+    assert warm.load().get("99999") is not None
+    assert store_rows(warm.store) == disk_rows(path)
+
+
+# Marks file + a fresh snapshot of it → (path, rows)
+def snapshotted_marks(tmp_path, count=300):
+    rows = make_rows(count)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    StudentRepository(path).load()
+    assert StudentSnapshot(path).usable()
+    return path, rows
+
+
+# Regression → stopping early left the column views exported, so closing the mmap raised BufferError
+def test_snapshot_reader_can_stop_early(tmp_path):
+    path, rows = snapshotted_marks(tmp_path)
+    snap = StudentSnapshot(path)
+    students = snap.iter_students()
+    assert [s.row for s in itertools.islice(students, 5)] == rows[:5]
+    students.close()
+
+    students = snap.iter_students()
+    next(students)
+    with pytest.raises(RuntimeError):
+        students.throw(RuntimeError("stop"))
+    assert len(list(snap.iter_students())) == len(rows)
+
+
+# Regression → a truncated .snap raised struct.error out of load() instead of falling back to the text
+@pytest.mark.parametrize("keep", [0, 20, 2000, -9])
+def test_truncated_snapshot_falls_back_to_the_text_file(tmp_path, keep):
+    path, rows = snapshotted_marks(tmp_path)
+    snap = StudentSnapshot(path)
+    with open(snap.path, "rb") as f:
+        data = f.read()
+    signature = os.stat(path)
+    with open(snap.path, "wb") as f:
+        f.write(data[:keep])
+    os.utime(path, ns=(signature.st_atime_ns, signature.st_mtime_ns))
+
+    assert not snap.usable()
+    repo = StudentRepository(path)
+    assert store_rows(repo.load()) == sorted(rows)
+    assert_consistent(repo.store)
+    assert snap.usable()    # rewritten from the text parse
+
+
+# A snapshot whose sizes all check out but whose text is garbage → found while the records are read
+def test_corrupt_snapshot_found_while_loading_falls_back(tmp_path):
+    path, rows = snapshotted_marks(tmp_path)
+    snap = StudentSnapshot(path)
+    name = rows[100][1].encode()
+
+    def corrupt():
+        with open(snap.path, "r+b") as f:
+            data = f.read()
+            f.seek(data.index(name))
+            f.write(b"\xff")
+
+    corrupt()
+    assert snap.usable()
+    repo = StudentRepository(path)
+    assert store_rows(repo.load()) == sorted(rows)
+
+    corrupt()
+    repo, root, changes = gui_repo(path)
+    assert store_rows(repo.store) == sorted(rows)
+    assert_consistent(repo.store)
+    assert [s.name for s in StudentSnapshot(path).iter_students()][100] == rows[100][1]
+
+# --- Watcher ------------------------------------------------------------------------------------
+
+def test_two_instances_converge(tmp_path):
+    rng = random.Random(11)
+    rows = make_rows(200)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    (a, root_a, _), (b, root_b, _) = gui_repo(path), gui_repo(path)
+    fresh = iter(make_rows(100, seed=2))
+
+    for i in range(120):
+        repo = a if i % 2 else b
+        if repo.loader is not None:    # reloading after a compaction → edits wait
+            root_a.step()
+            root_b.step()
+            continue
+        num = rng.choice(sorted(repo.store.by_number))
+        action = rng.random()
+        try:
+            if action < 0.3:
+                repo.add(next(fresh))
+            elif action < 0.7:
+                s = repo.get(num)
+                repo.update(num, (num, s.name, rng.randint(0, 20), s.cw2, s.cw3, s.exam), expected=s)
+            else:
+                repo.delete(num, expected=repo.get(num))
+        except (KeyError, StudentConflictError):
+            pass    # the other instance got there first
+        if i % 10 == 0:
+            repo.journal.fold_journal()
+        if rng.random() < 0.5:
+            a.watcher.poll()
+            b.watcher.poll()
+        root_a.step()
+        root_b.step()
+
+    for repo, root in ((a, root_a), (b, root_b)):
+        repo.watcher.poll()
+        root.run_until(lambda: repo.loader is None and not repo.watcher.reload_pending)
+        repo.watcher.poll()
+        assert store_rows(repo.store) == disk_rows(path)
+        assert_consistent(repo.store)
+
+
+# Regression → every compaction by another instance made this one reparse the whole file
+def test_compaction_of_lines_already_applied_needs_no_reload(tmp_path):
+    rows = make_rows(100)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    a, root, changes = gui_repo(path)
+    b = StudentRepository(path)
+    b.load()
+
+    b.update(rows[0][0], (rows[0][0], "Seen First", 1, 1, 1, 1))
+    a.watcher.poll()
+    assert a.get(rows[0][0]).name == "Seen First"
+    b.journal.fold_journal()
+    changes.clear()
+    a.watcher.poll()
+    assert not any(c["reloaded"] for c in changes) and a.loader is None
+
+    b.update(rows[1][0], (rows[1][0], "Never Seen", 1, 1, 1, 1))
+    b.journal.fold_journal()
+    a.watcher.poll()
+    assert changes[-1]["reloaded"] and a.loader is not None    # lines we never read → reload
+    root.run_until(lambda: a.loader is None)
+    assert a.get(rows[1][0]).name == "Never Seen"
+
+
+# The store is not ready to check an edit against until the loader is done → refused, nothing saved
+def test_edits_wait_for_a_running_load(tmp_path, monkeypatch):
+    path = write_marks(tmp_path / "marks.txt", make_rows(50))
+    repo, root, done = StudentRepository(path, use_snapshot=False), FakeRoot(), []
+    gate, records = threading.Event(), repo.iter_records
+
+    def held_records(*args, **kwargs):
+        gate.wait(10)
+        yield from records(*args, **kwargs)
+
+    monkeypatch.setattr(repo, "iter_records", held_records)
+    repo.start_loading(root, lambda loaded, total, finished, error: done.append(finished))
+    with pytest.raises(StudentConflictError, match="loaded"):
+        repo.add(("99999", "Too Early", 1, 1, 1, 1))
+    gate.set()
+    root.run_until(lambda: done and done[-1])
+    repo.add(("99999", "After Load", 1, 1, 1, 1))
+    assert disk_rows(path) == store_rows(repo.store)
+
+
+# An edit that finds the files rewritten is refused; the reload runs afterwards on the Tk thread
+def test_edit_during_a_foreign_rewrite_schedules_a_reload(tmp_path):
+    rows = make_rows(50)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    a, root, _ = gui_repo(path)
+    b = StudentRepository(path)
+    b.load()
+    b.delete(rows[0][0])
+    b.journal.fold_journal()
+
+    with pytest.raises(StudentConflictError, match="reloaded"):
+        a.update(rows[1][0], (rows[1][0], "Too Early", 1, 1, 1, 1))
+    root.run_until(lambda: a.loader is None and not a.watcher.reload_pending)
+    a.update(rows[1][0], (rows[1][0], "After Reload", 1, 1, 1, 1))
+    assert a.get(rows[0][0]) is None
+    assert store_rows(a.store) == disk_rows(path)
+
+
+# --- SQLite -------------------------------------------------------------------------------------
+
+# Regression → NOCASE / LIKE folded only ASCII, so "é" found the Élodies in memory but none in SQLite
+def test_sqlite_name_lookups_match_memory_for_non_ascii_names(tmp_path):
+    path = write_marks(tmp_path / "marks.txt", make_rows(400))
+    memory = StudentRepository(path, use_snapshot=False)
+    memory.load()
+    sqlite = SqliteStudentRepository(path, str(tmp_path / "marks.db"))
+    store = sqlite.load()
+    sqlite.add(("88888", "ÉLODIE Upper", 1, 1, 1, 1))
+    memory.add(("88888", "ÉLODIE Upper", 1, 1, 1, 1))
+
+    for prefix in ("é", "élo", "ø", "sam", "z"):
+        assert ([s.number for s in store.name_prefix(prefix)]
+                == [s.number for s in memory.store.name_prefix(prefix)]), prefix
+    assert store.name_prefix("é")
+    for fts in {store.fts, False}:    # trigram index, and the LIKE fallback of builds without it
+        store.fts = fts
+        for query in ("é", "ö", "élodie", "ångström", "jo"):
+            assert ([s.number for s in sqlite.search(query)]
+                    == [s.number for s in memory.search(query)]), (fts, query)
+    for mode in ("name_asc", "name_desc"):
+        assert [s.number for s in sqlite.sorted_view(mode)] == [s.number for s in memory.sorted_view(mode)]
+    store.close()
+
+
+# A database written before name_key existed gets the column filled in when it is opened
+def test_sqlite_adds_name_key_to_older_databases(tmp_path):
+    db = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db)
+    conn.executescript("""
+        CREATE TABLE students (seq INTEGER PRIMARY KEY, number TEXT NOT NULL UNIQUE, name TEXT NOT NULL,
+            cw1 INTEGER NOT NULL, cw2 INTEGER NOT NULL, cw3 INTEGER NOT NULL, coursework INTEGER NOT NULL,
+            exam INTEGER NOT NULL, total INTEGER NOT NULL, percent REAL NOT NULL, grade TEXT NOT NULL,
+            version INTEGER NOT NULL);
+        CREATE INDEX students_name ON students (name COLLATE NOCASE);
+        INSERT INTO students VALUES (1, '1001', 'Élodie Khan', 1, 1, 1, 3, 50, 53, 33.1, 'F', 1);
+        PRAGMA user_version = 1;
+    """)
+    conn.close()
+
+    store = SqliteStudentStore(db)
+    assert [s.number for s in store.name_prefix("élo")] == ["1001"]
+    indexes = {name for name, in store.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "students_name_key" in indexes and "students_name" not in indexes
+    store.close()
+
+
+def test_sqlite_crud_and_conflicts_across_two_connections(tmp_path):
+    rows = make_rows(50)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    db = str(tmp_path / "marks.db")
+    mine, theirs = SqliteStudentRepository(path, db), SqliteStudentRepository(path, db)
+    assert store_rows(mine.load()) == sorted(rows)
+    theirs.load()
+
+    mine.add(("12345", "Brand New", 1, 2, 3, 4))
+    with pytest.raises(KeyError):
+        theirs.add(("12345", "Someone Else", 1, 1, 1, 1))
+    assert theirs.get("12345").name == "Brand New"
+
+    num = rows[0][0]
+    seen = mine.get(num)
+    theirs.update(num, (num, "Their Name", *rows[0][2:]), theirs.get(num))
+    merged = mine.update(num, (num, rows[0][1], 20, *rows[0][3:]), seen)    # other field → merged
+    assert merged.row == (num, "Their Name", 20, *rows[0][3:])
+    with pytest.raises(StudentConflictError) as err:
+        mine.update(num, (num, "My Name", *merged.row[2:]), seen)
+    assert err.value.title == "Update Conflict"
+    with pytest.raises(StudentConflictError):
+        theirs.delete(num, seen)
+
+    with pytest.raises(KeyError):
+        mine.update(rows[1][0], (rows[2][0], "Clash", 1, 1, 1, 1))
+    theirs.delete(rows[3][0])
+    with pytest.raises(StudentConflictError) as err:
+        mine.update(rows[3][0], rows[3], seen)
+    assert err.value.title in ("Student Removed", "Student Changed")
+    assert store_rows(mine.store) == store_rows(theirs.store)
+    mine.close()
+    theirs.close()
+
+
+# First launch on a database → the marks file is imported once, in the background, and not again
+def test_sqlite_first_launch_migrates_the_text_file_once(tmp_path):
+    rows = make_rows(3000)
+    path = write_marks(tmp_path / "marks.txt", rows, ["bad,line"])
+    repo, root, progress = SqliteStudentRepository(path, str(tmp_path / "marks.db")), FakeRoot(), []
+    repo.start_loading(root, lambda loaded, total, done, error: progress.append((done, error)))
+    root.run_until(lambda: progress and progress[-1][0])
+    assert progress[-1] == (True, None)
+    assert store_rows(repo.store) == sorted(rows)
+    assert [line_no for line_no, _, _ in repo.load_errors] == [3002]
+
+    repo.delete(rows[0][0])
+    repo.close()
+    with open(path, "a") as f:
+        f.write("99999,Late Line,1,1,1,1\n")
+    again = SqliteStudentRepository(path, str(tmp_path / "marks.db"))
+    assert store_rows(again.load()) == sorted(rows[1:])
+    again.close()
+
+
+# Regression → the worker only found the numbers and the Tk thread fetched the records (IN queries),
+# so a broad search on a big database froze the window
+def test_search_worker_fetches_sqlite_records_off_the_tk_thread(tmp_path):
+    rows = make_rows(1200)
+    path = write_marks(tmp_path / "marks.txt", rows)
+    repo = SqliteStudentRepository(path, str(tmp_path / "marks.db"))
+    store = repo.load()
+    tk_thread, calls = threading.current_thread(), []
+    for name in ("search", "search_ids", "lookup", "records"):
+        method = getattr(store, name)
+
+        def spy(*args, _method=method, _name=name):
+            calls.append((_name, threading.current_thread() is tk_thread))
+            return _method(*args)
+        setattr(store, name, spy)
+
+    root, results = FakeRoot(), []
+    worker = SearchWorker(store, root, lambda query, records: results.append((query, records)))
+    worker.submit("a")
+    root.run_until(lambda: results)
+    assert calls and not any(on_tk for name, on_tk in calls)
+    query, records = results[0]
+    assert all(isinstance(s, StudentRecord) for s in records) and records
+    assert [s.number for s in records] == [s.number for s in store.search("a")]
+    repo.close()
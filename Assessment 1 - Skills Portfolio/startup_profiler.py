@@ -0,0 +1,141 @@
+# Startup profiler shared by the three apps → times what happens between the script starting and the
+# first frame on screen: module imports, asset decoding (GIFs, sounds, images), data loading, building
+# the first screen and first paint. Switched off unless asked for (then every mark is a no-op).
+#   python maths_quiz.py --profile-startup                  → phase breakdown printed on stderr
+#   python maths_quiz.py --profile-startup=json             → the same as one JSON object on stdout
+#   python maths_quiz.py --profile-startup=startup.jsonl    → appends the run as one JSON line to the file
+#   --startup-budget=1500        → first frame slower than 1.5 s is reported as over budget
+#   --profile-exit               → closes the app once reported (exit status 1 when over budget)
+# Work that finishes after the first frame (a background load) → wait_for(name) when it starts and
+# done(name) when it ends; the report then also says when it was done and waits for it.
+# Every flag has an environment twin: STARTUP_PROFILE, STARTUP_BUDGET_MS, STARTUP_PROFILE_EXIT.
+import os    # Environment switches
+import sys    # Command line flags, stderr report, exit status
+import time    # perf_counter clock
+import json    # Machine-readable report (one line per launch → easy to collect on the lab machines)
+import platform    # Machine / Python details stored with every JSON report
+from datetime import datetime
+
+PHASES = ("imports", "assets", "data", "ui", "first paint")
+
+
+# --flag / --flag=value on the command line, otherwise the environment variable (None → not set)
+def option(flag, env):
+    for arg in sys.argv[1:]:
+        if arg == flag:
+            return "1"
+        if arg.startswith(flag + "="):
+            return arg[len(flag) + 1:]
+    return os.environ.get(env)
+
+
+# Created as the first thing in each app script → the clock starts before tkinter / PIL / pygame load.
+# mark(name, phase) closes a step: everything since the previous mark is charged to it.
+class StartupProfiler:
+
+    def __init__(self, app):
+        self.app = app
+        self.start = self.last = time.perf_counter()
+        self.steps = []          # (step name, phase, milliseconds)
+        self.drawn = False       # first frame already reported
+        self.pending = set()     # milestones the report still waits for (wait_for → done)
+        self.milestones = {}     # milestone → milliseconds after start
+        self.painted = None      # root, once the first frame is drawn and the report is due
+
+        self.output = option("--profile-startup", "STARTUP_PROFILE")
+        budget = option("--startup-budget", "STARTUP_BUDGET_MS")
+        self.budget = float(budget) if budget else None
+        self.exit_after = option("--profile-exit", "STARTUP_PROFILE_EXIT") not in (None, "", "0")
+        self.enabled = (self.output not in (None, "", "0") or self.budget is not None
+                        or self.exit_after)
+
+    def mark(self, name, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.steps.append((name, phase, (now - self.last) * 1000))
+        self.last = now
+
+    # Something still running in the background once the first frame is up (e.g. the students
+    # loading on a worker thread) → the report waits until done(name) says when it finished
+    def wait_for(self, name):
+        if self.enabled:
+            self.pending.add(name)
+
+    # Only the first done() of a milestone counts (a later reload reports done again)
+    def done(self, name):
+        if not self.enabled or name not in self.pending:
+            return
+        self.milestones[name] = (time.perf_counter() - self.start) * 1000
+        self.pending.discard(name)
+        if not self.pending and self.painted is not None:
+            self.write_report(self.painted)
+
+    # Call just before mainloop → the report is written once the window is mapped and Tk has
+    # drawn it (the idle redraws queued by mapping run before our idle callback)
+    def first_frame(self, root):
+        if not self.enabled:
+            return
+
+        def on_map(event):
+            if event.widget is root and not self.drawn:
+                self.drawn = True
+                root.after_idle(self.finish, root)
+
+        root.bind("<Map>", on_map, add="+")
+
+    def finish(self, root):
+        root.update_idletasks()
+        self.mark("window mapped + drawn", "first paint")
+        self.painted = root
+        if not self.pending:
+            self.write_report(root)
+
+    def write_report(self, root):
+        report = self.report()
+
+        if self.output in ("json", "JSON"):
+            print(json.dumps(report))
+        elif self.output and os.path.splitext(self.output)[1].lower() in (".json", ".jsonl"):
+            with open(self.output, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        else:
+            self.print_report(report)
+
+        if self.exit_after:
+            root.destroy()
+            sys.exit(1 if report["over_budget"] else 0)
+
+    def report(self):
+        total = sum(ms for _, _, ms in self.steps)
+        phases = {phase: 0.0 for phase in PHASES}
+        for _, phase, ms in self.steps:
+            phases[phase] = phases.get(phase, 0.0) + ms
+        return {
+            "app": self.app,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total_ms": round(total, 1),
+            "budget_ms": self.budget,
+            "over_budget": self.budget is not None and total > self.budget,
+            "phases": {phase: round(ms, 1) for phase, ms in phases.items()},
+            "milestones": {name: round(ms, 1) for name, ms in self.milestones.items()},
+            "steps": [{"name": name, "phase": phase, "ms": round(ms, 1)}
+                      for name, phase, ms in self.steps],
+        }
+
+    def print_report(self, report):
+        out = sys.stderr
+        print(f"\nStartup profile – {report['app']}", file=out)
+        for step in report["steps"]:
+            print(f"  {step['phase']:<12} {step['name']:<40}{step['ms']:>10.1f} ms", file=out)
+        print("  " + " | ".join(f"{phase} {ms:.0f} ms" for phase, ms in report["phases"].items()), file=out)
+
+        verdict = ""
+        if report["budget_ms"] is not None:
+            state = "OVER BUDGET" if report["over_budget"] else "within budget"
+            verdict = f"   ({state}: {report['budget_ms']:.0f} ms)"
+        print(f"  first frame after {report['total_ms']:.1f} ms{verdict}", file=out)
+        for name, ms in report["milestones"].items():
+            print(f"  {name} after {ms:.1f} ms", file=out)